@@ -95,7 +95,9 @@ PROJECT_APPS = [
     "bucket.apps.BucketConfig",
     "chat.apps.ChatConfig",
     "tags.apps.TagsConfig",
-    "entities.apps.EntitiesConfig"
+    "entities.apps.EntitiesConfig",
+    "notifications.apps.NotificationsConfig",
+    "monitoring.apps.MonitoringConfig",
 ]
 
 INSTALLED_APPS = [
@@ -105,6 +107,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'monitoring.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     "whitenoise.middleware.WhiteNoiseMiddleware",
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -126,6 +129,37 @@ CELERY_BROKER_URL = os.environ.get('WW4API_CELERY_BROKER_REDIS_URL', 'redis://lo
 
 CELERY_RESULT_BACKEND = os.environ.get('WW4API_CELERY_RESULT_BACKEND', 'redis://localhost:6379')
 
+CELERY_BEAT_SCHEDULE = {
+    'reconcile-relationship-projection': {
+        'task': 'entities.tasks.reconcile_projection_task',
+        'schedule': float(os.getenv("WW4API_ORION_PROJECTION_RECONCILE_INTERVAL", default=60 * 60)),
+    },
+    'purge-upload-sessions': {
+        'task': 'bucket.tasks.purge_upload_sessions_task',
+        'schedule': 60 * 60,
+    },
+}
+
+# Cache
+
+if os.environ.get('WW4API_CACHE_REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': os.environ.get('WW4API_CACHE_REDIS_URL'),
+            'OPTIONS': {
+                'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+                'IGNORE_EXCEPTIONS': True,
+            },
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -191,6 +225,8 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = "users.User"
 
+ORION_PERMISSIONS_CACHE_TIMEOUT = int(os.getenv("WW4API_ORION_PERMISSIONS_CACHE_TIMEOUT", default=60 * 60))
+
 # Orion Settings
 
 ORION_HOST = os.getenv("WW4API_ORION_HOST", default="http://localhost:1027")
@@ -207,11 +243,83 @@ ORION_HEADERS = {
 
 }
 
+ORION_PAGE_SIZE = int(os.getenv("WW4API_ORION_PAGE_SIZE", default=1000))
+
+ORION_CLIENT = dict(
+    POOL_CONNECTIONS=int(os.getenv("WW4API_ORION_POOL_CONNECTIONS", default=10)),
+    POOL_MAXSIZE=int(os.getenv("WW4API_ORION_POOL_MAXSIZE", default=20)),
+    MAX_RETRIES=int(os.getenv("WW4API_ORION_MAX_RETRIES", default=3)),
+    BACKOFF_FACTOR=float(os.getenv("WW4API_ORION_BACKOFF_FACTOR", default=0.3)),
+    CONNECT_TIMEOUT=float(os.getenv("WW4API_ORION_CONNECT_TIMEOUT", default=3.05)),
+    READ_TIMEOUT=float(os.getenv("WW4API_ORION_READ_TIMEOUT", default=30)),
+    ASYNC_MAX_CONNECTIONS=int(os.getenv("WW4API_ORION_ASYNC_MAX_CONNECTIONS", default=100)),
+)
+
+ORION_SINGLE_FLIGHT = dict(
+    ENABLED=str_to_bool(os.getenv("WW4API_ORION_SINGLE_FLIGHT_ENABLED", default=True)),
+    SHARED=str_to_bool(os.getenv("WW4API_ORION_SINGLE_FLIGHT_SHARED", default=False)),
+    RESULT_TTL=int(os.getenv("WW4API_ORION_SINGLE_FLIGHT_RESULT_TTL", default=1)),
+    TIMEOUT=float(os.getenv("WW4API_ORION_SINGLE_FLIGHT_TIMEOUT", default=5)),
+)
+
+ORION_GRAPH = dict(
+    MAX_WORKERS=int(os.getenv("WW4API_ORION_GRAPH_MAX_WORKERS", default=8)),
+    CHUNK_SIZE=int(os.getenv("WW4API_ORION_GRAPH_CHUNK_SIZE", default=50)),
+)
+
+ORION_BULK = dict(
+    CHUNK_SIZE=int(os.getenv("WW4API_ORION_BULK_CHUNK_SIZE", default=100)),
+    MAX_WORKERS=int(os.getenv("WW4API_ORION_BULK_MAX_WORKERS", default=4)),
+    MAX_RETRIES=int(os.getenv("WW4API_ORION_BULK_MAX_RETRIES", default=3)),
+    BACKOFF_FACTOR=float(os.getenv("WW4API_ORION_BULK_BACKOFF_FACTOR", default=0.5)),
+)
+
+ORION_SCOPE_CACHE_TIMEOUT = int(os.getenv("WW4API_ORION_SCOPE_CACHE_TIMEOUT", default=300))
+
+ORION_RESPONSE_CACHE = dict(
+    TIMEOUT=int(os.getenv("WW4API_ORION_RESPONSE_CACHE_TIMEOUT", default=0)),
+)
+
+ORION_STREAM = dict(
+    CHUNK_SIZE=int(os.getenv("WW4API_ORION_STREAM_CHUNK_SIZE", default=64 * 1024)),
+    MIN_LIMIT=int(os.getenv("WW4API_ORION_STREAM_MIN_LIMIT", default=500)),
+)
+
+ORION_PROJECTION = dict(
+    ENABLED=str_to_bool(os.getenv("WW4API_ORION_PROJECTION_ENABLED", default=False)),
+    BATCH_SIZE=int(os.getenv("WW4API_ORION_PROJECTION_BATCH_SIZE", default=1000)),
+)
+
+ORION_NOTIFICATIONS = dict(
+    NOTIFICATION_URL=os.getenv("WW4API_ORION_NOTIFICATIONS_URL", default="http://ww4api:8000/api/v1/notifications/"),
+    TOKEN=os.getenv("WW4API_ORION_NOTIFICATIONS_TOKEN"),
+    TYPES=os.getenv("WW4API_ORION_NOTIFICATIONS_TYPES",
+                    default="Owner,Organization,Worker,Budget,Project,Furniture,Module,Group,Assembly,Part,Consumable,"
+                            "Leftover,Machine,Expedition,WorkerTask,MachineTask").split(','),
+)
+
+METRICS = dict(
+    ENABLED=str_to_bool(os.getenv("WW4API_METRICS_ENABLED", default=True)),
+    SERVER_TIMING=str_to_bool(os.getenv("WW4API_METRICS_SERVER_TIMING", default=False)),
+    TOKEN=os.getenv("WW4API_METRICS_TOKEN"),
+)
+
+ORION_HEALTH = dict(
+    CHECK_INTERVAL=float(os.getenv("WW4API_ORION_HEALTH_CHECK_INTERVAL", default=10)),
+    FAILURE_THRESHOLD=int(os.getenv("WW4API_ORION_HEALTH_FAILURE_THRESHOLD", default=3)),
+    RECOVERY_TIMEOUT=float(os.getenv("WW4API_ORION_HEALTH_RECOVERY_TIMEOUT", default=30)),
+    PROBE_TIMEOUT=float(os.getenv("WW4API_ORION_HEALTH_PROBE_TIMEOUT", default=2)),
+)
+
 KEYROCK_CLIENT = dict(
     TOKEN_URL=os.getenv("WW4API_KEYROCK_TOKEN_URL", default="http://localhost:3005/oauth2/token"),
     AUTHORIZE_URL=os.getenv("WW4API_KEYROCK_AUTHORIZE_URL"),
     CLIENT_ID=os.getenv("WW4API_KEYROCK_CLIENT_ID", default="tutorial-dckr-site-0000-xpresswebapp"),
     CLIENT_SECRET=os.getenv("WW4API_KEYROCK_CLIENT_SECRET", default="tutorial-dckr-site-0000-clientsecret"),
+    EARLY_REFRESH=float(os.getenv("WW4API_KEYROCK_TOKEN_EARLY_REFRESH", default=60)),
+    TIMEOUT=float(os.getenv("WW4API_KEYROCK_TOKEN_TIMEOUT", default=10)),
+    SHARE_TOKEN=str_to_bool(os.getenv("WW4API_KEYROCK_SHARE_TOKEN",
+                                      default=bool(os.environ.get('WW4API_CACHE_REDIS_URL')))),
 )
 
 # HashField
@@ -357,6 +465,19 @@ MEDIA_ROOT = BASE_DIR / os.getenv("WW4_MEDIA_ROOT_NAME", default='media/public/'
 
 PROTECTED_MEDIA_ROOT = BASE_DIR / "media/protected/"
 
+# Uploaded files above this size are streamed to FILE_UPLOAD_TEMP_DIR in chunks instead of being kept in memory; the
+# directory lives on the media volume so that storing them in MEDIA_ROOT is a rename.
+FILE_UPLOAD_MAX_MEMORY_SIZE = mega_bytes_to_bits(mega=int(os.getenv("WW4API_FILE_UPLOAD_MAX_MEMORY_SIZE", default=2)))
+
+FILE_UPLOAD_TEMP_DIR = str(BASE_DIR / os.getenv("WW4API_FILE_UPLOAD_TEMP_DIR_NAME", default='media/uploads/'))
+
+UPLOAD_SESSIONS = dict(
+    MAX_SIZE=mega_bytes_to_bits(mega=int(os.getenv("WW4API_UPLOAD_SESSION_MAX_SIZE", default=10240))),
+    BLOCK_SIZE=mega_bytes_to_bits(mega=1),
+    # Hours an unfinished upload is kept after its last chunk.
+    TTL=float(os.getenv("WW4API_UPLOAD_SESSION_TTL", default=48)),
+)
+
 PROTECTED_MEDIA_URL = "/protected/"
 
 PROTECTED_MEDIA_SERVER = os.getenv("WW4API_PROTECTED_MEDIA_SERVER", default="nginx")  # Defaults to
@@ -10,10 +10,13 @@ urlpatterns = [
     path('api/v1/perms/', include('permissions.urls')),
     path('api/v1/accounts/', include('users.urls')),
     path("api/v1/email/", include("emailManager.urls")),
+    path("api/v1/async/", include('entities.asyncUrls')),
     path("api/v1/", include('entities.urls')),
     path("api/v1/", include('tags.urls')),
     path("api/v1/storages/", include('bucket.urls')),
+    path("api/v1/notifications/", include('notifications.urls')),
     path("protected/", include('protected_media.urls')),
+    path("metrics/", include('monitoring.urls')),
 ]
 
 if settings.DEBUG:
@@ -0,0 +1,205 @@
+"""
+Load driver of the benchmark harness.
+
+Runs each scenario against a running API (WSGI or the ASGI ``api/v1/async/`` routes) with ``--concurrency`` clients and
+prints p50/p95/p99 latency, throughput and the number of calls the API made to the mock broker per request::
+
+    python -m benchmarks.load --base-url http://127.0.0.1:8000/api/v1/ --token <access token> \\
+        --mock-url http://127.0.0.1:1026 --entity part --scenarios list,retrieve,patch,batch-create
+
+``--output`` writes the results as JSON; ``--baseline`` compares them with a previous run and exits with status 1 when
+the p95 latency grew by more than ``--tolerance`` or a scenario makes more outbound calls than before, so it can gate
+changes to the proxy code.
+"""
+import argparse
+import json
+import math
+import random
+import statistics
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from .mock_orion import DEFAULT_ENTITIES, urn
+
+SCENARIOS = ('list', 'retrieve', 'patch', 'batch-create')
+
+
+class Scenario(object):
+    """
+    A request template: ``build(i)`` returns the (method, url, json body) of the i-th request.
+    """
+
+    def __init__(self, name: str, build: Callable[[int], Tuple[str, str, Optional[object]]],
+                 expected: Tuple[int, ...]) -> None:
+        self.name = name
+        self.build = build
+        self.expected = expected
+
+
+def make_scenarios(base_url: str, entity: str, entity_type: str, count: int, batch_size: int,
+                   page_size: int) -> Dict[str, Scenario]:
+    base_url = base_url.rstrip('/') + '/'
+
+    def detail(i: int) -> str:
+        return f"{base_url}{entity}/{urn(entity_type, random.randrange(count))}/"
+
+    def batch(i: int) -> list:
+        return [dict(id=urn(entity_type, f"bench-{uuid.uuid4().hex}"), type=entity_type,
+                     name=dict(type='Property', value=f"bench-{i}-{n}")) for n in range(batch_size)]
+
+    return dict((scenario.name, scenario) for scenario in [
+        Scenario('list', lambda i: ('GET', f"{base_url}{entity}/?limit={page_size}", None), (200,)),
+        Scenario('retrieve', lambda i: ('GET', detail(i), None), (200,)),
+        Scenario('patch', lambda i: ('PATCH', detail(i),
+                                     dict(description=dict(type='Property', value=f"bench-{i}"))), (200,)),
+        Scenario('batch-create', lambda i: ('POST', f"{base_url}{entity}/", batch(i)), (201, 207)),
+    ])
+
+
+def percentile(values: List[float], rank: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, math.ceil(rank / 100 * len(values)) - 1))
+    return values[index]
+
+
+def mock_stats(mock_url: Optional[str], reset: bool = False) -> Optional[dict]:
+    if not mock_url:
+        return None
+    url = mock_url.rstrip('/') + '/__stats'
+    if reset:
+        requests.delete(url, timeout=5)
+        return None
+    return requests.get(url, timeout=5).json()
+
+
+def run_scenario(scenario: Scenario, session_factory: Callable[[], requests.Session], total: int, concurrency: int,
+                 mock_url: Optional[str], warmup: int) -> dict:
+    sessions: Dict[int, requests.Session] = dict()
+
+    def call(i: int) -> Tuple[float, bool]:
+        session = sessions.setdefault(threading.get_ident(), session_factory())
+        method, url, body = scenario.build(i)
+        start = time.perf_counter()
+        try:
+            response = session.request(method, url, json=body, timeout=60)
+            ok = response.status_code in scenario.expected
+        except requests.exceptions.RequestException:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(call, range(warmup)))
+        mock_stats(mock_url, reset=True)
+        start = time.perf_counter()
+        results = list(executor.map(call, range(total)))
+        elapsed = time.perf_counter() - start
+    stats = mock_stats(mock_url)
+    latencies = [latency * 1000 for latency, _ in results]
+    errors = sum(1 for _, ok in results if not ok)
+    report = dict(
+        scenario=scenario.name, requests=total, errors=errors, concurrency=concurrency,
+        throughput=round(total / elapsed, 2) if elapsed else 0.0,
+        mean=round(statistics.mean(latencies), 2) if latencies else 0.0,
+        p50=round(percentile(latencies, 50), 2), p95=round(percentile(latencies, 95), 2),
+        p99=round(percentile(latencies, 99), 2),
+    )
+    if stats is not None:
+        report['outbound_per_request'] = round(stats.get('total', 0) / total, 2) if total else 0.0
+        report['outbound_calls'] = stats.get('calls', dict())
+    return report
+
+
+def print_reports(reports: List[dict]) -> None:
+    header = f"{'scenario':<14}{'reqs':>7}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}" \
+             f"{'calls/req':>11}"
+    print(header)
+    print('-' * len(header))
+    for report in reports:
+        print(f"{report['scenario']:<14}{report['requests']:>7}{report['errors']:>8}{report['throughput']:>10}"
+              f"{report['p50']:>10}{report['p95']:>10}{report['p99']:>10}"
+              f"{report.get('outbound_per_request', '-'):>11}")
+    for report in reports:
+        if report.get('outbound_calls'):
+            calls = ', '.join(f"{key}={value}" for key, value in sorted(report['outbound_calls'].items()))
+            print(f"  {report['scenario']}: {calls}")
+
+
+def compare(reports: List[dict], baseline: List[dict], tolerance: float) -> List[str]:
+    regressions = list()
+    previous = dict((report['scenario'], report) for report in baseline)
+    for report in reports:
+        before = previous.get(report['scenario'])
+        if before is None:
+            continue
+        if before.get('p95') and report['p95'] > before['p95'] * (1 + tolerance):
+            regressions.append(f"{report['scenario']}: p95 {before['p95']} ms -> {report['p95']} ms")
+        if report.get('outbound_per_request', 0) > before.get('outbound_per_request', float('inf')):
+            regressions.append(f"{report['scenario']}: outbound calls/request {before['outbound_per_request']} -> "
+                               f"{report['outbound_per_request']}")
+        if report['errors'] > before.get('errors', 0):
+            regressions.append(f"{report['scenario']}: errors {before.get('errors', 0)} -> {report['errors']}")
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the Orion proxy endpoints.")
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000/api/v1/',
+                        help="Root of the entity routes, e.g. .../api/v1/ or .../api/v1/async/.")
+    parser.add_argument('--token', default=None, help="OAuth2 access token of an admin user.")
+    parser.add_argument('--mock-url', default=None, help="Mock broker, to count the outbound calls per request.")
+    parser.add_argument('--entity', default='part', help="Route of the entity, e.g. part, consumable, machine.")
+    parser.add_argument('--entity-type', default=None, help="NGSI-LD type of the entity (default: from --entity).")
+    parser.add_argument('--entity-count', type=int, default=None,
+                        help="Number of entities of that type loaded in the mock broker.")
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--output', default=None, help="Write the results to this JSON file.")
+    parser.add_argument('--baseline', default=None, help="Fail when the results regress against this JSON file.")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="Allowed p95 growth against the baseline.")
+    args = parser.parse_args(argv)
+
+    entity_type = args.entity_type or ''.join(word.capitalize() for word in args.entity.split('-'))
+    count = args.entity_count or DEFAULT_ENTITIES.get(entity_type, 100)
+    scenarios = make_scenarios(args.base_url, args.entity, entity_type, count, args.batch_size, args.page_size)
+
+    def session_factory() -> requests.Session:
+        session = requests.Session()
+        if args.token:
+            session.headers['Authorization'] = f"Bearer {args.token}"
+        return session
+
+    reports = list()
+    for name in args.scenarios.split(','):
+        scenario = scenarios.get(name.strip())
+        if scenario is None:
+            parser.error(f"Unknown scenario '{name}', choose from {', '.join(SCENARIOS)}.")
+        reports.append(run_scenario(scenario, session_factory, args.requests, args.concurrency, args.mock_url,
+                                    args.warmup))
+    print_reports(reports)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(reports, file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(reports, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
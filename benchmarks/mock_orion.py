@@ -0,0 +1,334 @@
+"""
+Local stand-in for Orion-LD and Keyrock used by the benchmark harness.
+
+It implements the small part of NGSI-LD the API relies on (entity list with ``type``/``id``/``q``/``attrs``/``limit``/
+``offset``/``count``, retrieve, create, attribute update/append, delete and the batch ``entityOperations``) plus the
+Keyrock client-credentials token endpoint. Every response is delayed by ``--latency`` seconds and every call is
+counted, so the harness can report how many outbound calls the API makes per request::
+
+    python -m benchmarks.mock_orion --port 1026 --latency 0.02 --entities Part=5000,Project=100
+
+Point the API at it with ``WW4API_ORION_HOST=http://127.0.0.1:1026`` and
+``WW4API_KEYROCK_TOKEN_URL=http://127.0.0.1:1026/oauth2/token``. ``GET /__stats`` returns the call counters and
+``DELETE /__stats`` resets them.
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse, parse_qs, unquote
+
+ENTITIES_PATH = '/ngsi-ld/v1/entities'
+OPERATIONS_PATH = '/ngsi-ld/v1/entityOperations'
+TOKEN_PATH = '/oauth2/token'
+STATS_PATH = '/__stats'
+
+DEFAULT_ENTITIES = dict(Owner=10, Budget=50, Project=100, Furniture=200, Module=400, Part=2000, Consumable=200,
+                        Expedition=50, Assembly=100, Group=100, WorkerTask=500, MachineTask=500, Machine=20)
+
+# type -> [(relationship attribute, target type)]
+RELATIONSHIPS = {
+    'Budget': [('orderBy', 'Owner')],
+    'Project': [('hasBudget', 'Budget'), ('orderBy', 'Owner')],
+    'Furniture': [('hasBudget', 'Budget')],
+    'Module': [('belongsToFurniture', 'Furniture')],
+    'Consumable': [('belongsTo', 'Project'), ('orderBy', 'Owner')],
+    'Expedition': [('belongsTo', 'Project'), ('orderBy', 'Owner')],
+    'Assembly': [('belongsTo', 'Project'), ('orderBy', 'Owner')],
+    'Group': [('belongsTo', 'Project'), ('orderBy', 'Owner')],
+    'Part': [('belongsTo', 'Project'), ('orderBy', 'Owner')],
+    'WorkerTask': [('executedIn', 'Part')],
+    'MachineTask': [('performedOn', 'Part')],
+}
+
+Q_PATTERN = re.compile(r'^(?P<attr>\w+)==(?P<values>.+)$')
+
+
+def urn(entity_type: str, index) -> str:
+    return f"urn:ngsi-ld:{entity_type}:{index}"
+
+
+def build_entity(entity_type: str, index: int, counts: Dict[str, int], payload_size: int = 64) -> dict:
+    entity = OrderedDict(id=urn(entity_type, index), type=entity_type)
+    # Non-ASCII on purpose: names in production are Portuguese.
+    entity['name'] = dict(type='Property', value=f"{entity_type.lower()}-{index} Ação")
+    entity['description'] = dict(type='Property', value='x' * payload_size)
+    for attr, target in RELATIONSHIPS.get(entity_type, []):
+        if counts.get(target):
+            entity[attr] = dict(type='Relationship', object=urn(target, index % counts[target]))
+    return entity
+
+
+def key_values(entity: dict) -> dict:
+    simplified = dict()
+    for attr, value in entity.items():
+        if isinstance(value, dict):
+            value = value.get('object', value.get('value'))
+        simplified[attr] = value
+    return simplified
+
+
+class Broker(object):
+    """
+    In-memory entity store and call counters shared by the handler threads.
+    """
+
+    def __init__(self, counts: Dict[str, int], latency: float = 0, token_ttl: int = 3600,
+                 payload_size: int = 64) -> None:
+        self.latency = latency
+        self.token_ttl = token_ttl
+        self.lock = threading.Lock()
+        self.calls: Counter = Counter()
+        self.entities: Dict[str, dict] = OrderedDict()
+        for entity_type, count in counts.items():
+            for index in range(count):
+                entity = build_entity(entity_type, index, counts, payload_size)
+                self.entities[entity['id']] = entity
+
+    def count(self, key: str) -> None:
+        with self.lock:
+            self.calls[key] += 1
+
+    def stats(self) -> dict:
+        with self.lock:
+            return dict(total=sum(self.calls.values()), calls=dict(self.calls))
+
+    def reset(self) -> None:
+        with self.lock:
+            self.calls.clear()
+
+    @staticmethod
+    def matches(entity: dict, params: Dict[str, str]) -> bool:
+        if params.get('type') and entity.get('type') not in params['type'].split(','):
+            return False
+        if params.get('id') and entity.get('id') not in params['id'].split(','):
+            return False
+        if params.get('q'):
+            match = Q_PATTERN.match(params['q'])
+            if match is None:
+                return False
+            values = {value.strip('"') for value in match.group('values').split(',')}
+            attr = entity.get(match.group('attr'))
+            if isinstance(attr, dict):
+                attr = attr.get('object', attr.get('value'))
+            return str(attr) in values
+        return True
+
+    @staticmethod
+    def project(entity: dict, params: Dict[str, str]) -> dict:
+        if params.get('attrs'):
+            attrs = set(params['attrs'].split(','))
+            entity = OrderedDict((k, v) for k, v in entity.items() if k in ('id', 'type') or k in attrs)
+        if 'keyValues' in params.get('options', ''):
+            entity = key_values(entity)
+        return entity
+
+    def query(self, params: Dict[str, str]) -> Tuple[List[dict], int]:
+        with self.lock:
+            found = [entity for entity in self.entities.values() if self.matches(entity, params)]
+        offset = int(params.get('offset', 0))
+        limit = int(params.get('limit', 20))
+        return [self.project(entity, params) for entity in found[offset:offset + limit]], len(found)
+
+    def get(self, pk: str) -> Optional[dict]:
+        with self.lock:
+            return self.entities.get(pk)
+
+    def upsert(self, entity: dict, replace: bool = True) -> bool:
+        with self.lock:
+            exists = entity.get('id') in self.entities
+            if exists and not replace:
+                return False
+            self.entities[entity['id']] = OrderedDict(entity)
+            return True
+
+    def update(self, pk: str, attrs: dict) -> bool:
+        with self.lock:
+            if pk not in self.entities:
+                return False
+            self.entities[pk].update(attrs)
+            return True
+
+    def delete(self, pk: str) -> bool:
+        with self.lock:
+            return self.entities.pop(pk, None) is not None
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    broker: Broker = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        return json.loads(body) if body else None
+
+    def discard_body(self) -> None:
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+
+    def reply(self, code: int, data=None, headers: dict = None) -> None:
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8') if data is not None else b''
+        self.send_response(code)
+        if body:
+            self.send_header('Content-Type', 'application/json')
+        for name, value in (headers or dict()).items():
+            self.send_header(name, str(value))
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def route(self, method: str) -> None:
+        url = urlparse(self.path)
+        path = url.path.rstrip('/')
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if path == STATS_PATH:
+            if method == 'DELETE':
+                self.broker.reset()
+                return self.reply(204)
+            return self.reply(200, self.broker.stats())
+        if self.broker.latency:
+            time.sleep(self.broker.latency)
+        if path == TOKEN_PATH and method == 'POST':
+            self.broker.count('POST token')
+            self.discard_body()
+            return self.reply(200, dict(access_token='benchmark', token_type='Bearer',
+                                        expires_in=self.broker.token_ttl))
+        if path.startswith(OPERATIONS_PATH):
+            return self.operation(method, path[len(OPERATIONS_PATH) + 1:])
+        if path == ENTITIES_PATH:
+            return self.collection(method, params)
+        if path.startswith(ENTITIES_PATH + '/'):
+            rest = path[len(ENTITIES_PATH) + 1:]
+            pk, _, tail = rest.partition('/')
+            return self.detail(method, unquote(pk), tail, params)
+        self.broker.count(f"{method} unknown")
+        self.reply(404, dict(title='Not found', detail=self.path))
+
+    def collection(self, method: str, params: Dict[str, str]) -> None:
+        if method == 'GET':
+            self.broker.count('GET entities')
+            entities, total = self.broker.query(params)
+            headers = dict()
+            if params.get('count') == 'true':
+                headers['NGSILD-Results-Count'] = total
+            return self.reply(200, entities, headers=headers)
+        if method == 'POST':
+            self.broker.count('POST entities')
+            entity = self.read_json()
+            if not self.broker.upsert(entity, replace=False):
+                return self.reply(409, dict(title='Entity already exists', detail=entity.get('id')))
+            return self.reply(201, headers=dict(Location=f"{ENTITIES_PATH}/{entity.get('id')}"))
+        self.reply(405)
+
+    def detail(self, method: str, pk: str, tail: str, params: Dict[str, str]) -> None:
+        if tail == 'attrs' and method in ('PATCH', 'POST'):
+            self.broker.count(f"{method} attrs")
+            found = self.broker.update(pk, self.read_json() or dict())
+            return self.reply(204) if found else self.reply(404, dict(title='Entity not found', detail=pk))
+        if method == 'GET':
+            self.broker.count('GET entity')
+            entity = self.broker.get(pk)
+            if entity is None:
+                return self.reply(404, dict(title='Entity not found', detail=pk))
+            return self.reply(200, self.broker.project(entity, params))
+        if method == 'DELETE':
+            self.broker.count('DELETE entity')
+            return self.reply(204) if self.broker.delete(pk) else self.reply(404, dict(title='Entity not found'))
+        self.reply(405)
+
+    def operation(self, method: str, operation: str) -> None:
+        self.broker.count(f"{method} {operation}")
+        payload = self.read_json() or list()
+        success, errors = list(), list()
+        if operation in ('create', 'upsert'):
+            for entity in payload:
+                if self.broker.upsert(entity, replace=operation == 'upsert'):
+                    success.append(entity.get('id'))
+                else:
+                    errors.append(dict(entityId=entity.get('id'), error=dict(status=409)))
+            if not errors:
+                return self.reply(201, success)
+        elif operation == 'update':
+            for entity in payload:
+                attrs = {k: v for k, v in entity.items() if k not in ('id', 'type')}
+                if self.broker.update(entity.get('id'), attrs):
+                    success.append(entity.get('id'))
+                else:
+                    errors.append(dict(entityId=entity.get('id'), error=dict(status=404)))
+            if not errors:
+                return self.reply(204)
+        elif operation == 'delete':
+            for pk in payload:
+                if self.broker.delete(pk):
+                    success.append(pk)
+                else:
+                    errors.append(dict(entityId=pk, error=dict(status=404)))
+            if not errors:
+                return self.reply(204)
+        else:
+            return self.reply(404, dict(title='Unknown operation', detail=operation))
+        self.reply(207, dict(success=success, errors=errors))
+
+    def do_GET(self):
+        self.route('GET')
+
+    def do_POST(self):
+        self.route('POST')
+
+    def do_PATCH(self):
+        self.route('PATCH')
+
+    def do_DELETE(self):
+        self.route('DELETE')
+
+
+def parse_counts(value: Optional[str]) -> Dict[str, int]:
+    counts = dict(DEFAULT_ENTITIES)
+    if value:
+        for item in value.split(','):
+            entity_type, _, count = item.partition('=')
+            counts[entity_type.strip()] = int(count)
+    return counts
+
+
+def serve(host: str = '127.0.0.1', port: int = 1026, latency: float = 0,
+          counts: Dict[str, int] = None, payload_size: int = 64) -> ThreadingHTTPServer:
+    broker = Broker(counts or dict(DEFAULT_ENTITIES), latency, payload_size=payload_size)
+    handler = type('BoundHandler', (Handler,), dict(broker=broker))
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Orion-LD/Keyrock broker for the benchmark harness.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=1026)
+    parser.add_argument('--latency', type=float, default=0.0, help="Delay added to every response, in seconds.")
+    parser.add_argument('--entities', default=None,
+                        help="Entity counts per type, e.g. Part=5000,Project=100 (others keep their default).")
+    parser.add_argument('--payload-size', type=int, default=64,
+                        help="Characters of the description attribute, to measure large entities.")
+    args = parser.parse_args()
+    server = serve(args.host, args.port, args.latency, parse_counts(args.entities), args.payload_size)
+    print(f"Mock Orion-LD listening on http://{args.host}:{args.port} (latency {args.latency}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from bucket.models import File, Folder, LeftOverImage
+from bucket.models import File, Folder, LeftOverImage, UploadSession
 from mptt.admin import MPTTModelAdmin
 
 
@@ -29,3 +29,9 @@ class LeftOverImageAdmin(admin.ModelAdmin):
     list_display = ('id', 'file', 'treated', 'confirmed', 'klass', 'batch')
     list_filter = ('treated', 'confirmed', 'klass', 'batch')
     search_fields = ('klass', 'batch')
+
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ('file_name', 'folder', 'user', 'offset', 'size', 'modified')
+    list_filter = ('user',)
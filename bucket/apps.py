@@ -1,4 +1,7 @@
+import os
+
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class BucketConfig(AppConfig):
@@ -7,3 +10,5 @@ class BucketConfig(AppConfig):
 
     def ready(self):
         import bucket.signals
+        # Large uploads are streamed here before being moved into MEDIA_ROOT.
+        os.makedirs(settings.FILE_UPLOAD_TEMP_DIR, exist_ok=True)
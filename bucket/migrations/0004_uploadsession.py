@@ -0,0 +1,37 @@
+# Generated by Django 3.2.18 on 2026-10-17 18:00
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django_extensions.db.fields
+import hashid_field.field
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('bucket', '0003_alter_file_file_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('created', django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, verbose_name='created')),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name='modified')),
+                ('id', hashid_field.field.HashidAutoField(alphabet='abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ1234567890', min_length=16, prefix='upload_', primary_key=True, serialize=False)),
+                ('file_name', models.CharField(max_length=500, verbose_name='File Name')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Size')),
+                ('offset', models.PositiveBigIntegerField(default=0, verbose_name='Offset')),
+                ('checksum', models.CharField(max_length=64, verbose_name='SHA-256')),
+                ('folder', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to='bucket.folder')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to=settings.AUTH_USER_MODEL, verbose_name='Uploader')),
+            ],
+            options={
+                'verbose_name': 'Upload Session',
+                'verbose_name_plural': 'Upload Sessions',
+                'ordering': ('-created',),
+            },
+        ),
+    ]
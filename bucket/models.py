@@ -1,7 +1,11 @@
+import logging
 import os
+from pathlib import Path
 
 from django.core.validators import ValidationError
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Value
+from django.db.models.functions import Concat, Substr
 from django.utils.translation import gettext_lazy as _
 from django_extensions.db.models import TimeStampedModel
 from hashid_field.field import HashidAutoField
@@ -10,11 +14,13 @@ from django.conf import  settings
 from bucket.managers import FolderManager, FileManager, LeftOverImageManager
 from bucket.storage import CustomFileSystemStorage
 from users.models import User
-from utilities.functions import upload_files_to, upload_leftover_to
+from utilities.functions import upload_files_to, upload_leftover_to, update_folder_file_system, create_path
 from utilities.validators import validate_filesystem_path
 from model_utils import FieldTracker
 from mptt.models import MPTTModel, TreeForeignKey
 
+logger = logging.getLogger(__name__)
+
 
 class Folder(TimeStampedModel, MPTTModel):
     id = HashidAutoField(prefix='folder_', primary_key=True)
@@ -38,21 +44,48 @@ class Folder(TimeStampedModel, MPTTModel):
 
     def save(self, *args, **kwargs):
         self.clean()
-        self.path = self.get_folder_path()
-        return super().save(*args, **kwargs)
+        # The post_save receiver relocates the sub-folders and files of a renamed or moved folder: its own row is
+        # saved in the same transaction, so a move that fails leaves the whole tree as it was.
+        with transaction.atomic():
+            return super().save(*args, **kwargs)
 
     def __str__(self):
         return self.name + f" ({self.budget})"
 
     # noinspection PyUnresolvedReferences
     def get_folder_path(self) -> str:
-        folder_path = ['mofreitas', 'clientes', self.user.email.__str__()]
-        current_folder = self.parent
-        while current_folder is not None:
-            folder_path.insert(3, current_folder.name)
-            current_folder = current_folder.parent
-        folder_path.append(self.name)
-        return "/".join(folder_path)
+        """
+        The path of the folder below MEDIA_ROOT, built from the stored ``path`` of its parent when there is one, or from
+        the names of its ancestors, read in a single query.
+        """
+        if self.parent_id is None:
+            names = list()
+        elif self.parent.path:
+            return f"{self.parent.path}/{self.name}"
+        else:
+            names = list(self.parent.get_ancestors(include_self=True).values_list('name', flat=True))
+        return "/".join(['mofreitas', 'clientes', self.user.email.__str__(), *names, self.name])
+
+    def relocate(self, old_path: str) -> int:
+        """
+        Moves the sub-folders and files of the folder from ``old_path`` to its current ``path`` after a rename or a
+        move: one UPDATE rewrites the path prefix of the sub-folders, another the name of the files, and the directory
+        is renamed once on disk, in the transaction of ``save``. Returns the number of files moved.
+        """
+        new_path = self.path
+        if not old_path or old_path == new_path:
+            return 0
+        start = len(old_path) + 1
+        with transaction.atomic():
+            self.get_descendants().filter(path__startswith=old_path + '/') \
+                .update(path=Concat(Value(new_path), Substr('path', start), output_field=models.TextField()))
+            moved = File.objects.filter(folder__in=self.get_descendants(include_self=True),
+                                        file__startswith=old_path + '/') \
+                .update(file=Concat(Value(new_path), Substr('file', start), output_field=models.CharField()))
+            if not update_folder_file_system(old_path, new_path):
+                logger.error(f"No folder found at '{old_path}' in the filesystem, creating '{new_path}'.")
+                create_path(target=new_path)
+        return moved
 
     class Meta:
         verbose_name: str = 'Folder'
@@ -88,6 +121,37 @@ class File(TimeStampedModel):
         constraints: list = [models.UniqueConstraint(fields=['file', 'folder'], name="unique_File")]
 
 
+class UploadSession(TimeStampedModel):
+    """
+    A resumable upload: the chunks are written at their offset in ``staging_path`` until ``size`` bytes arrived, and
+    the ``File`` is created when the upload is finalized with a matching SHA-256 ``checksum``.
+    """
+    id = HashidAutoField(prefix='upload_', primary_key=True)
+    user = models.ForeignKey(to=User, on_delete=models.CASCADE, verbose_name=_("Uploader"),
+                             related_name='upload_sessions')
+    folder = models.ForeignKey(Folder, on_delete=models.CASCADE, related_name='upload_sessions')
+    file_name = models.CharField(max_length=500, verbose_name=_("File Name"))
+    size = models.PositiveBigIntegerField(verbose_name=_("Size"))
+    offset = models.PositiveBigIntegerField(default=0, verbose_name=_("Offset"))
+    checksum = models.CharField(max_length=64, verbose_name=_("SHA-256"))
+
+    def __str__(self):
+        return f"{self.file_name} ({self.offset}/{self.size})"
+
+    @property
+    def staging_path(self) -> Path:
+        return Path(settings.FILE_UPLOAD_TEMP_DIR).joinpath('sessions', f"{self.pk}.part")
+
+    @property
+    def complete(self) -> bool:
+        return self.offset == self.size
+
+    class Meta:
+        verbose_name: str = 'Upload Session'
+        verbose_name_plural: str = 'Upload Sessions'
+        ordering = ("-created",)
+
+
 class LeftOverImage(TimeStampedModel):
     id = HashidAutoField(prefix='leftover_', primary_key=True)
     # file = ProtectedImageField(upload_to=upload_leftover_to)
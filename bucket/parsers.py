@@ -0,0 +1,15 @@
+from rest_framework.parsers import BaseParser
+
+
+class ChunkParser(BaseParser):
+    """
+    Body parser of the upload chunks: whatever their content type (``application/octet-stream`` usually), the bytes
+    are handed to the view as the unread stream of the request, which copies it to disk a block at a time.
+
+    Parsing rather than reading ``request.stream`` in the view keeps ``request.data`` usable by the authentication
+    classes, e.g. ``OAuth2Authentication`` reads ``request.POST`` before the view runs.
+    """
+    media_type = '*/*'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return stream
@@ -1,6 +1,23 @@
 from rest_framework import permissions
+
+from utilities.permissions import ModelPermissions
+
+
 class HasWW4Scope(permissions.BasePermission):
     def has_permission(self, request, view) -> bool:
         if request.auth:
             return "ww4" in request.auth.scopes
         return False
+
+
+class UploadPermissions(ModelPermissions):
+    """
+    Upload sessions create files: writing to them takes the permission to add a ``File``, reading them to view one.
+    """
+    perms_map = dict(ModelPermissions.perms_map, PUT=['%(app_label)s.add_%(model_name)s'],
+                     PATCH=['%(app_label)s.add_%(model_name)s'], DELETE=['%(app_label)s.add_%(model_name)s'])
+
+    def _queryset(self, view):
+        from bucket.models import File
+        return File.objects.all()
+
@@ -4,23 +4,26 @@ from pathlib import Path
 
 from django.conf import settings
 from django.core.files import File as DjangoFile
-from django.core.files.uploadedfile import InMemoryUploadedFile
+from django.core.files.uploadedfile import UploadedFile
+from django.db import transaction
 from django.db.models.query import QuerySet
 from hashid_field.rest import HashidSerializerCharField
 from rest_framework import serializers
 from rest_framework.reverse import reverse
 
-from bucket.models import File, Folder, LeftOverImage
+from bucket.models import File, Folder, LeftOverImage, UploadSession
 from users.models import User
 from utilities.fields import PrimaryKeyRelatedFieldHashed
 from utilities.functions import is_valid_sys_path
 from utilities.geo import create_polygon
+from utilities.serializers import SparseFieldsMixin
 
 
-class FolderSerializer(serializers.ModelSerializer):
+class FolderSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     id = HashidSerializerCharField(read_only=True, required=False)
     files = PrimaryKeyRelatedFieldHashed(library="bucket", model=File, many=True, read_only=True)
-    parent = PrimaryKeyRelatedFieldHashed(library="bucket", model=Folder, required=False, allow_null=True)
+    parent = PrimaryKeyRelatedFieldHashed(library="bucket", model=Folder, required=False, allow_null=True,
+                                          user_field='user')
     user = PrimaryKeyRelatedFieldHashed(library="users", model=User)
     url = serializers.SerializerMethodField()
 
@@ -36,6 +39,14 @@ class FolderSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("The folder name is not valid!")
         return value
 
+    def validate_target(self, name, parent, user) -> None:
+        """
+        Rejects a rename or move onto a directory that already exists on disk before anything is saved.
+        """
+        target = Folder(name=name, parent=parent, user=user).get_folder_path()
+        if target != self.instance.path and settings.MEDIA_ROOT.joinpath(target).exists():
+            raise serializers.ValidationError({'name': f"There is already a folder at '{target}'."})
+
     def validate(self, attrs):
         parent = attrs.get('parent')
         name = attrs.get('name', self.instance.name if self.instance else None)
@@ -50,6 +61,9 @@ class FolderSerializer(serializers.ModelSerializer):
 
         parent = parent or (self.instance.parent if self.instance else None)
 
+        if self.instance is not None:
+            self.validate_target(name, parent, user=attrs.get('user', self.instance.user))
+
         if not parent:
             return attrs
 
@@ -73,6 +87,7 @@ class FolderSerializer(serializers.ModelSerializer):
     class Meta(object):
         model = Folder
         fields = ('id', 'name', 'files', 'path', "budget", "parent", 'user', 'modified', 'created', "url")
+        expandable = dict(files='bucket.serializers.FileSerializers', parent='bucket.serializers.FolderSerializer')
         extra_kwargs = {
             'id': {'read_only': True},
             'path': {'read_only': True}
@@ -100,9 +115,9 @@ class FolderCreateByEmailSerializer(FolderSerializer):
         }
 
 
-class FileSerializers(serializers.ModelSerializer):
+class FileSerializers(SparseFieldsMixin, serializers.ModelSerializer):
     id = HashidSerializerCharField(read_only=True, required=False)
-    folder = PrimaryKeyRelatedFieldHashed(library="bucket", model=Folder)
+    folder = PrimaryKeyRelatedFieldHashed(library="bucket", model=Folder, user_field='user')
     url = serializers.SerializerMethodField()
     path = serializers.SerializerMethodField()
 
@@ -134,7 +149,7 @@ class FileSerializers(serializers.ModelSerializer):
     def create(self, validated_data):
         folder = validated_data.get('folder')
         file = validated_data.get('file')
-        path: Path = Path(settings.MEDIA_ROOT).joinpath(folder.get_folder_path()).joinpath(file.name)
+        path: Path = Path(settings.MEDIA_ROOT).joinpath(folder.path).joinpath(file.name)
         if path.exists():
             new_name = path.stem + '.tmp'
             new_path = path.with_name(new_name)
@@ -145,6 +160,7 @@ class FileSerializers(serializers.ModelSerializer):
     class Meta(object):
         model = File
         fields = ('id', 'folder', 'file', 'path', 'file_name', 'file_type', 'modified', 'created', 'url')
+        expandable = dict(folder='bucket.serializers.FolderSerializer')
         extra_kwargs = dict(
             file_name=dict(read_only=True),
             file_type=dict(read_only=True)
@@ -244,33 +260,106 @@ class LeftOverCornersUpdate(serializers.Serializer):
 
 class ManyFilesSerializer(serializers.Serializer):
     id = HashidSerializerCharField(read_only=True, required=False)
-    folder = PrimaryKeyRelatedFieldHashed(library="bucket", model=Folder)
+    folder = PrimaryKeyRelatedFieldHashed(library="bucket", model=Folder, user_field='user')
 
     def __init__(self, *args, **kwargs):
         file_fields = kwargs.pop('file_fields', None)
         super().__init__(*args, **kwargs)
+        self.failed: list = list()
         if file_fields:
             field_update_dict = {field: serializers.FileField(required=False, write_only=True) for field in file_fields}
             self.fields.update(**field_update_dict)
 
     def create(self, validated_data):
-        validated_data_copy = validated_data.copy()
-        validated_files = []
-        files = list()
-        for key, value in validated_data_copy.items():
-            if isinstance(value, InMemoryUploadedFile):
-                validated_files.append(value)
-                validated_data.pop(key)
-        for file in validated_files:
-            data = validated_data.copy()
-            data.update(dict(folder=str(data.get('folder').id)))
-            data.update(dict(file=file))
-            serializer = FileSerializers(data=data, context=self.context)
-            serializer.is_valid(raise_exception=True)
-            files.append(serializer.save())
-        if not files:
+        """
+        Stores every uploaded file of the payload in the folder and returns the created ``File`` rows; the files that
+        could not be stored are listed in ``failed``.
+
+        Uploads larger than FILE_UPLOAD_MAX_MEMORY_SIZE were already streamed to FILE_UPLOAD_TEMP_DIR, on the same
+        volume as MEDIA_ROOT, so storing them is a rename. The names are checked against the folder in one query and
+        the rows are inserted with a single ``bulk_create``.
+        """
+        folder: Folder = validated_data.pop('folder')
+        uploads = [value for value in validated_data.values() if isinstance(value, UploadedFile)]
+        if not uploads:
             raise serializers.ValidationError("No file found in the payload!")
-        return files[0]
+        names = [os.path.splitext(upload.name) for upload in uploads]
+        taken = set(File.objects.filter(folder=folder, file_name__in={file_name for file_name, _ in names})
+                    .values_list('file_name', 'file_type'))
+        self.failed, files = list(), list()
+        for upload, (file_name, file_type) in zip(uploads, names):
+            if (file_name, file_type) in taken:
+                self.failed.append(dict(file=upload.name,
+                                        error="A file with the same name already exists in the parent folder"))
+                continue
+            taken.add((file_name, file_type))
+            instance = File(folder=folder, file_name=file_name, file_type=file_type)
+            # A file left on disk without a row, or stored by a concurrent batch whose row isn't inserted yet, keeps
+            # its name: the storage picks an available one and the row follows it.
+            instance.file.save(upload.name, upload, save=False)
+            instance.file_name, instance.file_type = os.path.splitext(os.path.basename(instance.file.name))
+            files.append(instance)
+        try:
+            with transaction.atomic():
+                created = File.objects.bulk_create(files)
+                if any(instance.pk is None for instance in created):
+                    # The backend doesn't return the ids of a bulk insert (sqlite): read the rows back.
+                    created = list(File.objects.select_related('folder')
+                                   .filter(folder=folder, file__in=[instance.file.name for instance in files]))
+        except Exception:
+            for instance in files:
+                instance.file.delete(save=False)
+            raise
+        return created
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    id = HashidSerializerCharField(read_only=True, required=False)
+    folder = PrimaryKeyRelatedFieldHashed(library="bucket", model=Folder, user_field='user')
+    url = serializers.SerializerMethodField()
+
+    def get_url(self, obj) -> str:
+        return self.context.get('request').build_absolute_uri(reverse("storages:upload-detail", kwargs=dict(pk=obj.pk)))
+
+    @staticmethod
+    def validate_file_name(value):
+        if os.path.basename(value) != value or not is_valid_sys_path(value) or value in ('.', '..'):
+            raise serializers.ValidationError("The file name is not valid!")
+        return value
+
+    @staticmethod
+    def validate_checksum(value):
+        if not re.match(r'^[0-9a-fA-F]{64}$', value):
+            raise serializers.ValidationError("The checksum must be the hex SHA-256 digest of the file.")
+        return value.lower()
+
+    @staticmethod
+    def validate_size(value):
+        limit = settings.UPLOAD_SESSIONS.get('MAX_SIZE')
+        if not value or value > limit:
+            raise serializers.ValidationError(f"The size must be between 1 and {limit} bytes.")
+        return value
+
+    def validate(self, attrs):
+        file_name, file_type = os.path.splitext(attrs.get('file_name'))
+        if File.objects.filter(folder=attrs.get('folder'), file_name=file_name, file_type=file_type).exists():
+            raise serializers.ValidationError("A file with the same name already exists in the parent folder")
+        return attrs
+
+    def create(self, validated_data):
+        validated_data.update(dict(user=self.context.get('request').user))
+        session: UploadSession = super(UploadSessionSerializer, self).create(validated_data)
+        session.staging_path.parent.mkdir(parents=True, exist_ok=True)
+        session.staging_path.touch()
+        return session
+
+    class Meta(object):
+        model = UploadSession
+        fields = ('id', 'folder', 'file_name', 'size', 'checksum', 'offset', 'modified', 'created', 'url')
+        extra_kwargs = dict(
+            offset=dict(read_only=True),
+            checksum=dict(help_text="Hex SHA-256 digest of the whole file, checked when the upload is finalized."),
+        )
 
 
 def validate_file_path(value):
@@ -3,15 +3,14 @@ import os
 import shutil
 from pathlib import Path
 
-import signal_disabler
 from django.conf import settings
-from django.db.models.signals import pre_delete, post_save, pre_save
+from django.db.models.signals import pre_delete, post_save
 from django.dispatch import receiver
 
-from bucket.models import File, Folder, LeftOverImage
-from utilities.functions import get_folder_path, create_path, create_folders_for_furniture, \
-    delete_folders_for_furniture, delete_budget_folder, map_budget_entities, batch_delete, update_folder_for_furniture \
-    , update_folder_file_system
+from bucket.models import File, Folder, LeftOverImage, UploadSession
+from entities.tasks import start_cascade_delete
+from utilities.functions import create_path, create_folders_for_furniture, \
+    create_folders_for_furnitures, delete_folders_for_furniture, delete_budget_folder, update_folder_for_furniture
 from utilities.signals import furniture_created, furniture_deleted, budget_deleted, furniture_changed
 from utilities.payloads import leftover_entity
 
@@ -30,15 +29,24 @@ def on_file_delete(sender, instance, **kwargs):
         os.remove(path.__str__())
 
 
+@receiver(pre_delete, sender=UploadSession)
+def on_upload_session_delete(sender, instance: UploadSession, **kwargs):
+    if instance.staging_path.exists():
+        os.remove(instance.staging_path)
+
+
 @receiver(pre_delete, sender=Folder)
 def on_folder_delete(sender, instance, **kwargs):
-    folder_path: Path = settings.MEDIA_ROOT.joinpath(instance.get_folder_path())
+    folder_path: Path = settings.MEDIA_ROOT.joinpath(instance.path)
     if folder_path.exists():
         shutil.rmtree(folder_path)
 
 
 @receiver(furniture_created)
-def on_furniture_post_created(sender, pks, **kwargs):
+def on_furniture_post_created(sender, pks, entities=None, owners=None, **kwargs):
+    if entities:
+        create_folders_for_furnitures(entities=entities, owners=owners)
+        return
     for pk in pks:
         create_folders_for_furniture(furniture_id=pk)
 
@@ -51,45 +59,22 @@ def on_furniture_post_delete(sender, pk, **kwargs):
 @receiver(budget_deleted)
 def on_budget_post_delete(sender, pk, **kwargs):
     delete_budget_folder(budget_id=pk)
-    entities_map = map_budget_entities(budget_id=pk)
-    batch_delete(entities_map=entities_map)
+    start_cascade_delete(root_type='Budget', root_id=pk)
 
 
 @receiver(post_save, sender=Folder)
 def on_folder_post_save(sender: Folder, instance: Folder, created, **kwargs):
     if created:
-        path = get_folder_path(instance)
-        instance.path = path
-        create_path(target=path)
-        instance.save()
+        # Folder.save already stored the path.
+        create_path(target=instance.path)
 
 
-@signal_disabler.disable()
 @receiver(post_save, sender=Folder)
-def update_file_paths(sender, instance, created, **kwargs):
-    if not created:
-        for descendant in instance.get_descendants(include_self=True):
-            for file in descendant.files.all():
-                file.file.name = file.get_file_path()
-                file.save()
-
-
-@receiver(pre_save, sender=Folder)
-def on_folder_pre_save(sender: Folder, instance: Folder, **kwargs):
-    if instance.tracker.has_changed('path') and instance.tracker.previous('path') is not None:
+def on_folder_relocated(sender: Folder, instance: Folder, created, **kwargs):
+    if not created and instance.tracker.has_changed('path') and instance.tracker.previous('path') is not None:
         old_path = instance.tracker.previous('path')
-        new_path = instance.path
-        new_parent = instance.parent
-        if update_folder_file_system(old_path, new_path, new_parent=new_parent):
-            logger.info(f"Successfully updated the folder from '{old_path}' to '{instance.path}'.")
-        else:
-            logger.error(f"No folder found at '{old_path}' in the filesystem.")
-            create_path(target=old_path)
-            if update_folder_file_system(old_path, new_path, new_parent=new_parent):
-                logger.info(f"Successfully created the folder from '{old_path}' to '{instance.path}'.")
-            else:
-                logger.error(f"An error occurred while attempting to update the folder. No corresponding folder was "
-                             f"found in the filesystem at the following location: '{old_path}'.")
+        moved = instance.relocate(old_path)
+        logger.info(f"Successfully moved the folder from '{old_path}' to '{instance.path}' ({moved} files).")
 
 
 @receiver(post_save, sender=LeftOverImage)
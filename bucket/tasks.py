@@ -0,0 +1,26 @@
+import logging
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+
+from bucket.models import UploadSession
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def purge_upload_sessions_task() -> int:
+    """
+    Drops the resumable uploads left unfinished for longer than ``UPLOAD_SESSIONS['TTL']`` hours, with their staged
+    data (see ``on_upload_session_delete``).
+    """
+    expired = timezone.now() - timedelta(hours=settings.UPLOAD_SESSIONS.get('TTL'))
+    count = 0
+    for session in UploadSession.objects.filter(modified__lt=expired):
+        session.delete()
+        count += 1
+    if count:
+        logger.info(f"Purged {count} expired upload sessions.")
+    return count
@@ -0,0 +1,232 @@
+import hashlib
+import shutil
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from oauth2_provider.models import get_access_token_model, get_application_model
+from rest_framework.test import APIClient
+
+from bucket.models import File, Folder
+from users.models import User
+from utilities.health import orion_health
+
+
+class BucketTestCase(TestCase):
+    """
+    Runs against a temporary MEDIA_ROOT, as a superuser (no Orion round-trip on save) with the broker reported up.
+    """
+
+    def setUp(self):
+        media = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        media_settings = override_settings(MEDIA_ROOT=media, FILE_UPLOAD_TEMP_DIR=media.joinpath('uploads'))
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        self.media = media
+        health = mock.patch.object(orion_health, 'allow_request', return_value=True)
+        health.start()
+        self.addCleanup(health.stop)
+        self.user = User.objects.create_superuser(username='admin', email='admin@example.com', password='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.budget = 'urn:ngsi-ld:Budget:1'
+        self.root = Folder.objects.create(name='budget', user=self.user, budget=self.budget)
+        self.project = Folder.objects.create(name='project', parent=self.root, user=self.user, budget=self.budget)
+
+    def create_file(self, folder: Folder, name: str, content: bytes = b'data') -> File:
+        path = self.media.joinpath(folder.path, f"{name}.txt")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+        return File.objects.create(file_name=name, file_type='.txt', folder=folder, file=f"{folder.path}/{name}.txt")
+
+
+class FolderRelocationTests(BucketTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.file = self.create_file(self.project, 'cut-list')
+
+    def test_rename_moves_the_subtree(self):
+        old_path = self.root.path
+        self.root.name = 'renamed'
+        self.root.save()
+        self.project.refresh_from_db()
+        self.file.refresh_from_db()
+        self.assertEqual(self.project.path, f"{self.root.path}/project")
+        self.assertEqual(self.file.file.name, f"{self.root.path}/project/cut-list.txt")
+        self.assertTrue(self.media.joinpath(self.file.file.name).is_file())
+        self.assertFalse(self.media.joinpath(old_path).exists())
+
+    def test_failed_move_leaves_the_tree_unchanged(self):
+        old_path = self.root.path
+        self.media.joinpath(self.root.path).with_name('taken').mkdir(parents=True)
+        self.root.name = 'taken'
+        with self.assertRaises(ValidationError):
+            self.root.save()
+        self.root.refresh_from_db()
+        self.project.refresh_from_db()
+        self.assertEqual(self.root.path, old_path)
+        self.assertEqual(self.project.path, f"{old_path}/project")
+
+    def test_rename_onto_an_existing_directory_is_rejected(self):
+        self.media.joinpath(self.root.path).with_name('taken').mkdir(parents=True)
+        response = self.client.patch(reverse('storages:folder-detail', kwargs=dict(pk=self.root.pk)),
+                                     dict(name='taken'), format='json')
+        self.assertEqual(response.status_code, 400)
+        self.root.refresh_from_db()
+        self.assertEqual(self.root.name, 'budget')
+
+
+class ListQueryCountTests(BucketTestCase):
+    """
+    The folder and file lists run the same number of queries whatever the number of rows on the page.
+    """
+
+    def add_items(self, count: int) -> None:
+        start = Folder.objects.count()
+        for i in range(start, start + count):
+            folder = Folder.objects.create(name=f'module-{i}', parent=self.project, user=self.user, budget=self.budget)
+            self.create_file(folder, f'part-{i}')
+
+    def assertConstantQueries(self, url: str) -> None:
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.add_items(2)
+        with CaptureQueriesContext(connection) as few:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        self.add_items(6)
+        with self.assertNumQueries(len(few)):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_folder_list(self):
+        self.assertConstantQueries(reverse('storages:folder-list'))
+
+    def test_folder_list_expanding_files(self):
+        self.assertConstantQueries(reverse('storages:folder-list') + '?expand=files')
+
+    def test_folder_list_expanding_parent(self):
+        self.assertConstantQueries(reverse('storages:folder-list') + '?expand=parent')
+
+    def test_folder_list_with_sparse_fields(self):
+        self.assertConstantQueries(reverse('storages:folder-list') + '?fields=id,name,path')
+        self.assertConstantQueries(reverse('storages:folder-list') + '?fields=id,files&expand=files')
+
+    def test_file_list(self):
+        self.assertConstantQueries(reverse('storages:file-list'))
+
+    def test_file_list_expanding_folder(self):
+        self.assertConstantQueries(reverse('storages:file-list') + '?expand=folder')
+
+    def test_file_list_with_sparse_fields(self):
+        self.assertConstantQueries(reverse('storages:file-list') + '?fields=id,file_name,path')
+
+
+class BatchUploadTests(BucketTestCase):
+
+    def upload(self, **contents):
+        files = dict((name.replace('.', '_'), SimpleUploadedFile(name, content)) for name, content in contents.items())
+        return self.client.post(reverse('storages:file-batch-files'), dict(folder=str(self.project.pk), **files),
+                                format='multipart')
+
+    def test_batch_answers_with_the_created_rows(self):
+        response = self.upload(**{'first.txt': b'1', 'second.txt': b'2'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data['success']), 2)
+        self.assertTrue(all(item['id'] for item in response.data['success']))
+        self.assertEqual(set(self.project.files.values_list('file_name', flat=True)), {'first', 'second'})
+
+    def test_existing_name_is_reported(self):
+        self.create_file(self.project, 'first')
+        response = self.upload(**{'first.txt': b'1', 'second.txt': b'2'})
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual([error['file'] for error in response.data['errors']], ['first.txt'])
+        self.assertEqual(len(response.data['success']), 1)
+
+    def test_file_without_a_row_is_not_overwritten(self):
+        leftover = self.media.joinpath(self.project.path, 'first.txt')
+        leftover.write_bytes(b'old')
+        response = self.upload(**{'first.txt': b'new'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(leftover.read_bytes(), b'old')
+        stored: File = self.project.files.get()
+        self.assertNotEqual(stored.file.name, f"{self.project.path}/first.txt")
+        self.assertEqual(stored.get_file_path(), stored.file.name)
+        self.assertEqual(self.media.joinpath(stored.file.name).read_bytes(), b'new')
+
+
+class ResumableUploadTests(BucketTestCase):
+    content = b'0123456789'
+
+    def setUp(self):
+        super().setUp()
+        # The tablets authenticate with an OAuth2 bearer token.
+        application = get_application_model().objects.create(
+            name='tablet', user=self.user, client_type='confidential', authorization_grant_type='password')
+        get_access_token_model().objects.create(user=self.user, application=application, token='upload-token',
+                                                scope='read write', expires=timezone.now() + timedelta(hours=1))
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer upload-token')
+
+    def start(self) -> str:
+        response = self.client.post(reverse('storages:upload-list'), dict(
+            folder=str(self.project.pk), file_name='panel.dxf', size=len(self.content),
+            checksum=hashlib.sha256(self.content).hexdigest()), format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.data['id']
+
+    def send(self, pk: str, offset: int, data: bytes):
+        return self.client.put(reverse('storages:upload-chunk', kwargs=dict(pk=pk)), data=data,
+                               content_type='application/octet-stream', HTTP_UPLOAD_OFFSET=str(offset))
+
+    def test_upload_with_a_bearer_token(self):
+        pk = self.start()
+        response = self.send(pk, 0, self.content[:6])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['offset'], 6)
+        self.assertEqual(self.send(pk, 6, self.content[6:]).status_code, 200)
+        response = self.client.post(reverse('storages:upload-finalize', kwargs=dict(pk=pk)))
+        self.assertEqual(response.status_code, 201)
+        stored: File = self.project.files.get()
+        self.assertEqual(self.media.joinpath(stored.file.name).read_bytes(), self.content)
+
+    def test_finalize_keeps_a_file_without_a_row(self):
+        pk = self.start()
+        self.send(pk, 0, self.content)
+        leftover = self.media.joinpath(self.project.path, 'panel.dxf')
+        leftover.write_bytes(b'old')
+        self.assertEqual(self.client.post(reverse('storages:upload-finalize', kwargs=dict(pk=pk))).status_code, 201)
+        self.assertEqual(leftover.read_bytes(), b'old')
+        stored: File = self.project.files.get()
+        self.assertEqual(stored.get_file_path(), stored.file.name)
+        self.assertEqual(self.media.joinpath(stored.file.name).read_bytes(), self.content)
+
+    def test_second_finalize_is_not_found(self):
+        pk = self.start()
+        self.send(pk, 0, self.content)
+        url = reverse('storages:upload-finalize', kwargs=dict(pk=pk))
+        self.assertEqual(self.client.post(url).status_code, 201)
+        self.assertEqual(self.client.post(url).status_code, 404)
+        self.assertEqual(self.project.files.count(), 1)
+
+    def test_token_without_a_user_is_refused(self):
+        application = get_application_model().objects.create(
+            name='service', user=self.user, client_type='confidential', authorization_grant_type='client-credentials')
+        get_access_token_model().objects.create(user=None, application=application, token='service-token',
+                                                scope='read write', expires=timezone.now() + timedelta(hours=1))
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer service-token')
+        self.assertEqual(self.client.get(reverse('storages:upload-list')).status_code, 403)
+
+    def test_chunk_at_another_offset_is_refused(self):
+        pk = self.start()
+        self.send(pk, 0, self.content[:6])
+        response = self.send(pk, 0, self.content[:6])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response['Upload-Offset'], '6')
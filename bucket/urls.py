@@ -9,6 +9,7 @@ router = DefaultRouter()
 router.register("folder", views.FolderViewSet, basename="folder")
 router.register("file", views.FileViewSet, basename="file")
 router.register("leftover", views.LeftOverImageViewSet, basename="leftover")
+router.register("upload", views.UploadSessionViewSet, basename="upload")
 # router.register("cut-list", views.FurnitureCutListViewSet, basename="cut-list")
 # router.register("easm", views.EASMViewSet, basename="easm")
 urlpatterns = router.urls
@@ -1,19 +1,29 @@
+import hashlib
 import os
+from pathlib import Path
 
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
 from django.db.models.query import QuerySet
 from oauth2_provider.contrib.rest_framework import TokenHasReadWriteScope
-from rest_framework import viewsets, status
+from rest_framework import viewsets, status, mixins
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.generics import GenericAPIView
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
 
-from bucket.models import Folder, File, LeftOverImage
+from bucket.models import Folder, File, LeftOverImage, UploadSession
 from bucket.serializers import FolderSerializer, FileSerializers, ManyFilesSerializer, LeftOverImageSerializer, \
-    LeftOverCornersUpdate, UpdateFileNameSerializer, FolderCreateByEmailSerializer, CreateFileFromPathSerializer
+    LeftOverCornersUpdate, UpdateFileNameSerializer, FolderCreateByEmailSerializer, CreateFileFromPathSerializer, \
+    UploadSessionSerializer
+from bucket.parsers import ChunkParser
+from bucket.permissions import UploadPermissions
 from utilities.exceptions import FileAccess
 from utilities.permissions import ModelPermissions, HasConnection
+from utilities.serializers import SparseFieldsMixin
 from . import filters
 
 
@@ -37,12 +47,23 @@ class FolderViewSet(viewsets.ModelViewSet):
         return super(FolderViewSet, self).get_serializer_class()
 
     def get_queryset(self):
-        qs: QuerySet = super().get_queryset()
+        qs: QuerySet = super().get_queryset().select_related('parent', 'user')
+        if SparseFieldsMixin.wants(self.request, 'files'):
+            qs = qs.prefetch_related('files')
+        if SparseFieldsMixin.expands(self.request, 'parent'):
+            qs = qs.prefetch_related('parent__files')
         if self.request.user:
             if self.request.user.is_customer:
                 qs = qs.filter(user=self.request.user)
         return qs
 
+    def perform_update(self, serializer):
+        try:
+            serializer.save()
+        except DjangoValidationError as error:
+            # The directory of the folder could not be moved on disk; Folder.save rolled the tree back.
+            raise ValidationError(error.messages)
+
     @action(detail=False, methods=['post'])
     def create_folder_with_email(self, request):
         serializer = self.get_serializer(data=request.data)
@@ -52,7 +73,8 @@ class FolderViewSet(viewsets.ModelViewSet):
 
 
 class FileViewSet(viewsets.ModelViewSet):
-    queryset = File.objects.all()
+    # The path of every file is read from its folder.
+    queryset = File.objects.select_related('folder')
     serializer_class = FileSerializers
     batch_files_serializer = ManyFilesSerializer
     permission_classes = [HasConnection | TokenHasReadWriteScope,
@@ -62,6 +84,8 @@ class FileViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         qs: QuerySet = super().get_queryset()
+        if SparseFieldsMixin.expands(self.request, 'folder'):
+            qs = qs.prefetch_related('folder__files')
         if self.request.user and self.request.user.is_customer:
             qs = qs.filter(folder__user=self.request.user)
         return qs
@@ -79,9 +103,10 @@ class FileViewSet(viewsets.ModelViewSet):
     def batch_files(self, request: Request):
         serializer = self.get_serializer(data=request.data, file_fields=list(request.FILES.keys()))
         serializer.is_valid(raise_exception=True)
-        self.perform_create(serializer)
-        headers = self.get_success_headers(serializer.data)
-        return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
+        files = serializer.save()
+        success = FileSerializers(files, many=True, context=self.get_serializer_context()).data
+        return Response(dict(success=success, errors=serializer.failed),
+                        status=status.HTTP_207_MULTI_STATUS if serializer.failed else status.HTTP_201_CREATED)
 
     @action(detail=True, methods=['patch', 'put'], serializer_class=UpdateFileNameSerializer)
     def update_file_name(self, request, pk=None):
@@ -98,6 +123,127 @@ class FileViewSet(viewsets.ModelViewSet):
         return super().update(request, *args, **kwargs)
 
 
+class UploadSessionViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, mixins.ListModelMixin,
+                           mixins.DestroyModelMixin, viewsets.GenericViewSet):
+    """
+    Resumable uploads of large files, in three steps:
+
+    1. ``POST upload/`` with the folder, the file name, its size and its SHA-256 opens a session.
+    2. ``PUT upload/<id>/chunk/`` with the raw bytes as body and their position in the ``Upload-Offset`` header writes
+       a chunk to the staging area. A chunk sent at another offset than the session's is refused with a 409 carrying
+       the current offset, which ``GET upload/<id>/`` also returns: the client resumes from there after a failure.
+    3. ``POST upload/<id>/finalize/`` verifies the checksum, moves the file into the folder with a single rename and
+       creates its ``File``.
+
+    ``DELETE upload/<id>/`` aborts the upload.
+
+    Sessions belong to the user that opened them, so tokens without a user (client credentials) are refused.
+    """
+    queryset = UploadSession.objects.select_related('folder')
+    serializer_class = UploadSessionSerializer
+    permission_classes = [HasConnection | TokenHasReadWriteScope,
+                          UploadPermissions | IsAdminUser | TokenHasReadWriteScope,
+                          IsAuthenticated]
+    OFFSET_HEADER = 'Upload-Offset'
+
+    def get_queryset(self):
+        return super().get_queryset().filter(user=self.request.user)
+
+    def conflict(self, session: UploadSession, message: str) -> Response:
+        return Response(dict(message=message, offset=session.offset, size=session.size),
+                        status=status.HTTP_409_CONFLICT, headers={self.OFFSET_HEADER: str(session.offset)})
+
+    @staticmethod
+    def write(session: UploadSession, stream, offset: int) -> int:
+        """
+        Copies the body of the request at ``offset`` of the staged file, a block at a time.
+        """
+        written, block = 0, settings.UPLOAD_SESSIONS.get('BLOCK_SIZE')
+        with open(session.staging_path, 'r+b') as staged:
+            staged.seek(offset)
+            while True:
+                data = stream.read(block) if stream is not None else b''
+                if not data:
+                    return written
+                if offset + written + len(data) > session.size:
+                    raise ValidationError(f"The chunk goes past the size of the file ({session.size} bytes).")
+                staged.write(data)
+                written += len(data)
+
+    @action(detail=True, methods=['put'], parser_classes=[ChunkParser])
+    def chunk(self, request: Request, pk=None):
+        try:
+            offset = int(request.headers.get(self.OFFSET_HEADER))
+        except (TypeError, ValueError):
+            raise ValidationError(f"The {self.OFFSET_HEADER} header must be the position of the chunk in the file.")
+        with transaction.atomic():
+            session: UploadSession = UploadSession.objects.select_for_update().filter(pk=self.get_object().pk).first()
+            if session is None:
+                raise NotFound("The upload was already finalized or aborted.")
+            if offset != session.offset:
+                return self.conflict(session, "The chunk does not start at the offset of the upload.")
+            # ChunkParser hands the body over unread; an empty body has nothing to parse.
+            stream = request.data if hasattr(request.data, 'read') else None
+            session.offset += self.write(session, stream, offset)
+            session.save(update_fields=['offset', 'modified'])
+        return Response(dict(offset=session.offset, size=session.size), status=status.HTTP_200_OK,
+                        headers={self.OFFSET_HEADER: str(session.offset)})
+
+    @staticmethod
+    def digest(path: Path, size: int) -> str:
+        sha256 = hashlib.sha256()
+        with open(path, 'r+b') as staged:
+            # Drop what an interrupted chunk may have left past the end.
+            staged.truncate(size)
+            for data in iter(lambda: staged.read(settings.UPLOAD_SESSIONS.get('BLOCK_SIZE')), b''):
+                sha256.update(data)
+        return sha256.hexdigest()
+
+    @action(detail=True, methods=['post'])
+    def finalize(self, request: Request, pk=None):
+        pk = self.get_object().pk
+        with transaction.atomic():
+            # Locked like in ``chunk``: a concurrent finalize waits here and then finds the session gone.
+            session: UploadSession = UploadSession.objects.select_for_update().select_related('folder') \
+                .filter(pk=pk).first()
+            if session is None:
+                raise NotFound("The upload was already finalized or aborted.")
+            if not session.complete:
+                return self.conflict(session, "The upload is not complete.")
+            matches = self.digest(session.staging_path, session.size) == session.checksum
+            if matches:
+                instance = self.store(session)
+            else:
+                session.offset = 0
+                session.save(update_fields=['offset', 'modified'])
+        if not matches:
+            raise ValidationError("The checksum of the uploaded file does not match, upload it again.")
+        return Response(FileSerializers(instance, context=self.get_serializer_context()).data,
+                        status=status.HTTP_201_CREATED)
+
+    @staticmethod
+    def store(session: UploadSession) -> File:
+        """
+        Moves the staged file into the folder and creates its ``File``. A file already on disk under the same name is
+        kept: the storage picks an available name and the row follows it.
+        """
+        file_name, file_type = os.path.splitext(session.file_name)
+        if File.objects.filter(folder=session.folder, file_name=file_name, file_type=file_type).exists():
+            raise ValidationError("A file with the same name already exists in the parent folder")
+        instance = File(folder=session.folder, file_name=file_name, file_type=file_type)
+        name = instance.file.field.generate_filename(instance, session.file_name)
+        name = instance.file.storage.get_available_name(name)
+        target: Path = Path(settings.MEDIA_ROOT).joinpath(name)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        instance.file.name = str(name)
+        instance.file_name, instance.file_type = os.path.splitext(os.path.basename(instance.file.name))
+        instance.save()
+        # Same volume: the file appears in the folder at once, complete.
+        os.replace(session.staging_path, target)
+        session.delete()
+        return instance
+
+
 class LeftOverImageViewSet(viewsets.ModelViewSet):
     queryset = LeftOverImage.objects.all()
     serializer_class = LeftOverImageSerializer
@@ -5,13 +5,12 @@ from rest_framework.viewsets import ModelViewSet
 from chat.filter import MessageFilterSet
 from chat.models import Message
 from chat.serializer import MessageSerializer
-from utilities.permissions import HasConnection
 
 
 class MessageViewSet(ModelViewSet):
     queryset = Message.objects.all()
     serializer_class = MessageSerializer
-    permission_classes = [HasConnection, IsAuthenticated]
+    permission_classes = [IsAuthenticated]
     filterset_class = MessageFilterSet
 
     def get_queryset(self):
@@ -1,3 +1,17 @@
 from django.contrib import admin
 
-# Register your models here.
+from entities.models import CascadeDeleteJob, EntityRelationship
+
+
+@admin.register(CascadeDeleteJob)
+class CascadeDeleteJobAdmin(admin.ModelAdmin):
+    list_display = ('root_type', 'root_id', 'status', 'discovered', 'deleted', 'attempts', 'modified')
+    list_filter = ('status', 'root_type')
+    search_fields = ('root_id',)
+
+
+@admin.register(EntityRelationship)
+class EntityRelationshipAdmin(admin.ModelAdmin):
+    list_display = ('id', 'type', 'parent', 'owner', 'synced')
+    list_filter = ('type',)
+    search_fields = ('id', 'parent', 'owner')
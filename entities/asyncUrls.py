@@ -0,0 +1,53 @@
+from django.urls import path, re_path
+
+from . import asyncViews as views
+
+app_name = 'async'
+namespace = app_name
+
+urlpatterns = [
+    path('assembly/', views.AsyncAssemblyView.as_view(), name='assembly'),
+    re_path(r'^assembly/(?P<pk>[\w\-:]+:[\w\-:]+:[\w\-:]+)/$', views.AsyncAssemblyViewDetail.as_view(),
+            name='assembly-detail'),
+    re_path(r'^assembly/(?P<pk>[\w\-:]+:[\w\-:]+:[\w\-:]+)/attrs$',
+            views.AsyncAssemblyViewDetailCreateAttrs.as_view(), name='assembly-detail-attrs'),
+    path('budget/', views.AsyncBudgetView.as_view(), name='budget'),
+    re_path(r'^budget/(?P<pk>[\w\-:]+:[\w\-:]+:[\w\-:]+)/$', views.AsyncBudgetViewDetail.as_view(),
+            name='budget-detail'),
+    path('consumable/', views.AsyncConsumableView.as_view(), name='consumable'),
+    re_path(r'^consumable/(?P<pk>[\w\-:]+:[\w\-:]+:[\w\-:]+)/$', views.AsyncConsumableViewDetail.as_view(),
+            name='consumable-detail'),
+    re_path(r'^consumable/(?P<pk>[\w\-:]+:[\w\-:]+:[\w\-:]+)/attrs$',
+            views.AsyncConsumableViewDetailCreateAttrs.as_view(), name='consumable-detail-attrs'),
+    path('expedition/', views.AsyncExpeditionView.as_view(), name='expedition'),
+    re_path(r'^expedition/(?P<pk>[\w\-:]+:[\w\-:]+:[\w\-:]+)/$', views.AsyncExpeditionViewDetail.as_view(),
+            name='expedition-detail'),
+    re_path(r'^expedition/(?P<pk>[\w\-:]+:[\w\-:]+:[\w\-:]+)/attrs$',
+            views.AsyncExpeditionViewDetailCreateAttrs.as_view(), name='expedition-detail-attrs'),
+    path('machine/', views.AsyncMachineView.as_view(), name='machine'),
+    re_path(r'^machine/(?P<pk>[\w\-:]+:[\w\-:]+:[\w\-:]+)/$', views.AsyncMachineViewDetail.as_view(),
+            name='machine-detail'),
+    re_path(r'^machine/(?P<pk>[\w\-:]+:[\w\-:]+:[\w\-:]+)/attrs$',
+            views.AsyncMachineViewDetailCreateAttrs.as_view(), name='machine-detail-attrs'),
+    path('part/', views.AsyncPartView.as_view(), name='part'),
+    re_path(r'^part/(?P<pk>[\w\-:]+:[\w\-:]+:[\w\-:]+)/$', views.AsyncPartViewDetail.as_view(), name='part-detail'),
+    re_path(r'^part/(?P<pk>[\w\-:]+:[\w\-:]+:[\w\-:]+)/attrs$', views.AsyncPartViewDetailCreateAttrs.as_view(),
+            name='part-detail-attrs'),
+    path('project/', views.AsyncProjectView.as_view(), name='project'),
+    path('project/<str:pk>/', views.AsyncProjectViewDetail.as_view(), name='project-detail'),
+    path('furniture/', views.AsyncFurnitureView.as_view(), name='furniture'),
+    re_path(r'^furniture/(?P<pk>[\w\-:]+:[\w\-:]+:[\w\-:]+)/$', views.AsyncFurnitureViewDetail.as_view(),
+            name='furniture-detail'),
+    path('worker-task/', views.AsyncWorkerTaskView.as_view(), name='worker-task'),
+    re_path(r'^worker-task/(?P<pk>[\w\-:]+:[\w\-:]+:[\w\-:]+)/$', views.AsyncWorkerTaskDetail.as_view(),
+            name='worker-task-detail'),
+    re_path(r'^worker-task/(?P<pk>[\w\-:]+:[\w\-:]+:[\w\-:]+)/attrs$',
+            views.AsyncWorkerTaskDetailCreateAttrs.as_view(), name='worker-task-detail-attrs'),
+    path('module/', views.AsyncModuleView.as_view(), name='module'),
+    re_path(r'^module/(?P<pk>[\w\-:]+:[\w\-:]+:[\w\-:]+)/$', views.AsyncModuleViewDetail.as_view(),
+            name='module-detail'),
+    re_path(r'^module/(?P<pk>[\w\-:]+:[\w\-:]+:[\w\-:]+)/attrs$', views.AsyncModuleViewDetailCreateAttrs.as_view(),
+            name='module-detail-attrs'),
+    path('group/', views.AsyncGroupView.as_view(), name='group'),
+    path('group/<str:pk>/', views.AsyncGroupViewDetail.as_view(), name='group-detail'),
+]
@@ -0,0 +1,154 @@
+from utilities.asyncViewsMixin import (AsyncOrionInterfaceView, AsyncOrionListMixin, AsyncOrionCreateMixin,
+                                      AsyncOrionRetrieveMixin, AsyncOrionDeleteMixin, AsyncOrionUpdateMixin,
+                                      AsyncOrionCreateAttrsMixin, AsyncOrderByRetrieveMixin, AsyncOrderByDeleteMixin,
+                                      AsyncOrderByUpdateMixin, AsyncOrderByCreateAttrsMixin)
+from .views import (AssemblyView, AssemblyViewDetail, AssemblyViewDetailCreateAttrs, BudgetView, BudgetViewDetail,
+                    ConsumableView, ConsumableViewDetail, ConsumableViewDetailCreateAttrs, ExpeditionView,
+                    ExpeditionViewDetail, ExpeditionViewDetailCreateAttrs, MachineView, MachineViewDetail,
+                    MachineViewDetailCreateAttrs, PartView, PartViewDetail, PartViewDetailCreateAttrs, ProjectView,
+                    ProjectViewDetail, FurnitureView, FurnitureViewDetail, WorkerTaskView, WorkerTaskDetail,
+                    WorkerTaskDetailCreateAttrs, ModuleView, ModuleViewDetail, ModuleViewDetailCreateAttrs, GroupView,
+                    GroupViewDetail)
+
+# The async views reuse the scoping (generate_params) and ownership checks (verify_orderBy) of their sync
+# counterparts; only the handlers are replaced. Budget, project and furniture writes fire signals that update the
+# database and the file system, so those entities are only exposed read-only here.
+
+READ_ONLY = ['get', 'head', 'options']
+
+
+class AsyncAssemblyView(AsyncOrionListMixin, AsyncOrionCreateMixin, AsyncOrionInterfaceView, AssemblyView):
+    orion_permissions = dict(get='view_assembly', post='add_assembly')
+
+
+class AsyncAssemblyViewDetail(AsyncOrderByRetrieveMixin, AsyncOrderByDeleteMixin, AsyncOrderByUpdateMixin,
+                              AsyncOrionInterfaceView, AssemblyViewDetail):
+    orion_permissions = dict(get='view_assembly', delete='delete_assembly', patch='change_assembly')
+
+
+class AsyncAssemblyViewDetailCreateAttrs(AsyncOrderByCreateAttrsMixin, AsyncOrionInterfaceView,
+                                         AssemblyViewDetailCreateAttrs):
+    orion_permissions = dict(post='change_assembly')
+
+
+class AsyncBudgetView(AsyncOrionListMixin, AsyncOrionInterfaceView, BudgetView):
+    http_method_names = READ_ONLY
+    orion_permissions = dict(get='view_budget')
+
+
+class AsyncBudgetViewDetail(AsyncOrderByRetrieveMixin, AsyncOrionInterfaceView, BudgetViewDetail):
+    http_method_names = READ_ONLY
+    orion_permissions = dict(get='view_budget')
+
+
+class AsyncConsumableView(AsyncOrionListMixin, AsyncOrionCreateMixin, AsyncOrionInterfaceView, ConsumableView):
+    orion_permissions = dict(get='view_consumable', post='add_consumable')
+
+
+class AsyncConsumableViewDetail(AsyncOrderByRetrieveMixin, AsyncOrderByDeleteMixin, AsyncOrderByUpdateMixin,
+                                AsyncOrionInterfaceView, ConsumableViewDetail):
+    orion_permissions = dict(get='view_consumable', delete='delete_consumable', patch='change_consumable')
+
+
+class AsyncConsumableViewDetailCreateAttrs(AsyncOrderByCreateAttrsMixin, AsyncOrionInterfaceView,
+                                           ConsumableViewDetailCreateAttrs):
+    orion_permissions = dict(post='change_consumable')
+
+
+class AsyncExpeditionView(AsyncOrionListMixin, AsyncOrionCreateMixin, AsyncOrionInterfaceView, ExpeditionView):
+    orion_permissions = dict(get='view_expedition', post='add_expedition')
+
+
+class AsyncExpeditionViewDetail(AsyncOrderByRetrieveMixin, AsyncOrderByDeleteMixin, AsyncOrderByUpdateMixin,
+                                AsyncOrionInterfaceView, ExpeditionViewDetail):
+    orion_permissions = dict(get='view_expedition', delete='delete_expedition', patch='change_expedition')
+
+
+class AsyncExpeditionViewDetailCreateAttrs(AsyncOrderByCreateAttrsMixin, AsyncOrionInterfaceView,
+                                           ExpeditionViewDetailCreateAttrs):
+    orion_permissions = dict(post='change_expedition')
+
+
+class AsyncMachineView(AsyncOrionListMixin, AsyncOrionCreateMixin, AsyncOrionInterfaceView, MachineView):
+    orion_permissions = dict(get='view_machine', post='add_machine')
+
+
+class AsyncMachineViewDetail(AsyncOrionRetrieveMixin, AsyncOrionDeleteMixin, AsyncOrionUpdateMixin,
+                             AsyncOrionInterfaceView, MachineViewDetail):
+    orion_permissions = dict(get='view_machine', delete='delete_machine', patch='change_machine')
+
+
+class AsyncMachineViewDetailCreateAttrs(AsyncOrionCreateAttrsMixin, AsyncOrionInterfaceView,
+                                        MachineViewDetailCreateAttrs):
+    orion_permissions = dict(post='change_machine')
+
+
+class AsyncPartView(AsyncOrionListMixin, AsyncOrionCreateMixin, AsyncOrionInterfaceView, PartView):
+    orion_permissions = dict(get='view_part', post='add_part')
+
+
+class AsyncPartViewDetail(AsyncOrderByRetrieveMixin, AsyncOrderByDeleteMixin, AsyncOrderByUpdateMixin,
+                          AsyncOrionInterfaceView, PartViewDetail):
+    orion_permissions = dict(get='view_part', delete='delete_part', patch='change_part')
+
+
+class AsyncPartViewDetailCreateAttrs(AsyncOrderByCreateAttrsMixin, AsyncOrionInterfaceView,
+                                     PartViewDetailCreateAttrs):
+    orion_permissions = dict(post='change_part')
+
+
+class AsyncProjectView(AsyncOrionListMixin, AsyncOrionInterfaceView, ProjectView):
+    http_method_names = READ_ONLY
+    orion_permissions = dict(get='view_project')
+
+
+class AsyncProjectViewDetail(AsyncOrderByRetrieveMixin, AsyncOrionInterfaceView, ProjectViewDetail):
+    http_method_names = READ_ONLY
+    orion_permissions = dict(get='view_project')
+
+
+class AsyncFurnitureView(AsyncOrionListMixin, AsyncOrionInterfaceView, FurnitureView):
+    http_method_names = READ_ONLY
+    orion_permissions = dict(get='view_furniture')
+
+
+class AsyncFurnitureViewDetail(AsyncOrderByRetrieveMixin, AsyncOrionInterfaceView, FurnitureViewDetail):
+    http_method_names = READ_ONLY
+    orion_permissions = dict(get='view_furniture')
+
+
+class AsyncWorkerTaskView(AsyncOrionListMixin, AsyncOrionCreateMixin, AsyncOrionInterfaceView, WorkerTaskView):
+    orion_permissions = dict(get='view_workerTask', post='add_workerTask')
+
+
+class AsyncWorkerTaskDetail(AsyncOrderByRetrieveMixin, AsyncOrderByDeleteMixin, AsyncOrderByUpdateMixin,
+                            AsyncOrionInterfaceView, WorkerTaskDetail):
+    orion_permissions = dict(get='view_workerTask', delete='delete_workerTask', patch='change_workerTask')
+
+
+class AsyncWorkerTaskDetailCreateAttrs(AsyncOrionCreateAttrsMixin, AsyncOrionInterfaceView,
+                                       WorkerTaskDetailCreateAttrs):
+    orion_permissions = dict(post='change_workerTask')
+
+
+class AsyncModuleView(AsyncOrionListMixin, AsyncOrionCreateMixin, AsyncOrionInterfaceView, ModuleView):
+    orion_permissions = dict(get='view_module', post='add_module')
+
+
+class AsyncModuleViewDetail(AsyncOrderByRetrieveMixin, AsyncOrderByDeleteMixin, AsyncOrderByUpdateMixin,
+                            AsyncOrionInterfaceView, ModuleViewDetail):
+    orion_permissions = dict(get='view_module', delete='delete_module', patch='change_module')
+
+
+class AsyncModuleViewDetailCreateAttrs(AsyncOrionCreateAttrsMixin, AsyncOrionInterfaceView,
+                                       ModuleViewDetailCreateAttrs):
+    orion_permissions = dict(post='change_module')
+
+
+class AsyncGroupView(AsyncOrionListMixin, AsyncOrionCreateMixin, AsyncOrionInterfaceView, GroupView):
+    orion_permissions = dict(get='view_group', post='add_group')
+
+
+class AsyncGroupViewDetail(AsyncOrderByRetrieveMixin, AsyncOrderByDeleteMixin, AsyncOrderByUpdateMixin,
+                           AsyncOrionInterfaceView, GroupViewDetail):
+    orion_permissions = dict(get='view_group', delete='delete_group', patch='change_group')
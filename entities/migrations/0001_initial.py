@@ -0,0 +1,42 @@
+# Generated by Django 3.2.18 on 2026-10-17 12:00
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django_extensions.db.fields
+import hashid_field.field
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CascadeDeleteJob',
+            fields=[
+                ('created', django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, verbose_name='created')),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name='modified')),
+                ('id', hashid_field.field.HashidAutoField(alphabet='abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ1234567890', min_length=16, prefix='job_', primary_key=True, serialize=False)),
+                ('root_type', models.CharField(max_length=50, verbose_name='Root Type')),
+                ('root_id', models.CharField(db_index=True, max_length=255, verbose_name='Root Entity')),
+                ('include_root', models.BooleanField(default=False, verbose_name='Delete Root Entity')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20, verbose_name='Status')),
+                ('discovered', models.PositiveIntegerField(default=0, verbose_name='Entities Discovered')),
+                ('deleted', models.PositiveIntegerField(default=0, verbose_name='Entities Deleted')),
+                ('remaining', models.JSONField(blank=True, null=True, verbose_name='Entities Remaining')),
+                ('errors', models.JSONField(blank=True, default=list, verbose_name='Errors')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Attempts')),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='cascade_delete_jobs', to=settings.AUTH_USER_MODEL, verbose_name='Requested By')),
+            ],
+            options={
+                'verbose_name': 'Cascade Delete Job',
+                'verbose_name_plural': 'Cascade Delete Jobs',
+                'ordering': ('-created',),
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 3.2.18 on 2026-10-17 14:00
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('entities', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EntityRelationship',
+            fields=[
+                ('id', models.CharField(max_length=255, primary_key=True, serialize=False, verbose_name='Entity')),
+                ('type', models.CharField(db_index=True, max_length=50, verbose_name='Type')),
+                ('parent', models.CharField(blank=True, db_index=True, max_length=255, null=True, verbose_name='Parent')),
+                ('owner', models.CharField(blank=True, db_index=True, max_length=255, null=True, verbose_name='Owner')),
+                ('synced', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Synced')),
+            ],
+            options={
+                'verbose_name': 'Entity Relationship',
+                'verbose_name_plural': 'Entity Relationships',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='entityrelationship',
+            index=models.Index(fields=['owner', 'type'], name='entity_rel_owner_type'),
+        ),
+    ]
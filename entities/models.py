@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from django_extensions.db.models import TimeStampedModel
+from hashid_field.field import HashidAutoField
+
+from users.models import User
+
+
+class CascadeDeleteJob(TimeStampedModel):
+    """
+    Deletion of every Orion entity below a root entity (an Owner, Budget or Project), run by a Celery worker.
+
+    ``remaining`` stays empty until the entity graph below the root has been walked; from then on it holds the ids
+    that are still to be deleted and shrinks after every batch, so a re-run of the job resumes where it stopped
+    instead of walking the graph again.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', _('Pending')
+        RUNNING = 'running', _('Running')
+        COMPLETED = 'completed', _('Completed')
+        FAILED = 'failed', _('Failed')
+
+    id = HashidAutoField(prefix='job_', primary_key=True)
+    root_type = models.CharField(max_length=50, verbose_name=_("Root Type"))
+    root_id = models.CharField(max_length=255, db_index=True, verbose_name=_("Root Entity"))
+    include_root = models.BooleanField(default=False, verbose_name=_("Delete Root Entity"))
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING,
+                              verbose_name=_("Status"))
+    requested_by = models.ForeignKey(to=User, on_delete=models.SET_NULL, null=True, blank=True,
+                                     related_name="cascade_delete_jobs", verbose_name=_("Requested By"))
+    discovered = models.PositiveIntegerField(default=0, verbose_name=_("Entities Discovered"))
+    deleted = models.PositiveIntegerField(default=0, verbose_name=_("Entities Deleted"))
+    remaining = models.JSONField(null=True, blank=True, verbose_name=_("Entities Remaining"))
+    errors = models.JSONField(default=list, blank=True, verbose_name=_("Errors"))
+    attempts = models.PositiveIntegerField(default=0, verbose_name=_("Attempts"))
+
+    # A running job that saved no progress for this long lost its worker and may be claimed again.
+    STALE_AFTER = timedelta(minutes=15)
+
+    @property
+    def is_discovered(self) -> bool:
+        return self.remaining is not None
+
+    @property
+    def is_running(self) -> bool:
+        return self.status == self.Status.RUNNING and timezone.now() - self.modified < self.STALE_AFTER
+
+    @property
+    def progress(self) -> float:
+        if not self.is_discovered:
+            return 0.0
+        if not self.discovered:
+            return 1.0
+        return round(self.deleted / self.discovered, 4)
+
+    def __str__(self):
+        return f"{self.root_type} {self.root_id} ({self.status})"
+
+    class Meta:
+        verbose_name: str = 'Cascade Delete Job'
+        verbose_name_plural: str = 'Cascade Delete Jobs'
+        ordering = ("-created",)
+
+
+class EntityRelationship(models.Model):
+    """
+    Local copy of the relationship of an Orion entity to its parent (``hasBudget``, ``belongsTo``, ...) and of the
+    Owner the entity ultimately belongs to, so that ownership checks are answered by an indexed lookup instead of a
+    query to the broker. Maintained by ``utilities.projection``.
+    """
+    id = models.CharField(max_length=255, primary_key=True, verbose_name=_("Entity"))
+    type = models.CharField(max_length=50, db_index=True, verbose_name=_("Type"))
+    parent = models.CharField(max_length=255, null=True, blank=True, db_index=True, verbose_name=_("Parent"))
+    owner = models.CharField(max_length=255, null=True, blank=True, db_index=True, verbose_name=_("Owner"))
+    synced = models.DateTimeField(default=timezone.now, verbose_name=_("Synced"))
+
+    def __str__(self):
+        return self.id
+
+    class Meta:
+        verbose_name: str = 'Entity Relationship'
+        verbose_name_plural: str = 'Entity Relationships'
+        indexes: list = [models.Index(fields=['owner', 'type'], name="entity_rel_owner_type")]
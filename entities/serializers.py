@@ -1,6 +1,9 @@
+from hashid_field.rest import HashidSerializerCharField
 from rest_framework import serializers
 import re
 
+from entities.models import CascadeDeleteJob
+
 
 class CheckSerializer(serializers.Serializer):
     field = serializers.ChoiceField(choices=['username', 'email', 'vat'], required=True)
@@ -22,3 +25,19 @@ class CheckSerializer(serializers.Serializer):
         if not re.match(regex, value):
             raise serializers.ValidationError("Invalid format")
         return value
+
+
+class CascadeDeleteJobSerializer(serializers.ModelSerializer):
+    id = HashidSerializerCharField(read_only=True)
+    remaining = serializers.SerializerMethodField()
+    progress = serializers.FloatField(read_only=True)
+
+    @staticmethod
+    def get_remaining(obj: CascadeDeleteJob):
+        return len(obj.remaining) if obj.is_discovered else None
+
+    class Meta:
+        model = CascadeDeleteJob
+        fields = ('id', 'root_type', 'root_id', 'include_root', 'status', 'discovered', 'deleted', 'remaining',
+                  'progress', 'errors', 'attempts', 'created', 'modified')
+        read_only_fields = fields
@@ -1,14 +1,16 @@
 from django.dispatch import receiver
 
 from emailManager.tasks import send_budget_changed_task
-from utilities.functions import create_budget_folder, map_project_entities, batch_delete
-from utilities.signals import budget_changed, save_budget, project_deleted
+from entities.tasks import start_cascade_delete
+from utilities.functions import create_budget_folder, entity_value
+from utilities.scope import owner_scope
+from utilities.signals import budget_changed, save_budget, project_deleted, project_created, budget_deleted, \
+    furniture_created, furniture_deleted
 
 
 @receiver(project_deleted)
 def on_project_deleted(sender, pk, **kwargs):
-    entities_map = map_project_entities(project_id=pk)
-    batch_delete(entities_map)
+    start_cascade_delete(root_type='Project', root_id=pk)
 
 
 @receiver(budget_changed)
@@ -19,3 +21,33 @@ def budget_changed(sender, data, budget, **kwargs):
 @receiver(save_budget)
 def on_save_budget(sender, budget_id, **kwargs):
     create_budget_folder(budget_id=budget_id)
+
+
+@receiver(save_budget)
+@receiver(budget_deleted)
+def invalidate_budget_scope(sender, budget_id=None, pk=None, **kwargs):
+    owner_scope.invalidate_budget(budget_id=budget_id or pk)
+
+
+@receiver(project_created)
+def invalidate_created_project_scope(sender, pk, owner_id, **kwargs):
+    owner_scope.invalidate(owner_id)
+
+
+@receiver(project_deleted)
+def invalidate_project_scope(sender, pk, **kwargs):
+    owner_scope.invalidate_project(project_id=pk)
+
+
+@receiver(furniture_created)
+def invalidate_created_furniture_scope(sender, pks, entities=None, owners=None, **kwargs):
+    if entities:
+        # The payloads that were sent to Orion already carry the budget of every furniture.
+        owner_scope.invalidate_budgets((entity_value(entity, 'hasBudget') for entity in entities), owners=owners)
+        return
+    owner_scope.invalidate_furniture(*pks)
+
+
+@receiver(furniture_deleted)
+def invalidate_furniture_scope(sender, pk, **kwargs):
+    owner_scope.invalidate_furniture(pk)
@@ -0,0 +1,121 @@
+import logging
+from typing import Optional
+
+from celery import shared_task
+from django.db import transaction
+
+from entities.models import CascadeDeleteJob
+from utilities.bulk import bulk_operations
+from utilities.graph import entity_graph
+from utilities.projection import projection
+
+logger = logging.getLogger(__name__)
+
+
+def start_cascade_delete(root_type: str, root_id: str, include_root: bool = False, user=None) -> CascadeDeleteJob:
+    """
+    Records a cascade delete below ``root_id`` and queues it once the current transaction commits. Asking twice for
+    the same root reuses the unfinished job, so a repeated request never walks or deletes twice.
+    """
+    with transaction.atomic():
+        unfinished = CascadeDeleteJob.objects.select_for_update().filter(root_id=root_id).exclude(
+            status=CascadeDeleteJob.Status.COMPLETED)
+        job = unfinished.first()
+        if job is None:
+            job = CascadeDeleteJob.objects.create(root_type=root_type, root_id=root_id, include_root=include_root,
+                                                  requested_by=user)
+        queue(job)
+    return job
+
+
+def resume_cascade_delete(job_id: str) -> CascadeDeleteJob:
+    """
+    Queues an unfinished job again, unless a worker is still running it.
+    """
+    with transaction.atomic():
+        job = CascadeDeleteJob.objects.select_for_update().get(pk=job_id)
+        queue(job)
+    return job
+
+
+def queue(job: CascadeDeleteJob) -> None:
+    if job.status == CascadeDeleteJob.Status.COMPLETED or job.is_running:
+        return
+    job_id = str(job.id)
+    transaction.on_commit(lambda: cascade_delete_task.delay(job_id=job_id))
+
+
+def claim(job_id: str) -> Optional[CascadeDeleteJob]:
+    """
+    Marks the job as running for the calling worker. Returns None when the job is finished or another worker is
+    running it, so two workers never delete the same ids.
+    """
+    with transaction.atomic():
+        job: CascadeDeleteJob = CascadeDeleteJob.objects.select_for_update().filter(pk=job_id).first()
+        if job is None or job.status == CascadeDeleteJob.Status.COMPLETED or job.is_running:
+            return None
+        job.status = CascadeDeleteJob.Status.RUNNING
+        job.attempts += 1
+        job.save(update_fields=['status', 'attempts', 'modified'])
+    return job
+
+
+def discover(job: CascadeDeleteJob) -> None:
+    entities_map = entity_graph.walk(job.root_type, [job.root_id])
+    ids = [pk for entities in entities_map.values() for pk in entities]
+    if job.include_root:
+        ids.append(job.root_id)
+    job.remaining = list(dict.fromkeys(ids))
+    job.discovered = len(job.remaining)
+    job.save(update_fields=['remaining', 'discovered', 'modified'])
+
+
+def delete_remaining(job: CascadeDeleteJob) -> None:
+    """
+    Deletes the remaining ids batch by batch, saving the progress after each one. Ids Orion no longer knows count as
+    deleted; ids that failed stay in ``remaining`` for the next run.
+    """
+    pending = list(job.remaining)
+    step = bulk_operations.chunk_size * bulk_operations.max_workers
+    failed, errors = list(), list()
+    for start in range(0, len(pending), step):
+        report = bulk_operations.delete(pending[start:start + step])
+        gone = [error for error in report.errors if bulk_operations.error_status(error) == 404]
+        rejected = [error for error in report.errors if bulk_operations.error_status(error) != 404]
+        failed.extend(error.get('entityId') for error in rejected)
+        errors.extend(rejected)
+        job.deleted += len(report.success) + len(gone)
+        if projection.enabled:
+            projection.remove(report.success + [error.get('entityId') for error in gone])
+        job.remaining = failed + pending[start + step:]
+        job.errors = errors
+        job.save(update_fields=['deleted', 'remaining', 'errors', 'modified'])
+
+
+@shared_task(bind=True, max_retries=5, default_retry_delay=60)
+def cascade_delete_task(self, job_id: str) -> Optional[str]:
+    job = claim(job_id)
+    if job is None:
+        return None
+    try:
+        if not job.is_discovered:
+            discover(job)
+        delete_remaining(job)
+    except Exception as error:
+        logger.exception(f"Cascade delete {job_id} of {job.root_id} stopped: {error}")
+        job.status = CascadeDeleteJob.Status.FAILED
+        job.save(update_fields=['status', 'modified'])
+        raise self.retry(exc=error)
+    job.status = CascadeDeleteJob.Status.FAILED if job.remaining else CascadeDeleteJob.Status.COMPLETED
+    job.save(update_fields=['status', 'modified'])
+    if job.remaining and any(bulk_operations.error_status(error) is None for error in job.errors):
+        # Orion was unreachable for part of the batch: try the leftovers again later.
+        raise self.retry()
+    return job.status
+
+
+@shared_task
+def reconcile_projection_task() -> Optional[dict]:
+    if projection.enabled:
+        return projection.reconcile()
+    return None
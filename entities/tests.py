@@ -0,0 +1,64 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from entities import tasks
+from entities.models import CascadeDeleteJob
+from utilities.bulk import BulkReport
+
+
+class CascadeDeleteJobTests(TestCase):
+    root_id = 'urn:ngsi-ld:Budget:1'
+
+    def create_job(self, **kwargs) -> CascadeDeleteJob:
+        return CascadeDeleteJob.objects.create(root_type='Budget', root_id=self.root_id, **kwargs)
+
+    def test_start_queues_a_single_job_per_root(self):
+        with mock.patch.object(tasks.cascade_delete_task, 'delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                job = tasks.start_cascade_delete(root_type='Budget', root_id=self.root_id)
+            with self.captureOnCommitCallbacks(execute=True):
+                again = tasks.start_cascade_delete(root_type='Budget', root_id=self.root_id)
+        self.assertEqual(job.pk, again.pk)
+        self.assertEqual(CascadeDeleteJob.objects.count(), 1)
+        self.assertEqual(delay.call_count, 2)
+
+    def test_running_job_is_not_queued_again(self):
+        job = self.create_job(status=CascadeDeleteJob.Status.RUNNING)
+        with mock.patch.object(tasks.cascade_delete_task, 'delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                tasks.start_cascade_delete(root_type='Budget', root_id=self.root_id)
+                tasks.resume_cascade_delete(job.pk)
+        delay.assert_not_called()
+
+    def test_running_job_is_not_claimed_twice(self):
+        job = self.create_job(status=CascadeDeleteJob.Status.RUNNING, remaining=['urn:ngsi-ld:Part:1'])
+        with mock.patch.object(tasks.bulk_operations, 'delete') as delete:
+            self.assertIsNone(tasks.cascade_delete_task(job_id=str(job.pk)))
+        delete.assert_not_called()
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 0)
+
+    def test_stale_running_job_is_claimed(self):
+        job = self.create_job(status=CascadeDeleteJob.Status.RUNNING)
+        CascadeDeleteJob.objects.filter(pk=job.pk).update(
+            modified=timezone.now() - CascadeDeleteJob.STALE_AFTER - timedelta(minutes=1))
+        claimed = tasks.claim(str(job.pk))
+        self.assertIsNotNone(claimed)
+        self.assertEqual(claimed.attempts, 1)
+
+    def test_run_deletes_the_remaining_ids(self):
+        job = self.create_job(status=CascadeDeleteJob.Status.FAILED, discovered=3,
+                              remaining=['urn:ngsi-ld:Part:1', 'urn:ngsi-ld:Part:2', 'urn:ngsi-ld:Part:3'])
+        report = BulkReport('delete')
+        report.success = ['urn:ngsi-ld:Part:1']
+        report.errors = [dict(entityId='urn:ngsi-ld:Part:2', error=dict(status=404)),
+                         dict(entityId='urn:ngsi-ld:Part:3', error=dict(status=400))]
+        with mock.patch.object(tasks.bulk_operations, 'delete', return_value=report):
+            self.assertEqual(tasks.cascade_delete_task(job_id=str(job.pk)), CascadeDeleteJob.Status.FAILED)
+        job.refresh_from_db()
+        self.assertEqual(job.deleted, 2)
+        self.assertEqual(job.remaining, ['urn:ngsi-ld:Part:3'])
+        self.assertEqual(job.attempts, 1)
@@ -1,4 +1,5 @@
 from django.urls import path, re_path
+from rest_framework.routers import SimpleRouter
 
 from . import views
 
@@ -65,5 +66,9 @@ urlpatterns = [
             name='module-detail-attrs'),
     path('group/', views.GroupView.as_view(), name='group'),
     path('group/<str:pk>/', views.GroupViewDetail.as_view(), name='group-detail'),
-    path('check', views.CheckUnique.as_view(), name='check')
+    path('check', views.CheckUnique.as_view(), name='check'),
 ]
+
+router = SimpleRouter()
+router.register("cascade-job", views.CascadeDeleteJobViewSet, basename="cascade-job")
+urlpatterns += router.urls
@@ -1,9 +1,14 @@
 from django.db.models.query import QuerySet
+from oauth2_provider.contrib.rest_framework import TokenHasReadWriteScope
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
 from rest_framework.generics import GenericAPIView
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from utilities.functions import get_projects_based_on_owner, generate_urn_identifier, get_budgets, get_furniture, \
-    convert_list_into_string
+from utilities.functions import generate_urn_identifier, convert_list_into_string
+from utilities.permissions import IsAdminOrWorker
+from utilities.scope import owner_scope
 from utilities.signals import budget_changed, budget_deleted
 from utilities.views import (HomeAPIView, OwnerViewEntity, OwnerViewEntityDetail, OrganizationViewEntity,
                              OrganizationViewEntityDetail, WorkerViewEntity, WorkerViewEntityDetail,
@@ -21,7 +26,9 @@ from utilities.views import (HomeAPIView, OwnerViewEntity, OwnerViewEntityDetail
                              FurnitureEntityDetailCreateAttrs, WorkerTaskEntityDetailCreateAttrs,
                              ModuleEntityDetailCreateAttrs,
                              )
-from .serializers import CheckSerializer
+from .models import CascadeDeleteJob
+from .serializers import CheckSerializer, CascadeDeleteJobSerializer
+from .tasks import resume_cascade_delete
 
 
 class AssemblyView(OrderByAssemblyEntityView):
@@ -35,7 +42,7 @@ class AssemblyView(OrderByAssemblyEntityView):
             params = dict(type=self.entity_type)
         elif user.is_customer:
             owner_id = generate_urn_identifier(_type="Owner", uid=user.customer.id)
-            projects: list = get_projects_based_on_owner(owner_id=owner_id)
+            projects: list = owner_scope.projects(owner_id=owner_id)
             params = dict(q=f'belongsTo=={convert_list_into_string(projects)}',
                           type=self.entity_type)
         params.update(dict(count='true'))
@@ -50,7 +57,7 @@ class AssemblyViewDetail(OrderByAssemblyEntityViewDetail):
         if user.is_customer:
             if payload.get('belongsTo').get('object'):
                 owner_id = generate_urn_identifier(_type="Owner", uid=user.customer.id)
-                return payload.get('belongsTo').get('object') in get_projects_based_on_owner(owner_id=owner_id)
+                return owner_scope.owns(owner_id, payload.get('belongsTo').get('object'), kind='projects')
             return False
         return True
 
@@ -63,7 +70,7 @@ class AssemblyViewDetailCreateAttrs(OrderByAssemblyEntityViewDetailCreateAttrs):
         if user.is_customer:
             if payload.get('belongsTo').get('object'):
                 owner_id = generate_urn_identifier(_type="Owner", uid=user.customer.id)
-                return payload.get('belongsTo').get('object') in get_projects_based_on_owner(owner_id=owner_id)
+                return owner_scope.owns(owner_id, payload.get('belongsTo').get('object'), kind='projects')
             return False
         return True
 
@@ -81,9 +88,9 @@ class BudgetViewDetail(OrderByBudgetEntityViewDetail):
         return response
 
     def patch(self, request, pk):
-        response = self.get_object(pk)
-        if response.status_code == 200:
-            budget_changed.send(sender=self.__class__, data=request.data, budget=response.json())
+        budget = self.fetch_payload(pk)
+        if budget is not None:
+            budget_changed.send(sender=self.__class__, data=request.data, budget=budget)
         return super().patch(request, pk)
 
 
@@ -91,9 +98,9 @@ class BudgetViewDetailCreateAttrs(OrderByBudgetEntityViewDetailCreateAttrs):
     entity_type = 'Budget'
 
     def post(self, request, pk):
-        response = self.get_object(pk)
-        if response.status_code == 200:
-            budget_changed.send(sender=self.__class__, data=request.data, budget=response.json())
+        budget = self.fetch_payload(pk)
+        if budget is not None:
+            budget_changed.send(sender=self.__class__, data=request.data, budget=budget)
         return super().post(request, pk)
 
 
@@ -108,7 +115,7 @@ class ConsumableView(ConsumableViewEntity):
             params = dict(type=self.entity_type)
         elif user.is_customer:
             owner_id = generate_urn_identifier(_type="Owner", uid=user.customer.id)
-            projects: list = get_projects_based_on_owner(owner_id=owner_id)
+            projects: list = owner_scope.projects(owner_id=owner_id)
             params = dict(q=f'belongsTo=={convert_list_into_string(projects)}',
                           type=self.entity_type)
         params.update(dict(count='true'))
@@ -125,7 +132,7 @@ class ConsumableViewDetail(ConsumableViewEntityDetail):
         if user.is_customer:
             if payload.get('belongsTo').get('object'):
                 owner_id = generate_urn_identifier(_type="Owner", uid=user.customer.id)
-                return payload.get('belongsTo').get('object') in get_projects_based_on_owner(owner_id=owner_id)
+                return owner_scope.owns(owner_id, payload.get('belongsTo').get('object'), kind='projects')
             return False
         return True
 
@@ -138,7 +145,7 @@ class ConsumableViewDetailCreateAttrs(ConsumableViewEntityDetailCreateAttrs):
         if user.is_customer:
             if payload.get('belongsTo').get('object'):
                 owner_id = generate_urn_identifier(_type="Owner", uid=user.customer.id)
-                return payload.get('belongsTo').get('object') in get_projects_based_on_owner(owner_id=owner_id)
+                return owner_scope.owns(owner_id, payload.get('belongsTo').get('object'), kind='projects')
             return False
         return True
 
@@ -154,7 +161,7 @@ class ExpeditionView(ExpeditionViewEntity):
             params = dict(type=self.entity_type)
         elif user.is_customer:
             owner_id = generate_urn_identifier(_type="Owner", uid=user.customer.id)
-            projects: list = get_projects_based_on_owner(owner_id=owner_id)
+            projects: list = owner_scope.projects(owner_id=owner_id)
             params = dict(q=f'belongsTo=={convert_list_into_string(ids=projects)}',
                           type=self.entity_type)
         params.update(dict(count='true'))
@@ -169,7 +176,7 @@ class ExpeditionViewDetail(ExpeditionViewEntityDetail):
         if user.is_customer:
             if payload.get('belongsTo').get('object'):
                 owner_id = generate_urn_identifier(_type="Owner", uid=user.customer.id)
-                return payload.get('belongsTo').get('object') in get_projects_based_on_owner(owner_id=owner_id)
+                return owner_scope.owns(owner_id, payload.get('belongsTo').get('object'), kind='projects')
             return False
         return True
 
@@ -182,7 +189,7 @@ class ExpeditionViewDetailCreateAttrs(ExpeditionViewEntityDetailCreateAttrs):
         if user.is_customer:
             if payload.get('belongsTo').get('object'):
                 owner_id = generate_urn_identifier(_type="Owner", uid=user.customer.id)
-                return payload.get('belongsTo').get('object') in get_projects_based_on_owner(owner_id=owner_id)
+                return owner_scope.owns(owner_id, payload.get('belongsTo').get('object'), kind='projects')
             return False
         return True
 
@@ -228,7 +235,7 @@ class PartView(PartViewEntity):
             params = dict(type=self.entity_type)
         elif user.is_customer:
             owner_id = generate_urn_identifier(_type="Owner", uid=user.customer.id)
-            projects: list = get_projects_based_on_owner(owner_id=owner_id)
+            projects: list = owner_scope.projects(owner_id=owner_id)
             params = dict(q=f'belongsTo=={convert_list_into_string(projects)}',
                           type=self.entity_type)
         params.update(dict(count='true'))
@@ -245,7 +252,7 @@ class PartViewDetail(PartViewEntityDetail):
         if user.is_customer:
             if payload.get('belongsTo').get('object'):
                 owner_id = generate_urn_identifier(_type="Owner", uid=user.customer.id)
-                return payload.get('belongsTo').get('object') in get_projects_based_on_owner(owner_id=owner_id)
+                return owner_scope.owns(owner_id, payload.get('belongsTo').get('object'), kind='projects')
             return False
         return True
 
@@ -258,7 +265,7 @@ class PartViewDetailCreateAttrs(PartViewEntityDetailCreateAttrs):
         if user.is_customer:
             if payload.get('belongsTo').get('object'):
                 owner_id = generate_urn_identifier(_type="Owner", uid=user.customer.id)
-                return payload.get('belongsTo').get('object') in get_projects_based_on_owner(owner_id=owner_id)
+                return owner_scope.owns(owner_id, payload.get('belongsTo').get('object'), kind='projects')
             return False
         return True
 
@@ -314,7 +321,7 @@ class LeftoverDetail(LeftOverEntityDetail):
         if user.is_customer:
             if payload.get('belongsTo').get('object'):
                 owner_id = generate_urn_identifier(_type="Owner", uid=user.customer.id)
-                return payload.get('belongsTo').get('object') in get_projects_based_on_owner(owner_id=owner_id)
+                return owner_scope.owns(owner_id, payload.get('belongsTo').get('object'), kind='projects')
             return False
         return True
 
@@ -327,7 +334,7 @@ class LeftoverDetailCreateAttrs(LeftOverEntityDetailCreateAttrs):
         if user.is_customer:
             if payload.get('belongsTo').get('object'):
                 owner_id = generate_urn_identifier(_type="Owner", uid=user.customer.id)
-                return payload.get('belongsTo').get('object') in get_projects_based_on_owner(owner_id=owner_id)
+                return owner_scope.owns(owner_id, payload.get('belongsTo').get('object'), kind='projects')
             return False
         return True
 
@@ -359,7 +366,7 @@ class FurnitureView(FurnitureEntity):
             params = dict(type=self.entity_type)
         elif user.is_customer:
             owner_id = generate_urn_identifier(_type="Owner", uid=user.customer.id)
-            budgets: list = get_budgets(owner_id=owner_id)
+            budgets: list = owner_scope.budgets(owner_id=owner_id)
             params = dict(q=f'hasBudget=={convert_list_into_string(budgets)}',
                           type=self.entity_type)
         params.update(dict(count='true'))
@@ -374,7 +381,7 @@ class FurnitureViewDetail(FurnitureEntityDetail):
         if user.is_customer:
             if payload.get('hasBudget').get('object'):
                 owner_id = generate_urn_identifier(_type="Owner", uid=user.customer.id)
-                return payload.get('hasBudget').get('object') in get_budgets(owner_id=owner_id)
+                return owner_scope.owns(owner_id, payload.get('hasBudget').get('object'), kind='budgets')
             return False
         return True
 
@@ -387,7 +394,7 @@ class FurnitureViewDetailCreateAttrs(FurnitureEntityDetailCreateAttrs):
         if user.is_customer:
             if payload.get('hasBudget').get('object'):
                 owner_id = generate_urn_identifier(_type="Owner", uid=user.customer.id)
-                return payload.get('hasBudget').get('object') in get_budgets(owner_id=owner_id)
+                return owner_scope.owns(owner_id, payload.get('hasBudget').get('object'), kind='budgets')
             return False
         return True
 
@@ -424,9 +431,7 @@ class ModuleView(ModuleEntity):
             params = dict(type=self.entity_type)
         elif user.is_customer:
             owner_id = generate_urn_identifier(_type="Owner", uid=user.customer.id)
-            budgets: list = get_budgets(owner_id=owner_id)
-            for budget in budgets:
-                tmp.extend(get_furniture(budget_id=budget))
+            tmp.extend(owner_scope.furniture(owner_id=owner_id))
             params = dict(q=f'belongsToFurniture=={convert_list_into_string(tmp)}',
                           type=self.entity_type)
         params.update(dict(count='true'))
@@ -449,7 +454,7 @@ class GroupView(GroupEntity):
             params = dict(type=self.entity_type)
         elif user.is_customer:
             owner_id = generate_urn_identifier(_type="Owner", uid=user.customer.id)
-            tmp.extend(get_projects_based_on_owner(owner_id=owner_id))
+            tmp.extend(owner_scope.projects(owner_id=owner_id))
             params = dict(q=f'belongsTo=={convert_list_into_string(tmp)}', type=self.entity_type)
         params.update(dict(count='true'))
         return params
@@ -465,10 +470,7 @@ class ModuleViewDetailCreateAttrs(ModuleEntityDetailCreateAttrs):
         if user.is_customer:
             if payload.get('belongsToFurniture').get('object'):
                 owner_id = generate_urn_identifier(_type="Owner", uid=user.customer.id)
-                budgets = get_budgets(owner_id=owner_id)
-                for budget in budgets:
-                    if payload.get('belongsToFurniture').get('object') in get_furniture(budget_id=budget):
-                        return True
+                return owner_scope.owns(owner_id, payload.get('belongsToFurniture').get('object'), kind='furniture')
             return False
         return True
 
@@ -538,3 +540,20 @@ class HomeView(HomeAPIView):
         ('Tag Result', 'tags', 'tag-result', ['list']),
 
     ]
+
+
+class CascadeDeleteJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Progress of the cascade deletes run in background when an owner, budget or project is deleted. ``resume`` queues
+    an unfinished job again; it picks up the entities that are still left.
+    """
+    queryset = CascadeDeleteJob.objects.all()
+    serializer_class = CascadeDeleteJobSerializer
+    permission_classes = [IsAuthenticated | TokenHasReadWriteScope, IsAdminOrWorker]
+    filterset_fields = ('root_type', 'root_id', 'status')
+
+    @action(methods=['post'], detail=True)
+    def resume(self, request, pk=None):
+        job: CascadeDeleteJob = resume_cascade_delete(self.get_object().pk)
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
+
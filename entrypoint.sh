@@ -14,6 +14,10 @@ else
     fi
 
     python manage.py migrate
+
+    case "$WW4API_ORION_NOTIFICATIONS_REGISTER" in
+        [Tt]rue) python manage.py registersubscriptions || echo "Could not register the Orion subscriptions" ;;
+    esac
 fi
 
 exec "$@"
@@ -0,0 +1,59 @@
+import asyncio
+
+from django.http.response import HttpResponseBase
+
+from utilities.metrics import metrics
+
+
+class MetricsMiddleware(object):
+    """
+    Opens the ``RequestMetrics`` of every request, tags it with the view class and action that answer it and adds the
+    ``Server-Timing`` header to the response.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(self.get_response):
+            # Mark the middleware as a coroutine function, as Django's MiddlewareMixin does.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        token = metrics.begin()
+        try:
+            response = self.get_response(request)
+        except Exception:
+            metrics.end(token, status='5xx')
+            raise
+        return self.finish(token, response)
+
+    async def __acall__(self, request):
+        token = metrics.begin()
+        try:
+            response = await self.get_response(request)
+        except Exception:
+            metrics.end(token, status='5xx')
+            raise
+        return self.finish(token, response)
+
+    @staticmethod
+    def describe(request, view_func) -> tuple:
+        view_class = getattr(view_func, 'view_class', None) or getattr(view_func, 'cls', None)
+        view = view_class.__name__ if view_class is not None else getattr(view_func, '__name__', 'unknown')
+        method = request.method.lower()
+        actions: dict = getattr(view_func, 'actions', None) or dict()
+        return view, actions.get(method, method)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics.tag(*self.describe(request, view_func))
+        return None
+
+    @staticmethod
+    def finish(token, response: HttpResponseBase) -> HttpResponseBase:
+        current = metrics.end(token, status=f"{response.status_code // 100}xx")
+        if current is not None and metrics.server_timing:
+            response['Server-Timing'] = metrics.header(current)
+        return response
@@ -0,0 +1,24 @@
+from celery.signals import task_prerun, task_postrun
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from utilities.metrics import metrics
+
+# Celery task id -> context token of its RequestMetrics
+tasks = dict()
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    if metrics.enabled and metrics.execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(metrics.execute_wrapper)
+
+
+@task_prerun.connect
+def on_task_prerun(sender=None, task_id=None, task=None, **kwargs):
+    tasks[task_id] = metrics.begin(view=task.name, action='task')
+
+
+@task_postrun.connect
+def on_task_postrun(sender=None, task_id=None, task=None, state=None, **kwargs):
+    metrics.end(tasks.pop(task_id, None), status=state or '')
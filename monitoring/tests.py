@@ -0,0 +1,49 @@
+from unittest import mock
+
+from django.http import HttpResponse
+from django.test import SimpleTestCase, TestCase, RequestFactory
+from rest_framework.test import APIRequestFactory
+
+from monitoring.middleware import MetricsMiddleware
+from monitoring.views import MetricsView
+from utilities.metrics import metrics
+
+
+class MetricsMiddlewareTests(SimpleTestCase):
+
+    @staticmethod
+    def view(request):
+        metrics.count('cache-hit')
+        with metrics.timed('orion'):
+            pass
+        return HttpResponse('ok')
+
+    def test_server_timing_sums_the_dependency_calls(self):
+        with mock.patch.object(metrics, 'enabled', True), mock.patch.object(metrics, 'server_timing', True):
+            response = MetricsMiddleware(self.view)(RequestFactory().get('/api/v1/part/'))
+        header = response['Server-Timing']
+        self.assertIn('orion;desc="1 calls"', header)
+        self.assertIn('cache-hit;desc="1"', header)
+        self.assertIn('total;dur=', header)
+        self.assertIsNone(metrics.current)
+
+    def test_disabled_metrics_record_nothing(self):
+        with mock.patch.object(metrics, 'enabled', False), mock.patch.object(metrics, 'server_timing', True):
+            response = MetricsMiddleware(self.view)(RequestFactory().get('/api/v1/part/'))
+        self.assertFalse(response.has_header('Server-Timing'))
+
+
+class MetricsViewTests(TestCase):
+
+    def scrape(self, authorization: str):
+        request = APIRequestFactory().get('/metrics/', HTTP_AUTHORIZATION=authorization)
+        with mock.patch.object(metrics, 'token', 'scraper'):
+            return MetricsView.as_view()(request)
+
+    def test_scrape_with_the_metrics_token(self):
+        response = self.scrape('Bearer scraper')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'ww4api_request_seconds', response.content)
+
+    def test_scrape_needs_the_metrics_token(self):
+        self.assertEqual(self.scrape('Bearer wrong').status_code, 403)
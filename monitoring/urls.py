@@ -0,0 +1,9 @@
+from django.urls import path
+
+from monitoring.views import MetricsView
+
+app_name = 'monitoring'
+
+urlpatterns = [
+    path('', MetricsView.as_view(), name='metrics'),
+]
@@ -0,0 +1,19 @@
+from django.http import HttpResponse
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.views import APIView
+
+from utilities.metrics import metrics
+from utilities.permissions import HasMetricsToken
+
+
+class MetricsView(APIView):
+    """
+    Prometheus metrics of the API (see ``utilities.metrics``). The scraper's bearer token is the metrics token, not an
+    OAuth2 one, so only the session of a staff user is authenticated.
+    """
+    authentication_classes = [SessionAuthentication]
+    permission_classes = [HasMetricsToken]
+
+    def get(self, request):
+        content, content_type = metrics.export()
+        return HttpResponse(content, content_type=content_type)
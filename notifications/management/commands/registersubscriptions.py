@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from notifications.subscriptions import subscriptions
+
+
+class Command(BaseCommand):
+    help = 'Registers the Orion-LD subscriptions that notify the API of the changes to the proxied entity types'
+
+    def add_arguments(self, parser):
+        parser.add_argument('types', nargs='*', help="Entity types to register (all the configured ones by default).")
+
+    def handle(self, *args, **options):
+        if not subscriptions.token:
+            raise CommandError("Set WW4API_ORION_NOTIFICATIONS_TOKEN before registering the subscriptions.")
+        failed = list()
+        for entity_type in options.get('types') or subscriptions.types:
+            response = subscriptions.register(entity_type)
+            if response.status_code in (201, 204):
+                self.stdout.write(self.style.SUCCESS(f"Subscription {subscriptions.subscription_id(entity_type)} "
+                                                     f"registered"))
+            else:
+                failed.append(entity_type)
+                self.stderr.write(f"Orion refused the subscription of {entity_type} ({response.status_code}): "
+                                  f"{response.text}")
+        if failed:
+            raise CommandError(f"Could not register the subscriptions of {', '.join(failed)}.")
+        self.stdout.write(f"Notifying {subscriptions.notification_url}")
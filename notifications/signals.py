@@ -0,0 +1,32 @@
+from django.dispatch import receiver
+
+from utilities.conditional import conditional
+from utilities.projection import projection
+from utilities.scope import owner_scope
+from utilities.signals import orion_entity_changed
+
+
+@receiver(orion_entity_changed)
+def invalidate_responses(sender, entity_type, pk, data, **kwargs):
+    conditional.invalidate(entity_type=entity_type, pk=pk)
+
+
+@receiver(orion_entity_changed)
+def invalidate_owner_scope(sender, entity_type, pk, data, deleted=False, **kwargs):
+    if projection.enabled:
+        # The scopes are read from the projection, not from the cache.
+        return
+    if entity_type in ('Budget', 'Project'):
+        owner_scope.invalidate(projection.value(data, 'orderBy'))
+    elif entity_type == 'Furniture' and projection.value(data, 'hasBudget'):
+        owner_scope.invalidate_budget(projection.value(data, 'hasBudget'))
+
+
+@receiver(orion_entity_changed)
+def update_projection(sender, entity_type, pk, data, deleted=False, **kwargs):
+    if not projection.enabled:
+        return
+    if deleted:
+        projection.remove([pk])
+    elif isinstance(data, dict):
+        projection.apply([data])
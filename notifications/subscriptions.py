@@ -0,0 +1,65 @@
+import json
+from typing import List, Optional
+
+import requests
+from django.conf import settings
+
+
+class OrionSubscriptions(object):
+    """
+    The Orion-LD subscriptions that notify the API of every change to the entity types it proxies.
+
+    One subscription is kept per type, identified by ``urn:ngsi-ld:Subscription:ww4api-<type>``, so registering again
+    updates them in place. Notifications are sent in keyValues format to ``notification_url`` with the shared
+    ``token`` in the ``TOKEN_HEADER`` header.
+    """
+    ID_PREFIX = 'urn:ngsi-ld:Subscription:ww4api-'
+    TOKEN_HEADER = 'X-Notification-Token'
+
+    def __init__(self, notification_url: Optional[str] = None, token: Optional[str] = None,
+                 types: Optional[List[str]] = None) -> None:
+        self.notification_url = notification_url
+        self.token = token
+        self.types = types or list()
+
+    @classmethod
+    def from_settings(cls) -> 'OrionSubscriptions':
+        config: dict = settings.ORION_NOTIFICATIONS
+        return cls(notification_url=config.get('NOTIFICATION_URL'), token=config.get('TOKEN'),
+                   types=config.get('TYPES'))
+
+    def subscription_id(self, entity_type: str) -> str:
+        return f"{self.ID_PREFIX}{entity_type.lower()}"
+
+    def subscription(self, entity_type: str) -> dict:
+        return {
+            "id": self.subscription_id(entity_type),
+            "type": "Subscription",
+            "description": f"Notifies the ww4 API of the changes to the {entity_type} entities.",
+            "entities": [{"type": entity_type}],
+            "notification": {
+                "format": "keyValues",
+                "endpoint": {
+                    "uri": self.notification_url,
+                    "accept": "application/json",
+                    "receiverInfo": [{"key": self.TOKEN_HEADER, "value": self.token or ''}],
+                },
+            },
+        }
+
+    def register(self, entity_type: str) -> requests.Response:
+        """
+        Creates the subscription of ``entity_type``, or updates it when it already exists.
+        """
+        from utilities.orion import orion
+        url = settings.ORION_HOST + "/ngsi-ld/v1/subscriptions/"
+        data = self.subscription(entity_type)
+        response = orion.post(url, data=json.dumps(data))
+        if response.status_code == 409:
+            data.pop('id')
+            data.pop('type')
+            response = orion.patch(url + self.subscription_id(entity_type), data=json.dumps(data))
+        return response
+
+
+subscriptions = OrionSubscriptions.from_settings()
@@ -0,0 +1,59 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+from rest_framework.test import APIRequestFactory
+
+from notifications.views import NotificationView
+from utilities import asyncViewsMixin
+from utilities.asyncViewsMixin import AsyncOrionInterfaceView, AsyncOrionDeleteMixin
+from utilities.conditional import conditional
+from utilities.projection import projection
+from utilities.signals import orion_entity_changed
+
+
+class AsyncPartDetailView(AsyncOrionDeleteMixin, AsyncOrionInterfaceView):
+    entity_type = 'Part'
+
+
+class NotificationTests(SimpleTestCase):
+    pk = 'urn:ngsi-ld:Part:1'
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.received = list()
+        orion_entity_changed.connect(self.receive)
+        self.addCleanup(orion_entity_changed.disconnect, self.receive)
+
+    def receive(self, sender, **kwargs):
+        self.received.append(kwargs)
+
+    def notify(self, token: str):
+        request = self.factory.post('/api/v1/notifications/', dict(data=[dict(id=self.pk, type='Part')]),
+                                    format='json', HTTP_X_NOTIFICATION_TOKEN=token)
+        with mock.patch.object(NotificationView, 'notification_token', 'secret'):
+            return NotificationView.as_view()(request)
+
+    def test_notification_invalidates_the_cached_answers(self):
+        with mock.patch.object(conditional, 'invalidate') as invalidate:
+            response = self.notify('secret')
+        self.assertEqual(response.status_code, 204)
+        invalidate.assert_called_once_with(entity_type='Part', pk=self.pk)
+
+    def test_notification_updates_the_projection(self):
+        with mock.patch.object(projection, 'enabled', True), mock.patch.object(projection, 'apply') as apply:
+            self.notify('secret')
+        apply.assert_called_once_with([dict(id=self.pk, type='Part')])
+
+    def test_notification_needs_the_subscription_token(self):
+        response = self.notify('wrong')
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.received, [])
+
+    async def test_async_delete_announces_the_deletion(self):
+        deleted = mock.Mock(status_code=204, headers=dict())
+        with mock.patch.object(asyncViewsMixin.async_orion, 'delete', mock.AsyncMock(return_value=deleted)):
+            response = await AsyncPartDetailView().delete(mock.Mock(), self.pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.received), 1)
+        self.assertEqual(self.received[0]['pk'], self.pk)
+        self.assertTrue(self.received[0]['deleted'])
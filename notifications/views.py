@@ -0,0 +1,27 @@
+from rest_framework import status
+from rest_framework.generics import GenericAPIView
+from rest_framework.response import Response
+
+from notifications.subscriptions import subscriptions
+from utilities.permissions import HasNotificationToken
+from utilities.signals import orion_entity_changed
+
+
+class NotificationView(GenericAPIView):
+    """
+    Receives the Orion-LD notifications of the subscriptions of ``registersubscriptions`` and sends
+    ``orion_entity_changed`` for every entity they carry.
+    """
+    authentication_classes = []
+    permission_classes = [HasNotificationToken]
+    token_header = subscriptions.TOKEN_HEADER
+    notification_token = subscriptions.token
+
+    def post(self, request):
+        entities = request.data.get('data', list()) if isinstance(request.data, dict) else list()
+        for entity in entities:
+            if not isinstance(entity, dict) or not entity.get('id'):
+                continue
+            orion_entity_changed.send(sender=self.__class__, entity_type=entity.get('type'), pk=entity.get('id'),
+                                      data=entity, deleted=False)
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -1,9 +1,8 @@
 from typing import List, Dict, Any
 from django.conf import settings
-import requests
 import inspect
 import json
-from utilities.client import oauth
+from utilities.orion import orion
 
 
 class BasePayload(object):
@@ -101,7 +100,7 @@ class BasePayload(object):
         return json.dumps(self.partial_body())
 
     def post(self):
-        return requests.post(self.url, self.json(), auth=oauth, headers=self.headers)
+        return orion.post(self.url, self.json(), headers=self.headers)
 
     def url_with_pk(self):
         if self.url.endswith('/'):
@@ -111,14 +110,13 @@ class BasePayload(object):
     def get(self, params=None):
         if not params:
             params = {}
-        return requests.get(self.url_with_pk(), headers=self.headers, auth=oauth, params=params)
+        return orion.get(self.url_with_pk(), headers=self.headers, params=params)
 
     def patch(self, params=None):
-        return requests.patch(self.url_with_pk() + 'attrs/', self.partial_json(), auth=oauth, headers=self.headers,
-                              params=params)
+        return orion.patch(self.url_with_pk() + 'attrs/', self.partial_json(), headers=self.headers, params=params)
 
     def delete(self):
-        return requests.delete(self.url_with_pk(), auth=oauth, headers=self.headers)
+        return orion.delete(self.url_with_pk(), headers=self.headers)
 
     def list(self, params=None):
-        return requests.get(self.url, auth=oauth, headers=self.headers, params=params)
+        return orion.get(self.url, headers=self.headers, params=params)
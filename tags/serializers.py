@@ -3,6 +3,7 @@ from tags.models import Tag
 from users.models import User
 from hashid_field.rest import HashidSerializerCharField
 from utilities.fields import PrimaryKeyRelatedFieldHashed
+from utilities.serializers import SparseFieldsMixin
 from django.shortcuts import reverse
 import os
 
@@ -19,7 +20,7 @@ def validate_excel_file(file):
     return file
 
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     id = HashidSerializerCharField(read_only=True, required=False)
     pdf = serializers.FileField(validators=[validate_pdf_file])
     excel = serializers.FileField(validators=[validate_excel_file])
@@ -55,7 +56,7 @@ class TagSerializer(serializers.ModelSerializer):
     def get_fields(self):
         fields = super(TagSerializer, self).get_fields()
         if self.get_action() != "list":
-            fields.pop('instance')
+            fields.pop('instance', None)
         return fields
 
     def get_request(self):
@@ -69,7 +70,7 @@ class TagSerializer(serializers.ModelSerializer):
             reverse(f"tags:{self.Meta.view_name}-detail", kwargs=dict(pk=obj.id)))
 
 
-class TagResultSerializer(serializers.ModelSerializer):
+class TagResultSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     id = HashidSerializerCharField(read_only=True, required=False)
     pdf = serializers.FileField(validators=[validate_pdf_file])
     tag = PrimaryKeyRelatedFieldHashed(library='tags', model=Tag)
@@ -79,6 +80,7 @@ class TagResultSerializer(serializers.ModelSerializer):
         model = Tag
         view_name = 'tag-result'
         fields = ('id', 'tag', 'pdf', 'created', 'modified', 'instance')
+        expandable = dict(tag=TagSerializer)
         extra_kwargs = {
             'id': {'read_only': True},
             'created': {'read_only': True},
@@ -88,7 +90,7 @@ class TagResultSerializer(serializers.ModelSerializer):
     def get_fields(self):
         fields = super(TagResultSerializer, self).get_fields()
         if self.get_action() != "list":
-            fields.pop('instance')
+            fields.pop('instance', None)
         return fields
 
     def get_request(self):
@@ -15,6 +15,6 @@ class TagsViewSet(ModelViewSet):
 
 class TagsResultViewSet(mixins.RetrieveModelMixin, mixins.DestroyModelMixin, mixins.ListModelMixin, GenericViewSet):
     permission_classes = [IsAuthenticated, DjangoModelPermissions]
-    queryset = TagResult.objects.all()
+    queryset = TagResult.objects.select_related('tag')
     serializer_class = TagResultSerializer
     filterset_class = TagResultFilterSet
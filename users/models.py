@@ -1,4 +1,6 @@
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
+from django.core.cache import cache
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django_extensions.db.models import TimeStampedModel
@@ -99,13 +101,34 @@ class User(AbstractUser):
     def get_all_orion_permissions(self) -> models.QuerySet:
         return self.get_orion_group_permissions().union(self.get_orion_permissions(), all=True)
 
+    @staticmethod
+    def orion_perms_cache_key(pk) -> str:
+        return f"orion_perms:{pk}"
+
+    def get_orion_perm_codenames(self) -> set:
+        """
+        Returns the codenames of every orion permission of the user, either granted directly or through a group. The
+        set is memoised on the instance for the rest of the request and shared between requests through the cache;
+        it is invalidated whenever the user's groups or permissions, or the permissions of one of its groups, change.
+        """
+        if not hasattr(self, '_orion_perm_cache'):
+            key = self.orion_perms_cache_key(self.pk)
+            codenames = cache.get(key)
+            if codenames is None:
+                codenames = set(Permission.objects.filter(models.Q(group__user=self) | models.Q(user=self))
+                                .values_list('codename', flat=True).distinct())
+                cache.set(key, codenames, timeout=settings.ORION_PERMISSIONS_CACHE_TIMEOUT)
+            self._orion_perm_cache = codenames
+        return self._orion_perm_cache
+
+    def clear_orion_perm_cache(self) -> None:
+        cache.delete(self.orion_perms_cache_key(self.pk))
+        self.__dict__.pop('_orion_perm_cache', None)
+
     def has_orion_perm(self, perm: Union[Permission, str]):
-        if isinstance(perm, str):
-            try:
-                perm = Permission.objects.get(codename=perm)
-            except Exception:
-                return False
-        return perm in self.get_all_orion_permissions()
+        if isinstance(perm, Permission):
+            perm = perm.codename
+        return perm in self.get_orion_perm_codenames()
 
     def __str__(self) -> str:
         return self.username
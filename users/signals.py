@@ -1,12 +1,15 @@
 from django.contrib.auth.models import Group
 from django.db.models import QuerySet
-from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.core.cache import cache
+from django.db.models import Q
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
 from django.dispatch import receiver
 
 from emailManager.tasks import send_confirmation_email_and_reset_password_task
-from permissions.models import Group as OrionGroup
+from entities.tasks import start_cascade_delete
+from permissions.models import Group as OrionGroup, Permission as OrionPermission
 from users.models import OrganizationProfile, WorkerProfile, CustomerProfile, User
-from utilities.functions import map_owner_entities, batch_delete, create_user_folder
+from utilities.functions import create_user_folder
 from utilities.payloads import customer_entity, worker_entity, organization_entity
 from utilities.signals import user_registered
 
@@ -19,8 +22,7 @@ def user_signup(sender, user, request, **kwargs):
 
 @receiver(pre_save, sender=User)
 def verify_connection(sender, instance, **kwargs):
-    from utilities.client import oauth
-    import requests
+    from utilities.orion import orion
     from django.conf import settings
     from utilities.exceptions import AuthenticationFiware
     if instance.is_superuser:
@@ -28,7 +30,7 @@ def verify_connection(sender, instance, **kwargs):
     requests_header = settings.ORION_HEADERS.copy()
     if requests_header.get("Fiware-Service"):
         requests_header.pop("Fiware-Service")
-    response = requests.get(settings.ORION_ENTITIES + "?type=Owner", auth=oauth, headers=requests_header)
+    response = orion.get(settings.ORION_ENTITIES + "?type=Owner", headers=requests_header)
     if response.status_code != 200:
         raise AuthenticationFiware(detail=response.text, code=response.status_code)
 
@@ -117,8 +119,7 @@ def on_customer_save(sender, instance, created, **kwargs):
 @receiver(pre_delete, sender=CustomerProfile)
 def on_customer_delete(sender, instance, **kwargs):
     customer = customer_entity(customer=instance)
-    entities_related = map_owner_entities(owner_id=customer.id)
-    batch_delete(entities_map=entities_related)
+    start_cascade_delete(root_type='Owner', root_id=customer.id)
     customer.delete()
 
 
@@ -126,3 +127,43 @@ def on_customer_delete(sender, instance, **kwargs):
 def on_customer_post_delete(sender, instance, **kwargs):
     if instance.user:
         instance.user.delete()
+
+
+def invalidate_orion_permissions(users) -> None:
+    cache.delete_many([User.orion_perms_cache_key(pk) for pk in users.values_list('pk', flat=True)])
+
+
+@receiver(m2m_changed, sender=User.orion_groups.through)
+@receiver(m2m_changed, sender=User.user_orion_permissions.through)
+def on_user_orion_permissions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        instance.clear_orion_perm_cache()
+    elif action == 'pre_clear':
+        invalidate_orion_permissions(instance.user_set.all())
+    else:
+        invalidate_orion_permissions(User.objects.filter(pk__in=pk_set))
+
+
+@receiver(m2m_changed, sender=OrionGroup.permissions.through)
+def on_orion_group_permissions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        invalidate_orion_permissions(User.objects.filter(orion_groups=instance))
+    elif action == 'pre_clear':
+        invalidate_orion_permissions(User.objects.filter(orion_groups__permissions=instance).distinct())
+    else:
+        invalidate_orion_permissions(User.objects.filter(orion_groups__in=pk_set).distinct())
+
+
+@receiver(pre_delete, sender=OrionGroup)
+def on_orion_group_delete(sender, instance, **kwargs):
+    invalidate_orion_permissions(User.objects.filter(orion_groups=instance))
+
+
+@receiver(pre_delete, sender=OrionPermission)
+def on_orion_permission_delete(sender, instance, **kwargs):
+    invalidate_orion_permissions(User.objects.filter(
+        Q(user_orion_permissions=instance) | Q(orion_groups__permissions=instance)).distinct())
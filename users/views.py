@@ -44,7 +44,7 @@ class CustomerViewSet(UserInterfaceViewSet):
         return Response(data=dict(detail="TOS has been updated!"), status=status.HTTP_200_OK)
 
     def get_queryset(self) -> QuerySet:
-        queryset: QuerySet = super(CustomerViewSet, self).get_queryset()
+        queryset: QuerySet = super(CustomerViewSet, self).get_queryset().select_related('address', 'delivery_address')
         if self.request.user.is_customer:
             queryset = queryset.filter(user__username=self.request.user.username)
         return queryset
@@ -0,0 +1,286 @@
+import inspect
+from typing import List, Optional
+
+import httpx
+import requests_auth
+from asgiref.sync import sync_to_async
+from django.core.exceptions import PermissionDenied
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from utilities import codec
+from utilities.orion import async_orion
+from utilities.bulk import bulk_operations
+from utilities.conditional import conditional
+from utilities.exceptions import OrionSystemOutOfService, AuthenticationFiware
+from utilities.health import orion_health
+from .decorators import check_uri, check_uri_from_request
+from .functions import update_headers
+from .viewsMixin import OrionInterfaceView, OrionUpdateMixin, OrionCreateAttrsMixin
+
+
+class AsyncOrionInterfaceView(OrionInterfaceView):
+    """
+    Base class of the async Orion proxy views.
+
+    Authentication, permissions, throttling and the orion permission of the handler (``orion_permissions`` maps the
+    HTTP method to its codename, the async counterpart of ``user_has_orion_permission``) run in a worker thread because
+    they touch the database; the call to Orion itself is awaited, so under an ASGI worker the event loop keeps serving
+    other requests while the broker answers. The Orion circuit breaker and the response cache are the ones of the sync
+    views, also reached from a worker thread.
+    """
+    orion_permissions: dict = dict()
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+
+        async def async_view(request, *args, **kwargs):
+            return await view(request, *args, **kwargs)
+
+        async_view.__dict__.update(view.__dict__)
+        return async_view
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        permission = self.orion_permissions.get(request.method.lower())
+        if permission and request.user and not request.user.has_orion_perm(permission):
+            raise PermissionDenied
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            # The breaker may probe the broker: keep that blocking call off the event loop.
+            if not await sync_to_async(orion_health.allow_request)():
+                raise OrionSystemOutOfService()
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def generate_params_async(self, user) -> dict:
+        return await sync_to_async(self.generate_params)(user=user)
+
+    async def verify_orderBy_async(self, payload, user) -> bool:
+        return await sync_to_async(self.verify_orderBy)(payload=payload, user=user)
+
+    async def get_object_async(self, pk, params=None) -> httpx.Response:
+        if params:
+            params = self.check_params(params)
+            return await async_orion.get(self.detail_url(pk), params=params)
+        return await async_orion.get(self.detail_url(pk))
+
+    async def fetch_object_async(self, pk) -> httpx.Response:
+        responses: dict = self.__dict__.setdefault('_fetched_objects', dict())
+        if pk not in responses:
+            responses[pk] = await self.get_object_async(pk)
+        return responses[pk]
+
+    async def fetch_payload_async(self, pk) -> Optional[dict]:
+        payloads: dict = self.__dict__.setdefault('_fetched_payloads', dict())
+        if pk not in payloads:
+            response = await self.fetch_object_async(pk)
+            payloads[pk] = codec.loads(response.content) if response.status_code == status.HTTP_200_OK else None
+        return payloads[pk]
+
+
+class AsyncOrionCreateMixin(object):
+    @check_uri_from_request
+    async def post(self, request: Request) -> Response:
+        results = list()
+        try:
+            datas = request.data
+            if isinstance(datas, List):
+                for d in datas:
+                    results.append(self.check_data(data=d))
+                # Batches go through the chunked bulk engine, which runs its chunks on its own thread pool.
+                report = await sync_to_async(bulk_operations.create, thread_sensitive=False)(results)
+                if report.unreachable:
+                    raise OrionSystemOutOfService()
+                await sync_to_async(self.entities_created)(results, report.success)
+                if report.ok:
+                    return Response(report.success, status=report.status_code)
+                return Response(report.as_dict(), status=report.status_code)
+            data = self.check_data(data=datas)
+            response = await async_orion.post(self.url, data=codec.dumps(data))
+            if response.status_code == status.HTTP_201_CREATED:
+                await sync_to_async(self.entity_changed)(data.get('id'), data)
+                return Response(data, status=response.status_code, headers=update_headers(response.headers))
+            return Response(codec.loads(response.content), status=response.status_code,
+                            headers=update_headers(response.headers))
+        except httpx.TransportError:
+            raise OrionSystemOutOfService()
+        except requests_auth.errors.InvalidGrantRequest:
+            raise AuthenticationFiware
+
+
+class AsyncOrionListMixin(object):
+
+    async def get(self, request: Request):
+        params = self.check_params(dict(request.query_params.items()))
+        params.update(await self.generate_params_async(user=request.user))
+        key = await sync_to_async(conditional.key)(request, self.url, params,
+                                                   entity_type=getattr(self, 'entity_type', None))
+        cached = await sync_to_async(conditional.cached)(request, key)
+        if cached is not None:
+            return cached
+        try:
+            response = await async_orion.get(self.url, params=params)
+            if response.status_code == status.HTTP_200_OK:
+                return await sync_to_async(conditional.respond)(request, update_headers(response.headers),
+                                                                content=response.content, key=key)
+            return Response(data=dict(message="No entity found", ok=False, status=404),
+                            status=status.HTTP_404_NOT_FOUND)
+        except httpx.TransportError:
+            raise OrionSystemOutOfService()
+        except requests_auth.errors.InvalidGrantRequest:
+            raise AuthenticationFiware
+
+
+class AsyncOrionRetrieveMixin(object):
+    @check_uri
+    async def get(self, request: Request, pk):
+        try:
+            params = self.check_params(dict(request.query_params.items()))
+            key = await sync_to_async(conditional.key)(request, self.detail_url(pk), params, pk=pk)
+            cached = await sync_to_async(conditional.cached)(request, key)
+            if cached is not None:
+                return cached
+            response = await (self.get_object_async(pk, params) if params else self.fetch_object_async(pk))
+            if response.status_code == status.HTTP_200_OK:
+                content_type = response.headers.get('Content-Type', '')
+                if 'application/json' in content_type:
+                    return await sync_to_async(conditional.respond)(request, dict(), content=response.content,
+                                                                    key=key)
+                return Response(data=dict(message=f"Invalid content type: {content_type}", ok=False, status=400),
+                                status=status.HTTP_400_BAD_REQUEST,
+                                headers=update_headers(response.headers))
+            return Response(data=dict(message="Entity not found", ok=False, status=404),
+                            status=status.HTTP_404_NOT_FOUND,
+                            headers=update_headers(response.headers))
+        except httpx.TransportError:
+            raise OrionSystemOutOfService()
+        except requests_auth.errors.InvalidGrantRequest:
+            raise AuthenticationFiware()
+
+
+class AsyncOrionDeleteMixin(object):
+    @check_uri
+    async def delete(self, request: Request, pk: str):
+        try:
+            response = await async_orion.delete(self.detail_url(uid=pk))
+            if response.status_code == status.HTTP_204_NO_CONTENT:
+                await sync_to_async(self.entity_changed)(pk, deleted=True)
+                return Response({}, status=status.HTTP_200_OK, headers=update_headers(response.headers))
+            return Response(dict(message="No entity found!", ok=False, status=status.HTTP_404_NOT_FOUND),
+                            status=status.HTTP_404_NOT_FOUND, headers=update_headers(response.headers))
+        except httpx.TransportError:
+            raise OrionSystemOutOfService()
+        except requests_auth.errors.InvalidGrantRequest:
+            raise AuthenticationFiware
+
+
+class AsyncOrionAttrsMixin(object):
+    """
+    Shared body of the async update (PATCH .../attrs) and append (POST .../attrs) handlers.
+    """
+
+    async def send_attrs(self, method: str, request: Request, pk: str) -> Response:
+        try:
+            data: dict = self.check_data(data=request.data)
+            data = self.remove_protected_attrs(data, user=request.user)
+            response = await async_orion.request(method, self.detail_url(uid=pk) + "attrs", content=codec.dumps(data))
+            if response.status_code == status.HTTP_204_NO_CONTENT:
+                payload = self.merge_payload(pk, data)
+                await sync_to_async(self.entity_changed)(pk, payload)
+                if payload is not None:
+                    return Response(payload, status=status.HTTP_200_OK, headers=update_headers(response.headers))
+                response = await async_orion.get(self.detail_url(uid=pk))
+                return Response(codec.loads(response.content), status=response.status_code,
+                                headers=update_headers(response.headers))
+            return Response(codec.loads(response.content), status=status.HTTP_400_BAD_REQUEST,
+                            headers=update_headers(response.headers))
+        except httpx.TransportError:
+            raise OrionSystemOutOfService()
+        except requests_auth.errors.InvalidGrantRequest:
+            raise AuthenticationFiware
+
+
+class AsyncOrionUpdateMixin(AsyncOrionAttrsMixin):
+    remove_protected_attrs = staticmethod(OrionUpdateMixin.remove_protected_attrs)
+
+    @check_uri
+    async def patch(self, request: Request, pk: str):
+        return await self.send_attrs('PATCH', request, pk)
+
+
+class AsyncOrionCreateAttrsMixin(AsyncOrionAttrsMixin):
+    remove_protected_attrs = staticmethod(OrionCreateAttrsMixin.remove_protected_attrs)
+
+    async def post(self, request: Request, pk: str):
+        return await self.send_attrs('POST', request, pk)
+
+
+class AsyncOrderByMixin(object):
+    """
+    Ownership check of the async OrderBy* mixins: the entity is fetched once and handed to ``verify_orderBy``.
+    """
+
+    async def is_owned(self, request: Request, pk: str) -> bool:
+        try:
+            payload = await self.fetch_payload_async(pk)
+        except httpx.TransportError:
+            raise OrionSystemOutOfService()
+        except requests_auth.errors.InvalidGrantRequest:
+            raise AuthenticationFiware()
+        return payload is not None and await self.verify_orderBy_async(payload=payload, user=request.user)
+
+    @staticmethod
+    def not_found() -> Response:
+        return Response(dict(message="No entity found!", ok=False, status=status.HTTP_404_NOT_FOUND),
+                        status=status.HTTP_404_NOT_FOUND)
+
+
+class AsyncOrderByRetrieveMixin(AsyncOrderByMixin, AsyncOrionRetrieveMixin):
+    @check_uri
+    async def get(self, request: Request, pk: str):
+        if await self.is_owned(request, pk):
+            return await super(AsyncOrderByRetrieveMixin, self).get(request, pk)
+        return Response(data=dict(message="Entity not found", ok=False, status=404),
+                        status=status.HTTP_404_NOT_FOUND)
+
+
+class AsyncOrderByDeleteMixin(AsyncOrderByMixin, AsyncOrionDeleteMixin):
+    @check_uri
+    async def delete(self, request: Request, pk: str):
+        if await self.is_owned(request, pk):
+            return await super(AsyncOrderByDeleteMixin, self).delete(request, pk)
+        return self.not_found()
+
+
+class AsyncOrderByUpdateMixin(AsyncOrderByMixin, AsyncOrionUpdateMixin):
+    @check_uri
+    async def patch(self, request: Request, pk: str):
+        if await self.is_owned(request, pk):
+            return await super(AsyncOrderByUpdateMixin, self).patch(request, pk)
+        return self.not_found()
+
+
+class AsyncOrderByCreateAttrsMixin(AsyncOrderByMixin, AsyncOrionCreateAttrsMixin):
+    async def post(self, request: Request, pk: str):
+        if await self.is_owned(request, pk):
+            return await super(AsyncOrderByCreateAttrsMixin, self).post(request, pk)
+        return self.not_found()
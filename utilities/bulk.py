@@ -0,0 +1,175 @@
+import contextvars
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from django.conf import settings
+
+from utilities.orion import orion
+
+logger = logging.getLogger(__name__)
+
+
+class BulkReport(object):
+    """
+    Outcome of a bulk operation: the ids Orion accepted and one ``dict(entityId=..., error=...)`` per id it rejected,
+    in the format of Orion's 207 responses.
+    """
+
+    def __init__(self, operation: str) -> None:
+        self.operation = operation
+        self.success: List[str] = list()
+        self.errors: List[dict] = list()
+        self.chunks = 0
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    @property
+    def unreachable(self) -> bool:
+        # Nothing went through and every failure is a connection error or timeout: Orion itself is down.
+        return bool(self.errors) and not self.success and all(
+            isinstance(error.get('error'), dict) and error['error'].get('status') is None for error in self.errors)
+
+    @property
+    def status_code(self) -> int:
+        if self.errors:
+            return 207
+        return 201 if self.operation == 'create' else 204
+
+    def as_dict(self) -> dict:
+        return dict(success=self.success, errors=self.errors)
+
+    def __repr__(self) -> str:
+        return f"<BulkReport {self.operation}: {len(self.success)} ok, {len(self.errors)} failed>"
+
+
+class BulkOperations(object):
+    """
+    Runs Orion's batch ``entityOperations`` (create, upsert, update, delete) over any number of entities.
+
+    The payload is split in chunks of ``chunk_size`` entities that are sent concurrently on a bounded thread pool.
+    Each chunk reports per-id results: ids rejected with a transient error (connection failure, timeout, 5xx or 429)
+    are sent again up to ``max_retries`` times with an exponential backoff, the others are recorded as failures.
+    """
+    OPERATIONS = ('create', 'upsert', 'update', 'delete')
+    TRANSIENT_STATUS = (429, 500, 502, 503, 504)
+
+    def __init__(self, chunk_size: int = 100, max_workers: int = 4, max_retries: int = 3,
+                 backoff_factor: float = 0.5) -> None:
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+
+    @classmethod
+    def from_settings(cls) -> 'BulkOperations':
+        config: dict = settings.ORION_BULK
+        return cls(chunk_size=config.get('CHUNK_SIZE'), max_workers=config.get('MAX_WORKERS'),
+                   max_retries=config.get('MAX_RETRIES'), backoff_factor=config.get('BACKOFF_FACTOR'))
+
+    @staticmethod
+    def url(operation: str) -> str:
+        return settings.ORION_HOST + f"/ngsi-ld/v1/entityOperations/{operation}"
+
+    @staticmethod
+    def entity_id(operation: str, item) -> str:
+        return item if operation == 'delete' else item.get('id')
+
+    def chunks(self, items: list) -> List[list]:
+        return [items[i:i + self.chunk_size] for i in range(0, len(items), self.chunk_size)]
+
+    def is_transient(self, status_code: Optional[int]) -> bool:
+        return status_code is None or status_code in self.TRANSIENT_STATUS
+
+    @staticmethod
+    def error_status(error: dict) -> Optional[int]:
+        details = error.get('error')
+        if isinstance(details, dict):
+            return details.get('status') or details.get('statusCode')
+        return None
+
+    def post(self, operation: str, items: list, params: Optional[dict]) -> Tuple[List[str], List[dict]]:
+        """
+        Sends one chunk once and returns the accepted ids and the per-id errors.
+        """
+        ids = [self.entity_id(operation, item) for item in items]
+        try:
+            response = orion.post(self.url(operation), data=json.dumps(items), params=params)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as error:
+            return list(), [dict(entityId=pk, error=dict(status=None, title=str(error))) for pk in ids]
+        if response.status_code in (200, 201, 204):
+            return ids, list()
+        if response.status_code == 207:
+            data: dict = response.json()
+            return list(data.get('success', list())), list(data.get('errors', list()))
+        try:
+            detail = response.json()
+        except ValueError:
+            detail = response.text
+        error = dict(status=response.status_code, detail=detail)
+        return list(), [dict(entityId=pk, error=error) for pk in ids]
+
+    def send_chunk(self, operation: str, items: list, params: Optional[dict]) -> Tuple[List[str], List[dict]]:
+        success, errors = list(), list()
+        pending = items
+        for attempt in range(self.max_retries + 1):
+            accepted, rejected = self.post(operation, pending, params)
+            success.extend(accepted)
+            by_id: Dict[str, object] = {self.entity_id(operation, item): item for item in pending}
+            retry = list()
+            for error in rejected:
+                status_code = self.error_status(error)
+                if attempt and operation == 'create' and status_code == 409:
+                    # A previous attempt of this chunk already created the entity before failing.
+                    success.append(error.get('entityId'))
+                elif self.is_transient(status_code) and attempt < self.max_retries:
+                    retry.append(by_id.get(error.get('entityId')))
+                else:
+                    errors.append(error)
+            pending = [item for item in retry if item is not None]
+            if not pending:
+                break
+            time.sleep(self.backoff_factor * (2 ** attempt))
+        return success, errors
+
+    def run(self, operation: str, items: list, params: Optional[dict] = None) -> BulkReport:
+        if operation not in self.OPERATIONS:
+            raise ValueError(f"Unknown batch operation '{operation}'.")
+        report = BulkReport(operation)
+        chunks = self.chunks(list(items))
+        report.chunks = len(chunks)
+        if not chunks:
+            return report
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks))) as executor:
+            # Run in copies of the caller's context so their calls count for the request that made them.
+            futures = [executor.submit(contextvars.copy_context().run, self.send_chunk, operation, chunk, params)
+                       for chunk in chunks]
+            for future in futures:
+                success, errors = future.result()
+                report.success.extend(success)
+                report.errors.extend(errors)
+        if report.errors:
+            logger.error(f"Orion batch {operation} failed for {len(report.errors)} of "
+                         f"{len(report.errors) + len(report.success)} entities: "
+                         f"{[error.get('entityId') for error in report.errors]}")
+        return report
+
+    def create(self, entities: List[dict]) -> BulkReport:
+        return self.run('create', entities)
+
+    def upsert(self, entities: List[dict], replace: bool = False) -> BulkReport:
+        return self.run('upsert', entities, params=dict(options='replace' if replace else 'update'))
+
+    def update(self, entities: List[dict], overwrite: bool = True) -> BulkReport:
+        return self.run('update', entities, params=None if overwrite else dict(options='noOverwrite'))
+
+    def delete(self, ids: List[str]) -> BulkReport:
+        return self.run('delete', ids)
+
+
+bulk_operations = BulkOperations.from_settings()
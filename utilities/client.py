@@ -1,11 +1,119 @@
+import logging
+import os
+import threading
+import time
+from typing import Optional, Tuple
+
+import requests
 from django.conf import settings
-from requests_auth import OAuth2ClientCredentials, OAuth2, JsonTokenFileCache
+from django.core.cache import cache
+from requests_auth.errors import InvalidGrantRequest
+
+from utilities.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class KeyrockTokenProvider(requests.auth.AuthBase):
+    """
+    OAuth2 client-credentials token of the API in Keyrock, attached as a bearer token to every call to Orion.
+
+    The token lives in the memory of the process and is renewed ``early_refresh`` seconds before it expires, so the
+    request path only reads an attribute. With ``share`` enabled the token is also published in the cache backend
+    (Redis in production): a worker that needs a new token first looks there, and only the worker holding the refresh
+    lock asks Keyrock for it while the others wait for the result.
+    """
+    CACHE_KEY = 'keyrock:token'
+    LOCK_KEY = 'keyrock:token:lock'
+
+    def __init__(self, client_id: str, client_secret: str, token_url: str, early_refresh: float = 60,
+                 timeout: float = 10, share: bool = False) -> None:
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.token_url = token_url
+        self.early_refresh = early_refresh
+        self.timeout = timeout
+        self.share = share
+        self._token: Optional[str] = None
+        self._expires_at: float = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> 'KeyrockTokenProvider':
+        config: dict = settings.KEYROCK_CLIENT
+        return cls(
+            client_id=config.get("CLIENT_ID"),
+            client_secret=config.get("CLIENT_SECRET"),
+            token_url=config.get("TOKEN_URL"),
+            early_refresh=config.get("EARLY_REFRESH"),
+            timeout=config.get("TIMEOUT"),
+            share=config.get("SHARE_TOKEN"),
+        )
+
+    def is_fresh(self, expires_at: float) -> bool:
+        return time.time() < expires_at - self.early_refresh
+
+    @property
+    def cached_token(self) -> Optional[str]:
+        if self._token is not None and self.is_fresh(self._expires_at):
+            return self._token
+        return None
+
+    def get_token(self) -> str:
+        token = self.cached_token
+        if token is not None:
+            return token
+        with self._lock:
+            token = self.cached_token
+            if token is None:
+                token, self._expires_at = self.shared_token() if self.share else self.request_token()
+                self._token = token
+        return token
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._token = None
+            self._expires_at = 0
+        if self.share:
+            cache.delete(self.CACHE_KEY)
+
+    def request_token(self) -> Tuple[str, float]:
+        with metrics.timed('keyrock'):
+            response = requests.post(self.token_url, data=dict(grant_type='client_credentials'),
+                                     auth=(self.client_id, self.client_secret), timeout=self.timeout)
+        if response.status_code != 200:
+            raise InvalidGrantRequest(response)
+        data: dict = response.json()
+        if not data.get('access_token'):
+            raise InvalidGrantRequest(data)
+        return data.get('access_token'), time.time() + float(data.get('expires_in', 3600))
+
+    def shared_token(self) -> Tuple[str, float]:
+        deadline = time.time() + self.timeout
+        while True:
+            shared = cache.get(self.CACHE_KEY)
+            if shared and self.is_fresh(shared[1]):
+                return shared
+            locked = cache.add(self.LOCK_KEY, os.getpid(), timeout=self.timeout)
+            if locked is None:
+                # The cache backend is down (its errors are ignored), every worker falls back to its own token.
+                return self.request_token()
+            if locked:
+                try:
+                    token = self.request_token()
+                    cache.set(self.CACHE_KEY, token, timeout=max(int(token[1] - time.time()), 1))
+                    return token
+                finally:
+                    cache.delete(self.LOCK_KEY)
+            if time.time() > deadline:
+                # The worker holding the lock is stuck; don't make this request wait for it any longer.
+                logger.warning("Timed out waiting for the shared Keyrock token, requesting a new one.")
+                return self.request_token()
+            time.sleep(0.05)
 
-OAuth2.token_cache = JsonTokenFileCache('./cache.json')
+    def __call__(self, r: requests.PreparedRequest) -> requests.PreparedRequest:
+        r.headers['Authorization'] = f"Bearer {self.get_token()}"
+        return r
 
-oauth = OAuth2ClientCredentials(
-    client_id=settings.KEYROCK_CLIENT.get("CLIENT_ID"),
-    client_secret=settings.KEYROCK_CLIENT.get("CLIENT_SECRET"),
-    token_url=settings.KEYROCK_CLIENT.get("TOKEN_URL"),
 
-)
+oauth = KeyrockTokenProvider.from_settings()
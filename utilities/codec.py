@@ -0,0 +1,39 @@
+"""
+JSON codec of the Orion proxy: ``orjson`` when it is installed, the standard library otherwise.
+"""
+import json
+
+from rest_framework.renderers import JSONRenderer as BaseJSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_encoder = JSONEncoder()
+
+
+def loads(content):
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def dumps(data) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data, default=_encoder.default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class JSONRenderer(BaseJSONRenderer):
+    """
+    DRF's JSON renderer with the fast codec for compact output; indented output (``; indent=``) keeps the default.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or dict()):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
@@ -0,0 +1,148 @@
+import hashlib
+import uuid
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.http.response import HttpResponseBase
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from utilities import codec
+from utilities.metrics import metrics
+
+
+class ConditionalResponses(object):
+    """
+    Conditional GET support of the Orion proxy views.
+
+    Every 200 answer of a list or retrieve view carries a strong ETag computed from the body Orion returned (and the
+    format it is rendered to), so a client polling with ``If-None-Match`` gets an empty 304 while nothing changed.
+    JSON clients get Orion's body untouched; only the browsable API parses it to render it again.
+    When ``timeout`` is set, the answers are also kept for that many seconds in the cache, keyed by the caller (user
+    or OAuth2 application) and the Orion query, and served without calling the broker at all. The keys also carry the
+    version of the entity type (lists) or of the entity (retrieves) they answer for; ``invalidate`` bumps those
+    versions when Orion notifies a change, so only the answers that may have changed are dropped.
+    """
+    PREFIX = 'orion:response'
+    # Describe Orion's body rather than ours; the response sets its own.
+    ENTITY_HEADERS = ('content-type', 'content-length', 'content-encoding', 'transfer-encoding')
+
+    def __init__(self, timeout: int = 0) -> None:
+        self.timeout = timeout
+
+    @classmethod
+    def from_settings(cls) -> 'ConditionalResponses':
+        config: dict = settings.ORION_RESPONSE_CACHE
+        return cls(timeout=config.get('TIMEOUT'))
+
+    @staticmethod
+    def etag(request: Request, content: bytes) -> str:
+        digest = hashlib.blake2b(content, digest_size=16)
+        renderer = getattr(request, 'accepted_renderer', None)
+        if renderer is not None:
+            digest.update(renderer.format.encode('utf-8'))
+        return f'"{digest.hexdigest()}"'
+
+    @staticmethod
+    def matches(request: Request, etag: str) -> bool:
+        header = request.headers.get('If-None-Match')
+        if not header:
+            return False
+        if header.strip() == '*':
+            return True
+        # If-None-Match uses the weak comparison: W/"x" matches "x".
+        tags = [tag.strip() for tag in header.split(',')]
+        return etag in [tag[2:] if tag.startswith('W/') else tag for tag in tags]
+
+    @staticmethod
+    def scope(request: Request) -> str:
+        """
+        Whose answers a cache entry holds: the permissions and query filters differ from one user to another, so
+        nothing is shared between users, nor between the applications of client-credential tokens.
+        """
+        user = getattr(request, 'user', None)
+        if user and user.is_authenticated:
+            return f"user:{user.pk}"
+        application_id = getattr(getattr(request, 'auth', None), 'application_id', None)
+        if application_id is not None:
+            return f"application:{application_id}"
+        return 'anonymous'
+
+    def version_key(self, name: str) -> str:
+        return f"{self.PREFIX}:version:{name}"
+
+    def version(self, name: Optional[str]) -> str:
+        if not name:
+            return ''
+        key = self.version_key(name)
+        version = cache.get(key)
+        if version is None:
+            version = uuid.uuid4().hex
+            # Keep the version that won when another process set it first.
+            if not cache.add(key, version, timeout=None):
+                version = cache.get(key, version)
+        return version
+
+    def key(self, request: Request, url: str, params: Optional[dict] = None, entity_type: Optional[str] = None,
+            pk: Optional[str] = None) -> Optional[str]:
+        if not self.timeout:
+            return None
+        params = params or dict()
+        items = params.lists() if hasattr(params, 'lists') else params.items()
+        query = '&'.join(f"{name}={value}" for name, value in sorted(items))
+        digest = hashlib.sha1(f"{url}?{query}".encode('utf-8')).hexdigest()
+        version = self.version(pk or entity_type)
+        return f"{self.PREFIX}:{self.scope(request)}:{digest}:{version}"
+
+    def invalidate(self, entity_type: Optional[str] = None, pk: Optional[str] = None) -> None:
+        """
+        Drops the cached lists of ``entity_type`` and the cached answers of the entity ``pk``.
+        """
+        if not self.timeout:
+            return
+        cache.set_many(dict((self.version_key(name), uuid.uuid4().hex) for name in (entity_type, pk) if name),
+                       timeout=None)
+
+    def cached(self, request: Request, key: Optional[str]) -> Optional[HttpResponseBase]:
+        if key is None:
+            return None
+        entry = cache.get(key)
+        if entry is None:
+            metrics.count('cache-miss')
+            return None
+        metrics.count('cache-hit')
+        content, headers = entry
+        return self.answer(request, content, headers)
+
+    def respond(self, request: Request, headers: dict, content: bytes, key: Optional[str] = None) -> HttpResponseBase:
+        """
+        Answers with the JSON body Orion returned, tagged with its ETag and cached under ``key`` when given.
+        """
+        headers = dict((name, value) for name, value in dict(headers).items()
+                       if name.lower() not in self.ENTITY_HEADERS)
+        headers['ETag'] = self.etag(request, content)
+        if key is not None:
+            cache.set(key, (content, headers), timeout=self.timeout)
+        return self.answer(request, content, headers)
+
+    @staticmethod
+    def passthrough(request: Request) -> bool:
+        renderer = getattr(request, 'accepted_renderer', None)
+        return renderer is not None and renderer.format == 'json'
+
+    def answer(self, request: Request, content: bytes, headers: dict) -> HttpResponseBase:
+        if self.matches(request, headers['ETag']):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=dict(ETag=headers['ETag']))
+        if self.passthrough(request):
+            # Nothing to transform: Orion's bytes go to the client as they are.
+            response = HttpResponse(content, status=status.HTTP_200_OK, content_type='application/json')
+            for name, value in headers.items():
+                response[name] = value
+            return response
+        return Response(codec.loads(content), status=status.HTTP_200_OK, headers=headers)
+
+
+conditional = ConditionalResponses.from_settings()
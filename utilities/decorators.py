@@ -1,23 +1,20 @@
 from functools import wraps
 from typing import Callable, List
 
-import requests
 import re
-from django.conf import settings
 from django.core.exceptions import PermissionDenied
 from rest_framework.exceptions import ValidationError
 from rest_framework.request import Request
 
 from .exceptions import OrionSystemOutOfService, OrionWrongURI
+from .health import orion_health
 
 
 def verify_orion_connection(func: Callable) -> Callable:
     def wrapper(self, request, *args, **kwargs):
-        try:
-            requests.get(url=settings.ORION_ENTITIES, headers=settings.ORION_HEADERS)
-            return func(self, request, *args, **kwargs)
-        except requests.exceptions.ConnectionError:
+        if not orion_health.allow_request():
             raise OrionSystemOutOfService()
+        return func(self, request, *args, **kwargs)
 
     return wrapper
 
@@ -85,11 +82,9 @@ def check_uri_from_request(fn: Callable) -> Callable:
 
 def check_api_connection(func):
     def wrapper(self, request, *args, **kwargs):
-        try:
-            requests.get(url=settings.ORION_ENTITIES, headers=settings.ORION_HEADERS)
-            return func(self, request, *args, **kwargs)
-        except requests.exceptions.ConnectionError:
+        if not orion_health.allow_request():
             raise OrionSystemOutOfService()
+        return func(self, request, *args, **kwargs)
 
     return wrapper
 
@@ -4,6 +4,8 @@ from rest_framework import serializers
 
 class PrimaryKeyRelatedFieldHashed(serializers.PrimaryKeyRelatedField):
     def __init__(self, **kwargs):
+        # Customers can only point to their own rows: ``user_field`` is the lookup of the owner on the model.
+        self.user_field = kwargs.pop('user_field', None)
         pk_field = kwargs.get('pk_field', None)
         libray = kwargs.pop('library')
         model = kwargs.pop('model')
@@ -26,4 +28,8 @@ class PrimaryKeyRelatedFieldHashed(serializers.PrimaryKeyRelatedField):
             ValueError(f"Model attribute can not be None! \n {error}")
 
     def get_queryset(self):
-        return self.model.objects.all()
+        queryset = self.model.objects.all()
+        user = getattr(self.context.get('request'), 'user', None)
+        if self.user_field and user is not None and user.is_authenticated and user.is_customer:
+            queryset = queryset.filter(**{self.user_field: user})
+        return queryset
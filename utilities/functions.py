@@ -1,15 +1,13 @@
 import base64
 import hashlib
 import hmac
-import json
 import logging
 import os
-import shutil
 import re
 import string
 from importlib import import_module
 from pathlib import Path
-from typing import Union, Optional, List, Any
+from typing import Union, Optional, List, Any, Iterator
 
 import requests
 from django.conf import settings
@@ -18,7 +16,9 @@ from django.core.exceptions import ValidationError
 from rest_framework import serializers
 from rest_framework.request import Request
 
-from utilities.client import oauth
+from utilities import codec
+from utilities.orion import orion
+from utilities.bulk import bulk_operations
 from utilities.constants import FurnitureType
 
 logger = logging.Logger(__name__)
@@ -183,20 +183,58 @@ def generate_password(username):
 
 
 def batch_delete(entities_map: dict, ):
-    url = settings.ORION_HOST + "/ngsi-ld/v1/entityOperations/delete"
     entities = list()
     for item in entities_map.items():
         for entity in item[1]:
             entities.append(entity)
     if entities:
-        return requests.post(url=url, data=json.dumps(entities), headers=settings.ORION_HEADERS, auth=oauth)
+        return bulk_operations.delete(entities)
 
 
 def query(entity_type: str, params=None) -> requests.Response:
     if params is None:
         params = dict()
-    return requests.request("GET", f"{settings.ORION_ENTITIES}?type={entity_type}&options=keyValues",
-                            headers=settings.ORION_HEADERS, params=params, auth=oauth)
+    return orion.get(f"{settings.ORION_ENTITIES}?type={entity_type}&options=keyValues", params=params)
+
+
+def iter_query(entity_type: str, params=None, page_size: Optional[int] = None,
+               strict: bool = False) -> Iterator[dict]:
+    """
+    Lazily yields every entity of the query, following Orion's limit/offset pagination page by page. The total from
+    the NGSILD-Results-Count header of the first page (the only one that asks for it) bounds the walk, so only one
+    page is held in memory at a time.
+    A failed page raises ``requests.HTTPError`` when ``strict`` is set; otherwise it ends the walk, which only suits
+    the best-effort callers that can live with a truncated list.
+    """
+    params = dict(params or dict())
+    page_size = page_size or settings.ORION_PAGE_SIZE
+    offset = 0
+    total = None
+    while True:
+        page = dict(params, limit=page_size, offset=offset)
+        if offset == 0:
+            page.update(count='true')
+        response = query(entity_type=entity_type, params=page)
+        if response.status_code != 200:
+            logger.error(f"Failed to query the '{entity_type}' entities at offset {offset}: {response.text}")
+            if strict:
+                response.raise_for_status()
+            return
+        entities = response.json()
+        if total is None and response.headers.get('NGSILD-Results-Count') is not None:
+            total = int(response.headers.get('NGSILD-Results-Count'))
+        yield from entities
+        offset += len(entities)
+        if len(entities) < page_size or (total is not None and offset >= total):
+            return
+
+
+def count_entities(entity_type: str, params=None) -> int:
+    params = dict(params or dict(), limit=0, count='true')
+    response = query(entity_type=entity_type, params=params)
+    if response.status_code != 200:
+        return 0
+    return int(response.headers.get('NGSILD-Results-Count', 0))
 
 
 def get_entity(pk: str, params=None) -> requests.Response:
@@ -206,18 +244,17 @@ def get_entity(pk: str, params=None) -> requests.Response:
     url += f'{pk}/?options=keyValues'
     if params is None:
         params = dict()
-    return requests.get(url, headers=settings.ORION_HEADERS, params=params, auth=oauth)
+    return orion.get(url, params=params)
 
 
-def get_entities(entity_type: str, params: dict) -> list:
-    entities = list(query(entity_type=entity_type, params=params).json())
-    return [entity.get('id', None) for entity in entities]
+def get_entities(entity_type: str, params: dict, strict: bool = False) -> list:
+    return [entity.get('id', None) for entity in iter_query(entity_type=entity_type, params=params, strict=strict)]
 
 
-def get_budgets(owner_id: str) -> list:
+def get_budgets(owner_id: str, strict: bool = False) -> list:
     params = dict(q=f'orderBy==\"{owner_id}\"')
     entity_type = 'Budget'
-    return get_entities(entity_type, params)
+    return get_entities(entity_type, params, strict=strict)
 
 
 def get_projects(budget_id: str) -> list:
@@ -226,10 +263,10 @@ def get_projects(budget_id: str) -> list:
     return get_entities(entity_type, params)
 
 
-def get_projects_based_on_owner(owner_id: str) -> list:
+def get_projects_based_on_owner(owner_id: str, strict: bool = False) -> list:
     params = dict(q=f'orderBy==\"{owner_id}\"')
     entity_type = "Project"
-    return get_entities(entity_type, params)
+    return get_entities(entity_type, params, strict=strict)
 
 
 def get_assemblies(project_id: str) -> list:
@@ -292,133 +329,34 @@ def is_furniture_unique(name, budget_id, furniture_type) -> bool:
     return len(get_entities(entity_type, params)) == 0
 
 
+def get_furniture_keys(budget_id: str) -> set:
+    """
+    The (name, furnitureType) pairs of every furniture of the budget, read with one paged query so a batch can check
+    the uniqueness of all its items without querying Orion once per item.
+    """
+    params = dict(q=f'hasBudget==\"{budget_id}\"', attrs='name,furnitureType')
+    return {(entity.get('name'), entity.get('furnitureType'))
+            for entity in iter_query('Furniture', params=params, strict=True)}
+
+
 def map_parts_entities(part_id: str) -> dict:
-    results = dict()
-    work_task_tmp = list()
-    machine_task_tmp = list()
-    work_task_tmp.extend(get_workerTasks(part_id=part_id))
-    machine_task_tmp.extend(get_machineTasks(part_id=part_id))
-    results['WorkTask'] = work_task_tmp
-    results['MachineTask'] = machine_task_tmp
-    return results
+    from utilities.graph import entity_graph
+    return entity_graph.walk(root_type='Part', ids=[part_id])
 
 
 def map_project_entities(project_id: str) -> dict:
-    results = dict()
-    consumables_tmp = list()
-    expeditions_tmp = list()
-    assemblies_tmp = list()
-    group_tmp = list()
-    parts_tmp = list()
-    work_task_tmp = list()
-    machine_task_tmp = list()
-    consumables_tmp.extend(get_consumables(project_id=project_id))
-    expeditions_tmp.extend(get_expeditions(project_id=project_id))
-    group_tmp.extend(get_groups(project_id=project_id))
-    parts = get_parts(project_id=project_id)
-    parts_tmp.extend(parts)
-    for part in parts:
-        work_task_tmp.extend(get_workerTasks(part_id=part))
-        machine_task_tmp.extend(get_machineTasks(part_id=part))
-    assemblies = get_assemblies(project_id=project_id)
-    assemblies_tmp.extend(assemblies)
-    results['Consumable'] = consumables_tmp
-    results['Expedition'] = expeditions_tmp
-    results['Assembly'] = assemblies_tmp
-    results['Group'] = group_tmp
-    results['Part'] = parts_tmp
-    results['WorkTask'] = work_task_tmp
-    results['MachineTask'] = machine_task_tmp
-    return results
+    from utilities.graph import entity_graph
+    return entity_graph.walk(root_type='Project', ids=[project_id])
 
 
 def map_budget_entities(budget_id: str) -> dict:
-    results = dict()
-    projects_tmp = list()
-    consumables_tmp = list()
-    expeditions_tmp = list()
-    assemblies_tmp = list()
-    furniture_tmp = list()
-    modules_tmp = list()
-    group_tmp = list()
-    parts_tmp = list()
-    work_task_tmp = list()
-    machine_task_tmp = list()
-    projects = get_projects(budget_id=budget_id)
-    projects_tmp.extend(projects)
-    furniture = get_furniture(budget_id=budget_id)
-    furniture_tmp.extend(furniture)
-    for furn in furniture:
-        modules = get_modules(furniture_id=furn)
-        modules_tmp.extend(modules)
-    for project in projects:
-        consumables_tmp.extend(get_consumables(project_id=project))
-        expeditions_tmp.extend(get_expeditions(project_id=project))
-        group_tmp.extend(get_groups(project_id=project))
-        parts = get_parts(project_id=project)
-        parts_tmp.extend(parts)
-        for part in parts:
-            work_task_tmp.extend(get_workerTasks(part_id=part))
-            machine_task_tmp.extend(get_machineTasks(part_id=part))
-        assemblies = get_assemblies(project_id=project)
-        assemblies_tmp.extend(assemblies)
-    results['Project'] = projects_tmp
-    results['Consumable'] = consumables_tmp
-    results['Expedition'] = expeditions_tmp
-    results['Assembly'] = assemblies_tmp
-    results['Furniture'] = furniture_tmp
-    results['Module'] = modules_tmp
-    results['Group'] = group_tmp
-    results['Part'] = parts_tmp
-    results['WorkTask'] = work_task_tmp
-    results['MachineTask'] = machine_task_tmp
-    return results
+    from utilities.graph import entity_graph
+    return entity_graph.walk(root_type='Budget', ids=[budget_id])
 
 
 def map_owner_entities(owner_id: str) -> dict:
-    results = dict()
-    projects_tmp = list()
-    consumables_tmp = list()
-    expeditions_tmp = list()
-    assemblies_tmp = list()
-    furniture_tmp = list()
-    modules_tmp = list()
-    group_tmp = list()
-    parts_tmp = list()
-    work_task_tmp = list()
-    machine_task_tmp = list()
-    for budget in get_budgets(owner_id):
-        projects = get_projects(budget_id=budget)
-        projects_tmp.extend(projects)
-        furniture = get_furniture(budget_id=budget)
-        furniture_tmp.extend(furniture)
-        for furn in furniture:
-            modules = get_modules(furniture_id=furn)
-            modules_tmp.extend(modules)
-        for project in projects:
-            consumables_tmp.extend(get_consumables(project_id=project))
-            expeditions_tmp.extend(get_expeditions(project_id=project))
-            group_tmp.extend(get_groups(project_id=project))
-            parts = get_parts(project_id=project)
-            parts_tmp.extend(parts)
-            for part in parts:
-                work_task_tmp.extend(get_workerTasks(part_id=part))
-                machine_task_tmp.extend(get_machineTasks(part_id=part))
-            assemblies = get_assemblies(project_id=project)
-            assemblies_tmp.extend(assemblies)
-
-    results['Budget'] = get_budgets(owner_id)
-    results['Project'] = projects_tmp
-    results['Consumable'] = consumables_tmp
-    results['Expedition'] = expeditions_tmp
-    results['Assembly'] = assemblies_tmp
-    results['Furniture'] = furniture_tmp
-    results['Module'] = modules_tmp
-    results['Group'] = group_tmp
-    results['Part'] = parts_tmp
-    results['WorkTask'] = work_task_tmp
-    results['MachineTask'] = machine_task_tmp
-    return results
+    from utilities.graph import entity_graph
+    return entity_graph.walk(root_type='Owner', ids=[owner_id])
 
 
 def convert_list_into_string(ids: list) -> str:
@@ -450,11 +388,8 @@ def get_budget_owner(budget_id: str):
     from users.models import CustomerProfile
     from django.conf import settings
     from django.db.models import QuerySet
-    import requests
-    from utilities.client import oauth
     url: str = settings.ORION_ENTITIES + f'/{budget_id}/?options=keyValues'
-    headers: dict = settings.ORION_HEADERS
-    response = requests.get(url=url, headers=headers, auth=oauth)
+    response = orion.get(url)
     if response.status_code == 200:
         data = response.json()
         owner: str = data.get('orderBy', None)
@@ -465,6 +400,20 @@ def get_budget_owner(budget_id: str):
                 return customers.first()
 
 
+def get_budget_owners(budget_ids) -> dict:
+    """
+    Resolves the owner of each distinct budget once.
+    """
+    return {budget_id: get_budget_owner(budget_id=budget_id) for budget_id in dict.fromkeys(budget_ids)}
+
+
+def entity_value(data: dict, attr: str):
+    value = data.get(attr)
+    if isinstance(value, dict):
+        return value.get('value', value.get('object'))
+    return value
+
+
 def create_sub_folders(parent, names: list) -> dict:
     folders = dict()
     for name in names:
@@ -492,7 +441,7 @@ def create_budget_folder(budget_id, base_path: Union[str, None] = None) -> bool:
 def get_data(pk: str, params=None) -> Optional[dict]:
     response = get_entity(pk=pk, params=params)
     if response.status_code == 200:
-        return json.loads(response.content.decode('unicode-escape'))
+        return codec.loads(response.content)
 
 
 def get_from_furniture(furniture_id: str, attrs=None) -> List[Optional[Any]]:
@@ -613,6 +562,53 @@ def create_folders_for_furniture(furniture_id: str) -> bool:
     return False
 
 
+def furniture_folder_names(furniture_type: str, name: str, group=None, sub_group=None) -> Optional[list]:
+    if furniture_type == FurnitureType.GROUP.value:
+        return [name]
+    elif furniture_type == FurnitureType.SUBGROUP.value:
+        return [group, name]
+    elif furniture_type == FurnitureType.FURNITURE.value:
+        return [group, sub_group, name]
+
+
+def create_folders_for_furnitures(entities: List[dict], owners: Optional[dict] = None) -> int:
+    """
+    Batch counterpart of ``create_folders_for_furniture`` that works on the payloads that were just sent to Orion
+    instead of reading every furniture back. The owner of each budget is resolved once, the folders shared by the
+    items (budget, project, groups) are looked up once, and everything is created in a single transaction.
+    :param owners: the owners of the budgets the caller already resolved, by budget id.
+    :return: the number of furniture whose folders were created.
+    """
+    from django.db import transaction
+    owners = dict(owners or dict())
+    budget_ids = [entity_value(entity, 'hasBudget') for entity in entities]
+    owners.update(get_budget_owners(budget_id for budget_id in budget_ids if budget_id not in owners))
+    folders = dict()
+
+    def folder(user, name, budget, parent):
+        key = (budget, parent.pk if parent else None, get_valid_name(name=name))
+        if key not in folders:
+            folders[key] = get_folder_or_create(user, name, budget=budget, parent=parent)
+        return folders[key]
+
+    created = 0
+    with transaction.atomic():
+        for entity in entities:
+            budget_id = entity_value(entity, 'hasBudget')
+            customer = owners.get(budget_id)
+            names = furniture_folder_names(entity_value(entity, 'furnitureType'), entity_value(entity, 'name'),
+                                           group=entity_value(entity, 'group'),
+                                           sub_group=entity_value(entity, 'subGroup'))
+            if customer is None or names is None:
+                continue
+            budget_folder = folder(customer.user, get_budget_name(budget_id), budget_id, parent=None)
+            parent = folder(customer.user, 'project', budget_id, parent=budget_folder)
+            for name in names:
+                parent = folder(customer.user, name, budget_id, parent=parent)
+            created += 1
+    return created
+
+
 def update_folder_for_furniture(furniture_id: str, old_name: str) -> bool:
     budget_id, furniture_type, name = get_from_furniture(furniture_id, attrs='hasBudget,furnitureType,name')
     if budget_id:
@@ -677,21 +673,10 @@ def get_budget_name(budget_id: str) -> str:
 
 
 def get_folder_path(obj) -> str:
-    folder_path = ['mofreitas', 'clientes', obj.user.email.__str__()]
-    current_folder = obj
-    while current_folder is not None:
-        folder_path.insert(3, current_folder.name)
-        current_folder = current_folder.parent
-    return "/".join(folder_path)
+    return obj.get_folder_path()
 
 
 def get_file_path(obj) -> str:
-    folder_path = ['mofreitas', 'clientes', obj.folder.user.email.__str__()]
-    current_folder = obj.folder
-    while current_folder is not None:
-        folder_path.insert(3, current_folder.name)
-        current_folder = current_folder.parent
-    folder_path.append(obj.file_name)
     return obj.get_file_path()
 
 
@@ -720,24 +705,21 @@ def has_special_chars(name: str) -> bool:
     return any(char not in printable for char in name)
 
 
-def update_folder_file_system(old_path, new_path, new_parent=None) -> bool:
+def update_folder_file_system(old_path, new_path) -> bool:
+    """
+    Moves the directory of a folder, and everything below it, with a single rename. Returns False when there is no
+    directory at ``old_path``.
+    """
     old_path = Path(settings.MEDIA_ROOT).joinpath(old_path)
     new_path = Path(settings.MEDIA_ROOT).joinpath(new_path)
-    name_changed = old_path.name != new_path.name
-    if new_parent is not None and not name_changed:
-        from bucket.models import Folder
-        parents = Folder.objects.filter(pk=new_parent.pk)
-        if not parents.exists():
-            msg = f"Fail to create folder, no parent folder found with the pk: '{new_parent}'"
-            logger.warning(msg)
-            raise ValidationError(msg)
-        parent = parents.first()
-        if old_path.exists() and not new_path.exists():
-            shutil.move(old_path.__str__(), Path(settings.MEDIA_ROOT).joinpath(parent.path).__str__())
-            return True
-    if old_path.exists() and not new_path.exists() and name_changed:
-        os.rename(old_path.__str__(), new_path.__str__())
-        return True
+    if not old_path.exists():
+        return False
+    if new_path.exists():
+        msg = f"Fail to move the folder, there is already a folder at '{new_path}'"
+        logger.warning(msg)
+        raise ValidationError(msg)
+    new_path.parent.mkdir(parents=True, exist_ok=True)
+    os.rename(old_path.__str__(), new_path.__str__())
     return True
 
 
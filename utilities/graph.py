@@ -0,0 +1,83 @@
+import contextvars
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+
+# parent type -> [(child type, relationship attribute on the child, key used in the result map)]
+ENTITY_GRAPH: Dict[str, List[Tuple[str, str, str]]] = {
+    'Owner': [('Budget', 'orderBy', 'Budget')],
+    'Budget': [('Project', 'hasBudget', 'Project'), ('Furniture', 'hasBudget', 'Furniture')],
+    'Furniture': [('Module', 'belongsToFurniture', 'Module')],
+    'Project': [('Consumable', 'belongsTo', 'Consumable'), ('Expedition', 'belongsTo', 'Expedition'),
+                ('Assembly', 'belongsTo', 'Assembly'), ('Group', 'belongsTo', 'Group'),
+                ('Part', 'belongsTo', 'Part')],
+    'Part': [('WorkerTask', 'executedIn', 'WorkTask'), ('MachineTask', 'performedOn', 'MachineTask')],
+}
+
+
+class EntityGraph(object):
+    """
+    Walks the Orion entity graph (Owner -> Budget -> Project/Furniture -> ...) one level at a time.
+
+    The children of every node of a level are fetched with one ``q=attr=="a","b",...`` query per child type (split
+    in chunks of ``chunk_size`` ids to keep the URL short), and all the queries of a level run concurrently on a
+    bounded thread pool.
+    """
+
+    def __init__(self, graph: Dict[str, List[Tuple[str, str, str]]] = None, max_workers: int = 8,
+                 chunk_size: int = 50) -> None:
+        self.graph = graph or ENTITY_GRAPH
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+
+    @classmethod
+    def from_settings(cls) -> 'EntityGraph':
+        config: dict = settings.ORION_GRAPH
+        return cls(max_workers=config.get('MAX_WORKERS'), chunk_size=config.get('CHUNK_SIZE'))
+
+    def chunks(self, ids: list) -> List[list]:
+        return [ids[i:i + self.chunk_size] for i in range(0, len(ids), self.chunk_size)]
+
+    def result_keys(self, root_type: str) -> List[str]:
+        keys = list()
+        level = [root_type]
+        while level:
+            children = list()
+            for parent_type in level:
+                for child_type, _, key in self.graph.get(parent_type, []):
+                    if key not in keys:
+                        keys.append(key)
+                        children.append(child_type)
+            level = children
+        return keys
+
+    def fetch_children(self, child_type: str, attr: str, ids: list) -> list:
+        from utilities.functions import iter_query, convert_list_into_string
+        params = dict(q=f'{attr}=={convert_list_into_string(ids)}', attrs=attr)
+        return [entity.get('id') for entity in iter_query(entity_type=child_type, params=params, strict=True)
+                if entity.get('id')]
+
+    def walk(self, root_type: str, ids: list) -> Dict[str, list]:
+        results: Dict[str, list] = OrderedDict((key, list()) for key in self.result_keys(root_type))
+        level: Dict[str, list] = {root_type: list(ids)}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while level:
+                jobs = list()
+                for parent_type, parent_ids in level.items():
+                    for child_type, attr, key in self.graph.get(parent_type, []):
+                        for chunk in self.chunks(parent_ids):
+                            future = executor.submit(contextvars.copy_context().run, self.fetch_children,
+                                                     child_type, attr, chunk)
+                            jobs.append((child_type, key, future))
+                level = dict()
+                for child_type, key, future in jobs:
+                    children = future.result()
+                    results[key].extend(children)
+                    if children and child_type in self.graph:
+                        level.setdefault(child_type, list()).extend(children)
+        return results
+
+
+entity_graph = EntityGraph.from_settings()
@@ -0,0 +1,113 @@
+import logging
+import os
+import time
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker(object):
+    """
+    Health state of the Orion-LD broker, shared by every worker through the cache backend.
+
+    While the circuit is closed, Orion is probed at most once every ``check_interval`` seconds and by a single worker
+    at a time; all other requests read the last known state from the cache. Connection failures reported by the Orion
+    client count towards ``failure_threshold``; once it is reached the circuit opens and requests fail fast until
+    ``recovery_timeout`` has passed and a probe succeeds again.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+
+    def __init__(self, name: str, url: str, check_interval: float = 10, failure_threshold: int = 3,
+                 recovery_timeout: float = 30, probe_timeout: float = 2) -> None:
+        self.name = name
+        self.url = url
+        self.check_interval = check_interval
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.probe_timeout = probe_timeout
+
+    @classmethod
+    def from_settings(cls) -> 'CircuitBreaker':
+        config: dict = settings.ORION_HEALTH
+        return cls(
+            name='orion',
+            url=settings.ORION_ENTITIES,
+            check_interval=config.get('CHECK_INTERVAL'),
+            failure_threshold=config.get('FAILURE_THRESHOLD'),
+            recovery_timeout=config.get('RECOVERY_TIMEOUT'),
+            probe_timeout=config.get('PROBE_TIMEOUT'),
+        )
+
+    @property
+    def state_key(self) -> str:
+        return f"circuit:{self.name}:state"
+
+    @property
+    def failures_key(self) -> str:
+        return f"circuit:{self.name}:failures"
+
+    @property
+    def lock_key(self) -> str:
+        return f"circuit:{self.name}:probe"
+
+    def get_state(self) -> dict:
+        return cache.get(self.state_key) or dict(state=self.CLOSED, checked_at=0, opened_at=0)
+
+    def set_state(self, state: str, opened_at: float = 0) -> None:
+        data = dict(state=state, checked_at=time.time(), opened_at=opened_at)
+        cache.set(self.state_key, data, timeout=None)
+
+    def is_open(self) -> bool:
+        return self.get_state().get('state') == self.OPEN
+
+    def allow_request(self) -> bool:
+        data = self.get_state()
+        now = time.time()
+        if data.get('state') == self.OPEN:
+            if now - data.get('opened_at', 0) < self.recovery_timeout:
+                return False
+        elif now - data.get('checked_at', 0) < self.check_interval:
+            return True
+        # Only one worker probes the broker, the others keep using the last known state.
+        if not cache.add(self.lock_key, os.getpid(), timeout=self.probe_timeout * 2):
+            return data.get('state') != self.OPEN
+        try:
+            return self.probe()
+        finally:
+            cache.delete(self.lock_key)
+
+    def probe(self) -> bool:
+        # The probe bypasses the pooled Orion client on purpose: it must not be retried, it only needs to know whether
+        # the broker answers at all.
+        try:
+            requests.get(self.url, headers=settings.ORION_HEADERS, timeout=self.probe_timeout)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as error:
+            logger.warning(f"The {self.name} health probe failed: {error}")
+            self.open()
+            return False
+        self.close()
+        return True
+
+    def record_failure(self) -> None:
+        cache.add(self.failures_key, 0, timeout=self.recovery_timeout)
+        try:
+            failures = cache.incr(self.failures_key)
+        except ValueError:
+            failures = 1
+        if failures >= self.failure_threshold and not self.is_open():
+            logger.warning(f"Opening the {self.name} circuit after {failures} consecutive failures.")
+            self.open()
+
+    def open(self) -> None:
+        self.set_state(self.OPEN, opened_at=time.time())
+
+    def close(self) -> None:
+        cache.delete(self.failures_key)
+        self.set_state(self.CLOSED)
+
+
+orion_health = CircuitBreaker.from_settings()
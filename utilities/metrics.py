@@ -0,0 +1,150 @@
+import contextvars
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from prometheus_client import CollectorRegistry, Counter, Histogram, CONTENT_TYPE_LATEST, generate_latest
+from prometheus_client import REGISTRY, multiprocess
+
+REQUEST_SECONDS = Histogram('ww4api_request_seconds', 'Time spent answering a request.',
+                            ['view', 'action', 'status'])
+DEPENDENCY_CALLS = Counter('ww4api_dependency_calls_total', 'Calls made to a dependency (orion, keyrock, db, cache).',
+                           ['view', 'action', 'dependency'])
+DEPENDENCY_SECONDS = Counter('ww4api_dependency_seconds_total', 'Time spent in the calls made to a dependency.',
+                             ['view', 'action', 'dependency'])
+CALLS_PER_REQUEST = Histogram('ww4api_dependency_calls_per_request', 'Calls made to a dependency by a single request.',
+                              ['view', 'action', 'dependency'], buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500))
+
+
+class RequestMetrics(object):
+    """
+    What a single request (or Celery task) spent in its dependencies: ``calls`` maps a dependency to its number of
+    calls and their total time in seconds. The calls of the worker threads the request starts are added too.
+    """
+
+    def __init__(self, view: str = '', action: str = '') -> None:
+        self.view = view
+        self.action = action
+        self.started = time.perf_counter()
+        self.calls: Dict[str, List] = defaultdict(lambda: [0, 0.0])
+        self._lock = threading.Lock()
+
+    def add(self, dependency: str, seconds: float = 0.0) -> None:
+        with self._lock:
+            calls = self.calls[dependency]
+            calls[0] += 1
+            calls[1] += seconds
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+
+class Metrics(object):
+    """
+    Hot-path instrumentation of the API.
+
+    The ``MetricsMiddleware`` and the Celery signals open a ``RequestMetrics`` per request or task; the Orion clients,
+    the Keyrock token provider, the database connections and the caches report their calls to it through ``timed``
+    and ``count``. When the request ends, the totals are exported as Prometheus metrics labelled by view class and
+    action, and summed up in a ``Server-Timing`` header when ``server_timing`` is set.
+    """
+    # Dependencies reported in the Server-Timing header, in this order.
+    DEPENDENCIES = ('orion', 'keyrock', 'db', 'cache-hit', 'cache-miss')
+
+    def __init__(self, enabled: bool = True, server_timing: bool = False, token: Optional[str] = None) -> None:
+        self.enabled = enabled
+        self.server_timing = server_timing
+        self.token = token
+        self._current: contextvars.ContextVar = contextvars.ContextVar('request_metrics', default=None)
+
+    @classmethod
+    def from_settings(cls) -> 'Metrics':
+        config: dict = settings.METRICS
+        return cls(enabled=config.get('ENABLED'), server_timing=config.get('SERVER_TIMING'),
+                   token=config.get('TOKEN'))
+
+    @property
+    def current(self) -> Optional[RequestMetrics]:
+        return self._current.get()
+
+    def begin(self, view: str = '', action: str = '') -> Optional[contextvars.Token]:
+        if not self.enabled:
+            return None
+        return self._current.set(RequestMetrics(view=view, action=action))
+
+    def tag(self, view: str, action: str) -> None:
+        current = self.current
+        if current is not None:
+            current.view, current.action = view, action
+
+    def end(self, token: Optional[contextvars.Token], status: str = '') -> Optional[RequestMetrics]:
+        if token is None:
+            return None
+        current = self.current
+        self._current.reset(token)
+        if current is None:
+            return None
+        labels = dict(view=current.view or 'unknown', action=current.action or 'unknown')
+        REQUEST_SECONDS.labels(status=status, **labels).observe(current.elapsed)
+        for dependency in self.DEPENDENCIES:
+            count, seconds = current.calls.get(dependency, (0, 0.0))
+            CALLS_PER_REQUEST.labels(dependency=dependency, **labels).observe(count)
+            if count:
+                DEPENDENCY_CALLS.labels(dependency=dependency, **labels).inc(count)
+                DEPENDENCY_SECONDS.labels(dependency=dependency, **labels).inc(seconds)
+        return current
+
+    @contextmanager
+    def timed(self, dependency: str):
+        current = self.current
+        if current is None:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            current.add(dependency, time.perf_counter() - started)
+
+    def count(self, dependency: str) -> None:
+        current = self.current
+        if current is not None:
+            current.add(dependency)
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        """
+        Database ``execute_wrapper`` installed on every connection (see ``connection_created``).
+        """
+        with self.timed('db'):
+            return execute(sql, params, many, context)
+
+    def header(self, current: RequestMetrics) -> str:
+        parts = list()
+        for dependency in self.DEPENDENCIES:
+            count, seconds = current.calls.get(dependency, (0, 0.0))
+            if not count:
+                continue
+            if dependency.startswith('cache-'):
+                parts.append(f'{dependency};desc="{count}"')
+            else:
+                parts.append(f'{dependency};desc="{count} calls";dur={seconds * 1000:.1f}')
+        parts.append(f'total;dur={current.elapsed * 1000:.1f}')
+        return ', '.join(parts)
+
+    @staticmethod
+    def export() -> Tuple[bytes, str]:
+        if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+            # Every gunicorn and celery worker writes its own samples; add them up.
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+metrics = Metrics.from_settings()
@@ -0,0 +1,217 @@
+import asyncio
+import os
+import threading
+import weakref
+from typing import Optional, Tuple
+
+import httpx
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utilities.client import oauth
+from utilities.health import orion_health
+from utilities.metrics import metrics
+from utilities.singleflight import single_flight
+
+
+class OrionClient(object):
+    """
+    HTTP client shared by every call to the Orion-LD broker.
+
+    Each worker process owns a single ``requests.Session`` with a keep-alive connection pool, so consecutive calls to
+    orion-proxy reuse the same TCP connections instead of opening a new one per request. Idempotent requests are
+    retried with an exponential backoff and every call gets a default (connect, read) timeout.
+    """
+
+    RETRY_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'DELETE'])
+    RETRY_STATUS = (502, 503, 504)
+
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 20, max_retries: int = 3,
+                 backoff_factor: float = 0.3, timeout: Tuple[float, float] = (3.05, 30)) -> None:
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+        self._session: Optional[requests.Session] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> 'OrionClient':
+        config: dict = settings.ORION_CLIENT
+        return cls(
+            pool_connections=config.get('POOL_CONNECTIONS'),
+            pool_maxsize=config.get('POOL_MAXSIZE'),
+            max_retries=config.get('MAX_RETRIES'),
+            backoff_factor=config.get('BACKOFF_FACTOR'),
+            timeout=(config.get('CONNECT_TIMEOUT'), config.get('READ_TIMEOUT')),
+        )
+
+    def create_session(self) -> requests.Session:
+        retry = Retry(total=self.max_retries, connect=self.max_retries, read=self.max_retries,
+                      status=self.max_retries, backoff_factor=self.backoff_factor,
+                      status_forcelist=self.RETRY_STATUS, allowed_methods=self.RETRY_METHODS,
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize,
+                              max_retries=retry)
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    @property
+    def session(self) -> requests.Session:
+        # Sockets must never be shared between a parent and a forked gunicorn/celery worker, so the session is
+        # (re)created lazily inside the process that uses it.
+        if self._session is None or self._pid != os.getpid():
+            with self._lock:
+                if self._session is None or self._pid != os.getpid():
+                    self._session = self.create_session()
+                    self._pid = os.getpid()
+        return self._session
+
+    def close(self) -> None:
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+            self._session = None
+            self._pid = None
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault('headers', settings.ORION_HEADERS)
+        kwargs.setdefault('auth', oauth)
+        kwargs.setdefault('timeout', self.timeout)
+        try:
+            with metrics.timed('orion'):
+                response = self.session.request(method, url, **kwargs)
+            if response.status_code == 401 and kwargs.get('auth') is oauth:
+                # The token was revoked or Keyrock restarted before it expired: drop it and retry once.
+                oauth.invalidate()
+                with metrics.timed('orion'):
+                    response = self.session.request(method, url, **kwargs)
+            return response
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            orion_health.record_failure()
+            raise
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        if set(kwargs) - {'params'}:
+            # Streamed reads and custom headers, auth or timeouts are never shared.
+            return self.request('GET', url, **kwargs)
+        key = single_flight.key(url, kwargs.get('params'))
+        return single_flight.do(key, lambda: self.request('GET', url, **kwargs))
+
+    def post(self, url: str, data=None, **kwargs) -> requests.Response:
+        return self.request('POST', url, data=data, **kwargs)
+
+    def patch(self, url: str, data=None, **kwargs) -> requests.Response:
+        return self.request('PATCH', url, data=data, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> requests.Response:
+        return self.request('DELETE', url, **kwargs)
+
+
+class AsyncOrionClient(object):
+    """
+    Non-blocking counterpart of :class:`OrionClient` used by the async proxy views.
+
+    Every event loop owns one ``httpx.AsyncClient`` whose pool holds up to ``max_connections`` keep-alive connections,
+    so a single ASGI worker can keep hundreds of Orion calls in flight. Idempotent requests are retried on connection
+    errors and on 502/503/504 with the same exponential backoff as the sync client.
+    """
+
+    RETRY_METHODS = OrionClient.RETRY_METHODS
+    RETRY_STATUS = OrionClient.RETRY_STATUS
+
+    def __init__(self, max_connections: int = 100, max_keepalive_connections: int = 20, max_retries: int = 3,
+                 backoff_factor: float = 0.3, timeout: Tuple[float, float] = (3.05, 30)) -> None:
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+        self._clients: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]' = \
+            weakref.WeakKeyDictionary()
+
+    @classmethod
+    def from_settings(cls) -> 'AsyncOrionClient':
+        config: dict = settings.ORION_CLIENT
+        return cls(
+            max_connections=config.get('ASYNC_MAX_CONNECTIONS'),
+            max_keepalive_connections=config.get('POOL_MAXSIZE'),
+            max_retries=config.get('MAX_RETRIES'),
+            backoff_factor=config.get('BACKOFF_FACTOR'),
+            timeout=(config.get('CONNECT_TIMEOUT'), config.get('READ_TIMEOUT')),
+        )
+
+    def create_client(self) -> httpx.AsyncClient:
+        connect, read = self.timeout
+        limits = httpx.Limits(max_connections=self.max_connections,
+                              max_keepalive_connections=self.max_keepalive_connections)
+        return httpx.AsyncClient(limits=limits, timeout=httpx.Timeout(read, connect=connect))
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # An httpx client is bound to the loop that opened its connections. Under an ASGI worker there is one loop
+        # per process; when an async view runs under WSGI each request gets its own short-lived loop.
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = self._clients[loop] = self.create_client()
+        return client
+
+    async def close(self) -> None:
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    @staticmethod
+    async def authorization() -> dict:
+        # The token is read from memory; only a refresh, which blocks on Keyrock, is moved to a worker thread.
+        token = oauth.cached_token or await sync_to_async(oauth.get_token, thread_sensitive=False)()
+        return dict(Authorization=f"Bearer {token}")
+
+    def backoff(self, attempt: int) -> float:
+        return 0 if attempt == 0 else self.backoff_factor * (2 ** attempt)
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        headers = dict(kwargs.pop('headers', None) or settings.ORION_HEADERS)
+        headers.update(await self.authorization())
+        retries = self.max_retries if method in self.RETRY_METHODS else 0
+        for attempt in range(retries + 1):
+            try:
+                with metrics.timed('orion'):
+                    response = await self.client.request(method, url, headers=headers, **kwargs)
+            except (httpx.ConnectError, httpx.TimeoutException):
+                if attempt < retries:
+                    await asyncio.sleep(self.backoff(attempt))
+                    continue
+                await sync_to_async(orion_health.record_failure)()
+                raise
+            if response.status_code in self.RETRY_STATUS and attempt < retries:
+                await asyncio.sleep(self.backoff(attempt))
+                continue
+            return response
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        if set(kwargs) - {'params'}:
+            return await self.request('GET', url, **kwargs)
+        key = single_flight.key(url, kwargs.get('params'))
+        return await single_flight.do_async(key, lambda: self.request('GET', url, **kwargs))
+
+    async def post(self, url: str, data=None, **kwargs) -> httpx.Response:
+        return await self.request('POST', url, content=data, **kwargs)
+
+    async def patch(self, url: str, data=None, **kwargs) -> httpx.Response:
+        return await self.request('PATCH', url, content=data, **kwargs)
+
+    async def delete(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request('DELETE', url, **kwargs)
+
+
+orion = OrionClient.from_settings()
+async_orion = AsyncOrionClient.from_settings()
@@ -1,3 +1,5 @@
+import hmac
+
 from rest_framework import permissions
 from .functions import flat_list, generate_perms
 from .constants import RESOURCES
@@ -134,6 +136,36 @@ class EmailPermission(permissions.BasePermission):
         return request.user.is_admin or request.user.is_worker
 
 
+class IsAdminOrWorker(permissions.BasePermission):
+
+    def has_permission(self, request, view):
+        return bool(request.user) and (request.user.is_admin or request.user.is_worker)
+
+
+class HasNotificationToken(permissions.BasePermission):
+    """
+    Checks the shared secret of an Orion-LD subscription, read from the ``token_header`` header of the request and
+    compared with the ``notification_token`` of the view.
+    """
+
+    def has_permission(self, request, view):
+        expected = getattr(view, 'notification_token', None)
+        token = request.headers.get(getattr(view, 'token_header', ''), '')
+        return bool(expected) and hmac.compare_digest(token, expected)
+
+
+class HasMetricsToken(permissions.BasePermission):
+    """
+    Lets Prometheus in with the bearer token of the metrics; without one configured, only staff users.
+    """
+
+    def has_permission(self, request, view):
+        from utilities.metrics import metrics
+        if not metrics.token:
+            return bool(request.user and request.user.is_staff)
+        return hmac.compare_digest(request.headers.get('Authorization', ''), f"Bearer {metrics.token}")
+
+
 class IsResourceOwner(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         return request.user == obj.user
@@ -0,0 +1,163 @@
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from utilities.graph import ENTITY_GRAPH
+
+logger = logging.getLogger(__name__)
+
+
+class RelationshipProjection(object):
+    """
+    Read-model of the Orion relationships used for access control, stored in the ``EntityRelationship`` table.
+
+    Every entity below an Owner is recorded with its parent (through the relationship attribute of ``ENTITY_GRAPH``)
+    and with the Owner it belongs to: ``orderBy`` when the entity carries it, the owner of its parent otherwise. Rows
+    are upserted on ``orion_entity_changed`` (the notifications of ``registersubscriptions`` and the writes made
+    through the API) and rebuilt by a periodic reconciliation, which also drops the rows of entities that no longer
+    exist.
+    """
+
+    def __init__(self, enabled: bool = False, graph: Dict[str, List[Tuple[str, str, str]]] = None,
+                 batch_size: int = 1000) -> None:
+        self.enabled = enabled
+        self.graph = graph or ENTITY_GRAPH
+        self.batch_size = batch_size
+        # child type -> (parent type, relationship attribute on the child)
+        self.parents: Dict[str, Tuple[str, str]] = {
+            child_type: (parent_type, attr)
+            for parent_type, children in self.graph.items() for child_type, attr, _ in children}
+
+    @classmethod
+    def from_settings(cls) -> 'RelationshipProjection':
+        config: dict = settings.ORION_PROJECTION
+        return cls(enabled=config.get('ENABLED'), batch_size=config.get('BATCH_SIZE'))
+
+    @property
+    def types(self) -> List[str]:
+        """
+        The projected types, parents before their children.
+        """
+        types, level = list(), ['Owner']
+        while level:
+            children = [child_type for parent_type in level for child_type, _, _ in self.graph.get(parent_type, [])
+                        if child_type not in types]
+            types.extend(children)
+            level = children
+        return types
+
+    @staticmethod
+    def value(entity: dict, attr: Optional[str]) -> Optional[str]:
+        value = entity.get(attr) if attr else None
+        if isinstance(value, dict):
+            return value.get('object', value.get('value'))
+        return value
+
+    def row(self, entity: dict, owners: dict, synced=None):
+        from entities.models import EntityRelationship
+        _, attr = self.parents.get(entity.get('type'), (None, None))
+        parent = self.value(entity, attr)
+        return EntityRelationship(id=entity.get('id'), type=entity.get('type'), parent=parent,
+                                  owner=self.value(entity, 'orderBy') or owners.get(parent),
+                                  synced=synced or timezone.now())
+
+    def save(self, rows: list) -> None:
+        from entities.models import EntityRelationship
+        ids = [row.id for row in rows]
+        existing = set()
+        for start in range(0, len(ids), self.batch_size):
+            existing.update(EntityRelationship.objects.filter(id__in=ids[start:start + self.batch_size])
+                            .values_list('id', flat=True))
+        EntityRelationship.objects.bulk_update([row for row in rows if row.id in existing],
+                                               ['type', 'parent', 'owner', 'synced'], batch_size=self.batch_size)
+        EntityRelationship.objects.bulk_create([row for row in rows if row.id not in existing],
+                                               batch_size=self.batch_size, ignore_conflicts=True)
+
+    @staticmethod
+    def propagate(ids: list, owner: str) -> None:
+        """
+        Hands ``owner`` down to the descendants of ``ids`` that were recorded before their parent.
+        """
+        from entities.models import EntityRelationship
+        while ids:
+            children = list(EntityRelationship.objects.filter(parent__in=ids).exclude(owner=owner)
+                            .values_list('id', flat=True))
+            EntityRelationship.objects.filter(id__in=children).update(owner=owner)
+            ids = children
+
+    def apply(self, entities: List[dict]) -> int:
+        """
+        Upserts the rows of the entities of a notification (keyValues or normalized payloads). Entities that do not
+        carry their parent relationship, like the payload of a partial update, are left as they are.
+        """
+        from entities.models import EntityRelationship
+        levels = dict((entity_type, level) for level, entity_type in enumerate(self.types))
+        entities = sorted([entity for entity in entities if entity.get('id') and entity.get('type') in levels
+                           and self.parents[entity.get('type')][1] in entity],
+                          key=lambda entity: levels[entity.get('type')])
+        parent_ids = {self.value(entity, self.parents[entity.get('type')][1]) for entity in entities} - {None}
+        owners = dict(EntityRelationship.objects.filter(id__in=parent_ids).values_list('id', 'owner'))
+        rows = list()
+        for entity in entities:
+            row = self.row(entity, owners)
+            owners[row.id] = row.owner
+            rows.append(row)
+        by_owner = defaultdict(list)
+        for row in rows:
+            if row.owner:
+                by_owner[row.owner].append(row.id)
+        with transaction.atomic():
+            self.save(rows)
+            for owner, ids in by_owner.items():
+                self.propagate(ids, owner)
+        return len(rows)
+
+    def remove(self, ids: list) -> None:
+        from entities.models import EntityRelationship
+        for start in range(0, len(ids), self.batch_size):
+            EntityRelationship.objects.filter(id__in=ids[start:start + self.batch_size]).delete()
+
+    def reconcile(self) -> Dict[str, int]:
+        """
+        Rebuilds the projection from Orion, type by type, and drops the rows of the entities that are gone.
+        """
+        from entities.models import EntityRelationship
+        from utilities.functions import iter_query
+        owners, counts = dict(), dict()
+        for entity_type in self.types:
+            started = timezone.now()
+            _, attr = self.parents[entity_type]
+            params = dict(attrs=','.join(sorted({attr, 'orderBy'})))
+            rows = [self.row(entity, owners, synced=started) for entity in
+                    iter_query(entity_type, params=params, strict=True)]
+            owners.update((row.id, row.owner) for row in rows)
+            with transaction.atomic():
+                self.save(rows)
+                EntityRelationship.objects.filter(type=entity_type, synced__lt=started).delete()
+            counts[entity_type] = len(rows)
+        logger.info(f"Reconciled the relationship projection: {counts}")
+        return counts
+
+    def owned(self, owner_id: str, entity_type: str) -> list:
+        from entities.models import EntityRelationship
+        return list(EntityRelationship.objects.filter(owner=owner_id, type=entity_type).values_list('id', flat=True))
+
+    def owner_of(self, pk: str) -> Optional[str]:
+        from entities.models import EntityRelationship
+        return EntityRelationship.objects.filter(id=pk).values_list('owner', flat=True).first()
+
+    def is_owned(self, pk: Optional[str], owner_id: str, entity_type: Optional[str] = None) -> bool:
+        from entities.models import EntityRelationship
+        if not pk:
+            return False
+        rows = EntityRelationship.objects.filter(id=pk, owner=owner_id)
+        if entity_type:
+            rows = rows.filter(type=entity_type)
+        return rows.exists()
+
+
+projection = RelationshipProjection.from_settings()
@@ -0,0 +1,115 @@
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from utilities.metrics import metrics
+from utilities.projection import projection
+
+
+class OwnerScope(object):
+    """
+    Per-owner cache of the project, budget and furniture ids a customer is allowed to see.
+
+    The customer-facing views scope their Orion queries with these ids, so resolving them from the cache turns a list
+    call into a single round-trip to the broker. Entries expire after ``timeout`` seconds and are dropped as soon as a
+    budget, project or furniture of the owner is created or deleted.
+
+    When the relationship projection is enabled the ids are read from it instead, with an indexed query per call, and
+    ``owns`` checks a single entity without loading the whole list.
+    """
+    KINDS = ('projects', 'budgets', 'furniture')
+    TYPES = dict(projects='Project', budgets='Budget', furniture='Furniture')
+
+    def __init__(self, timeout: int = 300) -> None:
+        self.timeout = timeout
+
+    @classmethod
+    def from_settings(cls) -> 'OwnerScope':
+        return cls(timeout=settings.ORION_SCOPE_CACHE_TIMEOUT)
+
+    @staticmethod
+    def key(owner_id: str, kind: str) -> str:
+        return f"scope:{owner_id}:{kind}"
+
+    def get_or_fetch(self, owner_id: str, kind: str, fetch: Callable[[], list]) -> list:
+        if projection.enabled:
+            return projection.owned(owner_id, self.TYPES[kind])
+        key = self.key(owner_id, kind)
+        ids = cache.get(key)
+        metrics.count('cache-hit' if ids is not None else 'cache-miss')
+        if ids is None:
+            ids = fetch()
+            cache.set(key, ids, timeout=self.timeout)
+        return ids
+
+    def projects(self, owner_id: str) -> list:
+        from utilities.functions import get_projects_based_on_owner
+        return self.get_or_fetch(owner_id, 'projects', lambda: get_projects_based_on_owner(owner_id=owner_id, strict=True))
+
+    def budgets(self, owner_id: str) -> list:
+        from utilities.functions import get_budgets
+        return self.get_or_fetch(owner_id, 'budgets', lambda: get_budgets(owner_id=owner_id, strict=True))
+
+    def furniture(self, owner_id: str) -> list:
+        from utilities.graph import entity_graph
+
+        def fetch() -> list:
+            ids = list()
+            for chunk in entity_graph.chunks(self.budgets(owner_id)):
+                ids.extend(entity_graph.fetch_children('Furniture', 'hasBudget', chunk))
+            return ids
+
+        return self.get_or_fetch(owner_id, 'furniture', fetch)
+
+    def owns(self, owner_id: str, pk: Optional[str], kind: str) -> bool:
+        if projection.enabled:
+            return projection.is_owned(pk, owner_id, entity_type=self.TYPES[kind])
+        return pk in getattr(self, kind)(owner_id=owner_id)
+
+    def invalidate(self, owner_id: Optional[str]) -> None:
+        if owner_id:
+            cache.delete_many([self.key(owner_id, kind) for kind in self.KINDS])
+
+    @staticmethod
+    def get_owner(pk: str, attr: str = 'orderBy') -> Optional[str]:
+        from utilities.functions import get_data
+        data = get_data(pk=pk, params=dict(attrs=attr))
+        if data:
+            return data.get(attr)
+
+    def invalidate_budget(self, budget_id: str) -> None:
+        self.invalidate(self.get_owner(budget_id))
+
+    def invalidate_project(self, project_id: str) -> None:
+        self.invalidate(self.get_owner(project_id))
+
+    def invalidate_budgets(self, budget_ids, owners: Optional[dict] = None) -> None:
+        """
+        Drops the scope of the owner of each distinct budget. ``owners`` maps the budget ids whose owner profile the
+        caller already resolved, which are invalidated without asking Orion.
+        """
+        from utilities.functions import generate_urn_identifier
+        owners = owners or dict()
+        for budget_id in dict.fromkeys(budget_ids):
+            if not budget_id:
+                continue
+            customer = owners.get(budget_id)
+            if customer is not None:
+                self.invalidate(generate_urn_identifier(_type="Owner", uid=customer.pk))
+            else:
+                self.invalidate_budget(budget_id)
+
+    def invalidate_furniture(self, *furniture_ids: str) -> None:
+        from utilities.functions import iter_query
+        from utilities.graph import entity_graph
+        budgets = list()
+        # Keep the id lists of the queries short enough for the broker's URL limit.
+        for chunk in entity_graph.chunks(list(furniture_ids)):
+            params = dict(id=','.join(chunk), attrs='hasBudget')
+            entities = iter_query(entity_type='Furniture', params=params, strict=True)
+            budgets.extend(entity.get('hasBudget') for entity in entities)
+        self.invalidate_budgets(budgets)
+
+
+owner_scope = OwnerScope.from_settings()
@@ -2,11 +2,12 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.shortcuts import reverse
+from django.utils.module_loading import import_string
 from hashid_field.rest import HashidSerializerCharField
 from localflavor.generic.countries.iso_3166 import ISO_3166_1_ALPHA2_COUNTRY_CODES
 from rest_framework import serializers, request
 from vies.types import VATIN
-from typing import Union
+from typing import Optional, Set, Union
 from django.contrib.auth.models import Group as Django_Group
 from users.models import Address
 from bucket.models import Folder
@@ -18,6 +19,55 @@ from .functions import get_postcode_validator
 User = get_user_model()
 
 
+class SparseFieldsMixin(object):
+    """
+    Sparse fieldsets for the GET answers of a serializer: ``?fields=id,name`` keeps only the listed fields and
+    ``?expand=parent`` renders the relations of ``Meta.expandable`` (field name -> serializer class or its dotted path)
+    with that serializer instead of their id. Only the top-level serializer reads the query string.
+
+    Views use ``wants`` and ``expands`` to prefetch only the relations the answer will render.
+    """
+    FIELDS_PARAM = 'fields'
+    EXPAND_PARAM = 'expand'
+
+    @staticmethod
+    def query_list(request, name: str) -> Optional[Set[str]]:
+        if request is None or request.method != 'GET' or not request.query_params.get(name):
+            return None
+        return {item.strip() for item in request.query_params.get(name).split(',') if item.strip()}
+
+    @classmethod
+    def wants(cls, request, name: str) -> bool:
+        fields = cls.query_list(request, cls.FIELDS_PARAM)
+        return fields is None or name in fields
+
+    @classmethod
+    def expands(cls, request, name: str) -> bool:
+        return cls.wants(request, name) and name in (cls.query_list(request, cls.EXPAND_PARAM) or set())
+
+    def is_top_level(self) -> bool:
+        if isinstance(self.parent, serializers.ListSerializer):
+            return self.parent.parent is None
+        return self.parent is None
+
+    def get_fields(self):
+        fields = super(SparseFieldsMixin, self).get_fields()
+        request = self.context.get('request')
+        if not self.is_top_level():
+            return fields
+        expandable: dict = getattr(self.Meta, 'expandable', dict())
+        for name in (self.query_list(request, self.EXPAND_PARAM) or set()) & set(expandable) & set(fields):
+            serializer = expandable[name]
+            if isinstance(serializer, str):
+                serializer = import_string(serializer)
+            fields[name] = serializer(many=isinstance(fields[name], serializers.ManyRelatedField), read_only=True)
+        wanted = self.query_list(request, self.FIELDS_PARAM)
+        if wanted:
+            for name in set(fields) - wanted:
+                fields.pop(name)
+        return fields
+
+
 class OrionGroupSerializer(serializers.ModelSerializer):
     id = HashidSerializerCharField(read_only=True, required=False)
 
@@ -293,7 +343,7 @@ class NestedProfileSerializer(serializers.ModelSerializer):
         }
 
 
-class ProfileSerializer(NestedProfileSerializer):
+class ProfileSerializer(SparseFieldsMixin, NestedProfileSerializer):
     id = HashidSerializerCharField(read_only=True, required=False)
     url = serializers.SerializerMethodField()
     user = UserSerializer()
@@ -8,10 +8,14 @@ save_budget = Signal()
 
 budget_deleted = Signal()
 
+project_created = Signal()
+
 project_deleted = Signal()
 
 furniture_created = Signal()
 
 furniture_deleted = Signal()
 
-furniture_changed = Signal()
\ No newline at end of file
+furniture_changed = Signal()
+
+orion_entity_changed = Signal()
@@ -0,0 +1,156 @@
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+import weakref
+from typing import Awaitable, Callable, Dict, Optional
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+
+class Call(object):
+    """
+    A read in flight: the callers that join it wait on ``done`` and share its response (or its error).
+    """
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.response: Optional[requests.Response] = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight(object):
+    """
+    Coalesces identical Orion reads that are in flight at the same time.
+
+    Within a process, the first caller of a query sends it and the callers that ask for the same query before it is
+    answered wait for that answer instead of sending their own. With ``shared`` set, the processes coordinate through
+    the cache as well: the process holding the lock of the query publishes the answer for ``result_ttl`` seconds and
+    the others read it from there, or send the query themselves once they have waited ``timeout`` seconds.
+    """
+    PREFIX = 'singleflight'
+
+    def __init__(self, enabled: bool = True, shared: bool = False, result_ttl: int = 1, timeout: float = 5) -> None:
+        self.enabled = enabled
+        self.shared = shared
+        self.result_ttl = result_ttl
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Call] = dict()
+        self._async_calls = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def from_settings(cls) -> 'SingleFlight':
+        config: dict = settings.ORION_SINGLE_FLIGHT
+        return cls(enabled=config.get('ENABLED'), shared=config.get('SHARED'), result_ttl=config.get('RESULT_TTL'),
+                   timeout=config.get('TIMEOUT'))
+
+    @staticmethod
+    def key(url: str, params=None) -> str:
+        if params is None:
+            items = list()
+        elif isinstance(params, (str, bytes)):
+            items = [('', params)]
+        else:
+            items = params.lists() if hasattr(params, 'lists') else getattr(params, 'items', lambda: params)()
+        query = '&'.join(f"{name}={value}" for name, value in sorted((str(k), str(v)) for k, v in items))
+        return hashlib.sha1(f"{url}?{query}".encode('utf-8')).hexdigest()
+
+    def do(self, key: str, fetch: Callable[[], requests.Response]) -> requests.Response:
+        if not self.enabled:
+            return fetch()
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Call()
+        if not leader:
+            if not call.done.wait(self.timeout):
+                return fetch()
+            if call.error is not None:
+                raise call.error
+            return call.response
+        try:
+            call.response = self.shared_fetch(key, fetch) if self.shared else fetch()
+            # Read the body before handing the response to the other threads.
+            call.response.content
+            return call.response
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    @staticmethod
+    def snapshot(response: requests.Response) -> tuple:
+        return response.status_code, dict(response.headers), response.content, response.url, response.encoding
+
+    @staticmethod
+    def rebuild(snapshot: tuple) -> requests.Response:
+        response = requests.Response()
+        response.status_code, headers, response._content, response.url, response.encoding = snapshot
+        response.headers = CaseInsensitiveDict(headers)
+        return response
+
+    def shared_fetch(self, key: str, fetch: Callable[[], requests.Response]) -> requests.Response:
+        result_key, lock_key = f"{self.PREFIX}:{key}:result", f"{self.PREFIX}:{key}:lock"
+        deadline = time.time() + self.timeout
+        while True:
+            snapshot = cache.get(result_key)
+            if snapshot is not None:
+                return self.rebuild(snapshot)
+            locked = cache.add(lock_key, os.getpid(), timeout=max(int(self.timeout), 1))
+            if locked is None:
+                # The cache backend is down (its errors are ignored): only coalesce within the process.
+                return fetch()
+            if locked:
+                try:
+                    response = fetch()
+                    if response.status_code == 200:
+                        cache.set(result_key, self.snapshot(response), timeout=self.result_ttl)
+                    return response
+                finally:
+                    cache.delete(lock_key)
+            if time.time() > deadline:
+                logger.warning("Timed out waiting for a coalesced Orion read, sending it again.")
+                return fetch()
+            time.sleep(0.01)
+
+    async def do_async(self, key: str, fetch: Callable[[], Awaitable]):
+        """
+        ``do`` for the async client: the callers of one event loop share the response of the first one.
+        """
+        if not self.enabled:
+            return await fetch()
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            calls: dict = self._async_calls.setdefault(loop, dict())
+        future: Optional[asyncio.Future] = calls.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+        future = calls[key] = loop.create_future()
+        # Mark the error as retrieved when no other caller joined.
+        future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        try:
+            response = await fetch()
+            future.set_result(response)
+            return response
+        except Exception as error:
+            future.set_exception(error)
+            raise
+        finally:
+            calls.pop(key, None)
+            if not future.done():
+                future.cancel()
+
+
+single_flight = SingleFlight.from_settings()
@@ -0,0 +1,133 @@
+import logging
+import math
+from typing import Iterator
+
+import requests
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.request import Request
+
+from utilities.orion import orion
+
+logger = logging.getLogger(__name__)
+
+
+class StreamInterrupted(Exception):
+    """
+    A page of a streamed list could not be read after the status and the first bytes were sent. Raised from the body
+    iterator so the server aborts the connection instead of closing a truncated array the client would take for the
+    whole result.
+    """
+
+
+class OrionStream(object):
+    """
+    Streaming mode of the Orion list views.
+
+    Lists asking for ``limit`` of at least ``min_limit`` entities are piped to the client as Orion sends them, in
+    chunks of ``chunk_size`` bytes, instead of being parsed and rendered again: the memory of the worker stays the same
+    whatever the size of the result. A ``limit`` above Orion's maximum page (``page_size``) is served as the
+    concatenation of the pages, fetched one after the other, into a single JSON array.
+    """
+    FORWARDED_HEADERS = ('NGSILD-Results-Count', 'Link')
+
+    def __init__(self, chunk_size: int = 65536, min_limit: int = 500, page_size: int = 1000) -> None:
+        self.chunk_size = chunk_size
+        self.min_limit = min_limit
+        self.page_size = page_size
+
+    @classmethod
+    def from_settings(cls) -> 'OrionStream':
+        config: dict = settings.ORION_STREAM
+        return cls(chunk_size=config.get('CHUNK_SIZE'), min_limit=config.get('MIN_LIMIT'),
+                   page_size=settings.ORION_PAGE_SIZE)
+
+    @staticmethod
+    def number(params, name: str, default: int = 0) -> int:
+        try:
+            return int(params.get(name) or default)
+        except (TypeError, ValueError):
+            return default
+
+    def wanted(self, request: Request, params) -> bool:
+        from utilities.conditional import conditional
+        return bool(self.min_limit) and conditional.passthrough(request) and \
+            self.number(params, 'limit') >= self.min_limit
+
+    @staticmethod
+    def query(params) -> dict:
+        return params.dict() if hasattr(params, 'dict') else dict(params)
+
+    def open(self, url: str, params) -> requests.Response:
+        """
+        Sends the query of the first page without reading its body.
+        """
+        params = self.query(params)
+        params.update(limit=min(self.number(params, 'limit'), self.page_size), count='true')
+        return orion.get(url, params=params, stream=True)
+
+    def relay(self, response: requests.Response) -> Iterator[bytes]:
+        try:
+            yield from response.iter_content(chunk_size=self.chunk_size)
+        finally:
+            response.close()
+
+    @staticmethod
+    def items(chunks: Iterator[bytes]) -> Iterator[bytes]:
+        """
+        The content of a streamed JSON array without its enclosing brackets.
+        """
+        started, tail = False, b''
+        for chunk in chunks:
+            data = tail + chunk
+            if not started:
+                data = data.lstrip()
+                if not data:
+                    continue
+                data, started = data[1:], True
+            cut = len(data.rstrip()) - 1
+            if cut > 0:
+                yield data[:cut]
+                data = data[cut:]
+            tail = data
+
+    def pages(self, first: requests.Response, url: str, params) -> Iterator[bytes]:
+        params = self.query(params)
+        limit, offset = self.number(params, 'limit'), self.number(params, 'offset')
+        total = self.number(first.headers, 'NGSILD-Results-Count', default=offset + limit)
+        count = math.ceil(max(0, min(limit, total - offset)) / self.page_size)
+        yield b'['
+        written = False
+        for page in range(max(count, 1)):
+            if page:
+                page_params = dict(params, offset=offset + page * self.page_size,
+                                   limit=min(self.page_size, limit - page * self.page_size))
+                response = orion.get(url, params=page_params, stream=True)
+                if response.status_code != 200:
+                    response.close()
+                    logger.error(f"Orion answered {response.status_code} to page {page + 1} of {count} of a "
+                                 f"streamed list of {url}; aborting the response.")
+                    raise StreamInterrupted(f"Page {page + 1} of {count} failed with {response.status_code}.")
+            else:
+                response = first
+            separator = b',' if written else b''
+            for chunk in self.items(self.relay(response)):
+                if not chunk.strip():
+                    continue
+                yield separator + chunk
+                separator, written = b'', True
+        yield b']'
+
+    def response(self, first: requests.Response, url: str, params) -> StreamingHttpResponse:
+        if self.number(params, 'limit') > self.page_size:
+            body = self.pages(first, url, params)
+        else:
+            body = self.relay(first)
+        response = StreamingHttpResponse(body, content_type='application/json')
+        for name in self.FORWARDED_HEADERS:
+            if first.headers.get(name) is not None:
+                response[name] = first.headers.get(name)
+        return response
+
+
+orion_stream = OrionStream.from_settings()
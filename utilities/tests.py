@@ -0,0 +1,266 @@
+from unittest import mock
+
+import requests
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from utilities import asyncViewsMixin, bulk, codec, functions, streaming, viewsMixin
+from utilities.asyncViewsMixin import AsyncOrionInterfaceView, AsyncOrionListMixin
+from utilities.bulk import BulkOperations, BulkReport
+from utilities.conditional import conditional
+from utilities.graph import entity_graph
+from utilities.health import orion_health
+from utilities.scope import OwnerScope
+from utilities.streaming import OrionStream, StreamInterrupted
+from utilities.signals import orion_entity_changed
+from utilities.viewsMixin import OrionInterfaceView, OrionCreateMixin, OrderByListMixin
+
+
+def orion_response(status_code: int, payload=None, content: bytes = b'', headers: dict = None) -> mock.Mock:
+    response = mock.Mock(status_code=status_code, content=content)
+    response.json.return_value = payload
+    response.headers = requests.structures.CaseInsensitiveDict(headers or dict())
+    return response
+
+
+class PartListView(OrderByListMixin, OrionInterfaceView):
+    permission_classes = []
+    entity_type = 'Part'
+
+
+class PartCreateView(OrionCreateMixin, OrionInterfaceView):
+    permission_classes = []
+    entity_type = 'Part'
+
+
+class AsyncPartListView(AsyncOrionListMixin, AsyncOrionInterfaceView):
+    permission_classes = []
+    entity_type = 'Part'
+
+
+class BulkOperationsTests(SimpleTestCase):
+
+    def setUp(self):
+        self.operations = BulkOperations(chunk_size=2, max_workers=2, max_retries=1, backoff_factor=0)
+
+    def test_multi_status_reports_each_id(self):
+        partial = orion_response(207, dict(success=['urn:a'], errors=[
+            dict(entityId='urn:b', error=dict(status=400, title='Bad Request'))]))
+        with mock.patch.object(bulk.orion, 'post', return_value=partial):
+            report = self.operations.delete(['urn:a', 'urn:b'])
+        self.assertEqual(report.success, ['urn:a'])
+        self.assertEqual([error['entityId'] for error in report.errors], ['urn:b'])
+        self.assertEqual(report.status_code, 207)
+        self.assertFalse(report.unreachable)
+
+    def test_transient_errors_are_retried(self):
+        responses = [orion_response(207, dict(success=['urn:a'], errors=[
+                         dict(entityId='urn:b', error=dict(status=503))])),
+                     orion_response(204)]
+        with mock.patch.object(bulk.orion, 'post', side_effect=responses) as post:
+            report = self.operations.delete(['urn:a', 'urn:b'])
+        self.assertEqual(post.call_count, 2)
+        self.assertEqual(report.success, ['urn:a', 'urn:b'])
+        self.assertTrue(report.ok)
+
+    def test_unreachable_broker(self):
+        with mock.patch.object(bulk.orion, 'post', side_effect=requests.exceptions.ConnectionError('down')):
+            report = self.operations.delete(['urn:a', 'urn:b', 'urn:c'])
+        self.assertEqual(report.chunks, 2)
+        self.assertEqual(len(report.errors), 3)
+        self.assertTrue(report.unreachable)
+
+
+class IterQueryTests(SimpleTestCase):
+
+    def test_only_the_first_page_asks_for_the_count(self):
+        pages = [orion_response(200, [dict(id='urn:a'), dict(id='urn:b')], headers={'NGSILD-Results-Count': '3'}),
+                 orion_response(200, [dict(id='urn:c')])]
+        with mock.patch.object(functions, 'query', side_effect=pages) as query:
+            ids = [entity['id'] for entity in functions.iter_query('Part', page_size=2)]
+        self.assertEqual(ids, ['urn:a', 'urn:b', 'urn:c'])
+        self.assertEqual([call.kwargs['params'].get('count') for call in query.call_args_list], ['true', None])
+
+    def test_failed_page_raises_when_strict(self):
+        failed = orion_response(500)
+        failed.raise_for_status.side_effect = requests.HTTPError('500')
+        pages = [orion_response(200, [dict(id='urn:a'), dict(id='urn:b')], headers={'NGSILD-Results-Count': '3'}),
+                 failed]
+        with mock.patch.object(functions, 'query', side_effect=pages):
+            with self.assertRaises(requests.HTTPError):
+                list(functions.iter_query('Part', page_size=2, strict=True))
+
+    def test_graph_walk_does_not_hide_a_failed_page(self):
+        failed = orion_response(500)
+        failed.raise_for_status.side_effect = requests.HTTPError('500')
+        with mock.patch.object(functions, 'query', return_value=failed):
+            with self.assertRaises(requests.HTTPError):
+                entity_graph.walk('Project', ['urn:ngsi-ld:Project:1'])
+
+
+class OwnerScopeTests(SimpleTestCase):
+    owner_id = 'urn:ngsi-ld:Owner:7'
+
+    def setUp(self):
+        self.scope = OwnerScope(timeout=60)
+        cache.set(self.scope.key(self.owner_id, 'furniture'), ['urn:ngsi-ld:Furniture:1'])
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_known_owners_are_invalidated_without_orion(self):
+        with mock.patch.object(OwnerScope, 'get_owner') as get_owner:
+            self.scope.invalidate_budgets(['urn:ngsi-ld:Budget:1', 'urn:ngsi-ld:Budget:1'],
+                                          owners={'urn:ngsi-ld:Budget:1': mock.Mock(pk=7)})
+        get_owner.assert_not_called()
+        self.assertIsNone(cache.get(self.scope.key(self.owner_id, 'furniture')))
+
+    def test_furniture_ids_are_queried_in_chunks(self):
+        ids = [f'urn:ngsi-ld:Furniture:{i}' for i in range(entity_graph.chunk_size * 2 + 1)]
+        entities = [dict(id=ids[0], hasBudget='urn:ngsi-ld:Budget:1')]
+        with mock.patch.object(functions, 'iter_query', return_value=iter(entities)) as iter_query, \
+                mock.patch.object(OwnerScope, 'get_owner', return_value=self.owner_id):
+            self.scope.invalidate_furniture(*ids)
+        self.assertEqual(iter_query.call_count, 3)
+        self.assertIsNone(cache.get(self.scope.key(self.owner_id, 'furniture')))
+
+
+class OrderByListTests(SimpleTestCase):
+    content = b'[{"id":"urn:ngsi-ld:Part:1","type":"Part"}]'
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.user = mock.Mock(is_admin=True, is_worker=False, is_customer=False)
+        self.page = orion_response(200, content=self.content,
+                                   headers={'Content-Type': 'application/json', 'NGSILD-Results-Count': '1'})
+
+    def get(self, **headers):
+        request = self.factory.get('/api/v1/part/', HTTP_ACCEPT='application/json', **headers)
+        force_authenticate(request, user=self.user)
+        return PartListView.as_view()(request)
+
+    def test_orion_body_is_passed_through_with_an_etag(self):
+        with mock.patch.object(viewsMixin.orion, 'get', return_value=self.page) as get:
+            response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, self.content)
+        self.assertEqual(response['NGSILD-Results-Count'], '1')
+        self.assertTrue(response['ETag'])
+        self.assertEqual(get.call_args.kwargs['params']['count'], 'true')
+
+    def test_unchanged_list_answers_not_modified(self):
+        with mock.patch.object(viewsMixin.orion, 'get', return_value=self.page):
+            etag = self.get()['ETag']
+            response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+
+class CreateAnnouncementTests(SimpleTestCase):
+
+    def setUp(self):
+        self.received = list()
+        orion_entity_changed.connect(self.receive)
+        self.addCleanup(orion_entity_changed.disconnect, self.receive)
+
+    def receive(self, sender, **kwargs):
+        self.received.append(kwargs['pk'])
+
+    def post(self, data):
+        request = APIRequestFactory().post('/api/v1/part/', data, format='json')
+        force_authenticate(request, user=mock.Mock(is_admin=True, is_worker=False, is_customer=False))
+        return PartCreateView.as_view()(request)
+
+    def test_created_entity_is_announced(self):
+        with mock.patch.object(viewsMixin.orion, 'post', return_value=orion_response(201)):
+            response = self.post(dict(id='urn:ngsi-ld:Part:1', type='Part'))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.received, ['urn:ngsi-ld:Part:1'])
+
+    def test_only_the_created_entities_of_a_batch_are_announced(self):
+        report = BulkReport('create')
+        report.success = ['urn:ngsi-ld:Part:1']
+        report.errors = [dict(entityId='urn:ngsi-ld:Part:2', error=dict(status=409))]
+        with mock.patch.object(viewsMixin.bulk_operations, 'create', return_value=report):
+            response = self.post([dict(id='urn:ngsi-ld:Part:1', type='Part'),
+                                  dict(id='urn:ngsi-ld:Part:2', type='Part')])
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(self.received, ['urn:ngsi-ld:Part:1'])
+
+
+class ConditionalScopeTests(SimpleTestCase):
+
+    def scope(self, user=None, auth=None) -> str:
+        request = mock.Mock(user=user, auth=auth)
+        return conditional.scope(request)
+
+    def test_each_user_has_its_own_scope(self):
+        first = mock.Mock(pk=1, is_authenticated=True, is_customer=False)
+        second = mock.Mock(pk=2, is_authenticated=True, is_customer=False)
+        self.assertNotEqual(self.scope(first), self.scope(second))
+
+    def test_client_credential_tokens_are_scoped_by_application(self):
+        anonymous = mock.Mock(is_authenticated=False)
+        self.assertEqual(self.scope(None, mock.Mock(application_id=3)), 'application:3')
+        self.assertNotEqual(self.scope(None, mock.Mock(application_id=4)), 'application:3')
+        self.assertEqual(self.scope(anonymous, None), 'anonymous')
+
+
+class AsyncListTests(SimpleTestCase):
+    content = b'[{"id":"urn:ngsi-ld:Part:1","type":"Part"}]'
+
+    def setUp(self):
+        self.user = mock.Mock(is_admin=True, is_worker=False, is_customer=False, pk=1)
+        self.page = mock.Mock(status_code=200, content=self.content, headers={'Content-Type': 'application/json'})
+
+    def tearDown(self):
+        cache.clear()
+
+    async def get(self):
+        request = APIRequestFactory().get('/api/v2/part/', HTTP_ACCEPT='application/json')
+        force_authenticate(request, user=self.user)
+        return await AsyncPartListView.as_view()(request)
+
+    async def test_open_breaker_answers_unavailable(self):
+        with mock.patch.object(orion_health, 'allow_request', return_value=False), \
+                mock.patch.object(asyncViewsMixin.async_orion, 'get', mock.AsyncMock()) as get:
+            response = await self.get()
+        self.assertEqual(response.status_code, 503)
+        get.assert_not_called()
+
+    async def test_list_is_answered_from_the_cache(self):
+        with mock.patch.object(orion_health, 'allow_request', return_value=True), \
+                mock.patch.object(conditional, 'timeout', 60), \
+                mock.patch.object(asyncViewsMixin.async_orion, 'get', mock.AsyncMock(return_value=self.page)) as get:
+            first = await self.get()
+            second = await self.get()
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(first['ETag'], second['ETag'])
+        self.assertEqual(second.content, self.content)
+
+
+class OrionStreamTests(SimpleTestCase):
+    url = 'http://orion:1026/ngsi-ld/v1/entities'
+
+    def setUp(self):
+        self.stream = OrionStream(chunk_size=4, min_limit=1, page_size=2)
+
+    @staticmethod
+    def page(content: bytes, status_code: int = 200, total: str = None) -> mock.Mock:
+        response = orion_response(status_code, headers={'NGSILD-Results-Count': total} if total else None)
+        response.iter_content.side_effect = lambda chunk_size: (content[i:i + chunk_size]
+                                                                for i in range(0, len(content), chunk_size))
+        return response
+
+    def test_pages_are_joined_into_one_array(self):
+        first = self.page(b'[{"id":"a"},{"id":"b"}]', total='3')
+        with mock.patch.object(streaming.orion, 'get', return_value=self.page(b'[{"id":"c"}]')) as get:
+            body = b''.join(self.stream.pages(first, self.url, dict(limit='3')))
+        self.assertEqual(codec.loads(body), [dict(id='a'), dict(id='b'), dict(id='c')])
+        self.assertEqual(get.call_args.kwargs['params']['offset'], 2)
+
+    def test_failed_page_aborts_the_stream(self):
+        first = self.page(b'[{"id":"a"},{"id":"b"}]', total='3')
+        with mock.patch.object(streaming.orion, 'get', return_value=self.page(b'', status_code=500)):
+            with self.assertRaises(StreamInterrupted):
+                b''.join(self.stream.pages(first, self.url, dict(limit='3')))
@@ -11,11 +11,11 @@ from users.models import User
 from utilities.constants import FurnitureType
 from utilities.decorators import user_has_orion_permission, customer_profile_exists
 from utilities.functions import generate_urn_identifier, update_headers, get_budget_owner, is_furniture_unique, \
-    has_special_chars
+    has_special_chars, get_budget_owners, get_furniture_keys
 from utilities.permissions import HasConnection, PermissionPermissions, GroupPermissions, ModelPermissions, \
     IsResourceOwner, CanChangeActivation
 from utilities.serializers import ChangePasswordSerializer, AvatarSerializer, MeSerializer, ChangeActivationSerializer
-from utilities.signals import project_deleted, furniture_changed
+from utilities.signals import project_deleted, project_created, furniture_changed
 from utilities.signals import user_registered, save_budget, furniture_created, furniture_deleted
 from .viewsMixin import OrionInterfaceView, OrionRetrieveMixin, OrionDeleteMixin, OrionUpdateMixin, OrionListMixin, \
     OrionCreateMixin, OrderByRetrieveMixin, OrderByListMixin, OrderByDeleteMixin, OrderByUpdateMixin, \
@@ -66,6 +66,11 @@ class UserInterfaceViewSet(viewsets.ModelViewSet):
             return DjangoUserGroupSerializerRead
         return super(UserInterfaceViewSet, self).get_serializer_class()
 
+    def get_queryset(self):
+        # Every profile renders its nested user with the user's groups.
+        return super(UserInterfaceViewSet, self).get_queryset().select_related('user') \
+            .prefetch_related('user__groups', 'user__orion_groups')
+
     def get_instance(self):
         return self.request.user
 
@@ -354,7 +359,11 @@ class ProjectViewEntity(OrderByListMixin, OrionInterfaceView, OrionCreateMixin):
     @user_has_orion_permission('add_project')
     @customer_profile_exists
     def post(self, request):
-        return super(ProjectViewEntity, self).post(request)
+        response: Response = super(ProjectViewEntity, self).post(request)
+        if response.status_code == 201:
+            project_created.send(sender=self.__class__, pk=request.data.get('id'),
+                                 owner_id=request.data.get('orderBy').get('object'))
+        return response
 
 
 class ProjectViewEntityDetail(OrionInterfaceView, OrderByRetrieveMixin, OrderByDeleteMixin, OrderByUpdateMixin):
@@ -530,7 +539,10 @@ class FurnitureEntity(OrderByListMixin, OrionInterfaceView, OrionCreateMixin):
         return super(FurnitureEntity, self).get(request)
 
     @staticmethod
-    def validate_data(data: dict) -> dict:
+    def check_attributes(data: dict) -> tuple:
+        """
+        Checks the mandatory attributes of a furniture payload and returns its budget id, name and furniture type.
+        """
         furniture_type = data.get('furnitureType')
         group = data.get('group')
         name = data.get("name")
@@ -558,37 +570,67 @@ class FurnitureEntity(OrderByListMixin, OrionInterfaceView, OrionCreateMixin):
             if group is None:
                 raise ValidationError("If the value of the 'furnitureType' attribute is set to 'subGroup', then the "
                                       "presence of the 'group'  attribute is mandatory and cannot be omitted.")
+        name = name.get("value")
+        if has_special_chars(name=name):
+            raise ValidationError("The attribute 'name' must only contain ASCII characters.")
+        return budget_id, name, furniture_type.get("value")
 
+    @staticmethod
+    def not_unique(name, budget_id, furniture_type) -> ValidationError:
+        return ValidationError(f"A furniture with the name '{name}', the ID '{budget_id}', and the furniture type"
+                               f" '{furniture_type}' already exists.")
+
+    @classmethod
+    def validate_data(cls, data: dict) -> dict:
+        budget_id, name, furniture_type = cls.check_attributes(data)
         customer = get_budget_owner(budget_id=budget_id)
         if customer is None:
             raise ValidationError("The system was unable to locate a customer associated with the budget specified")
-        name = name.get("value")
-        if has_special_chars(name=name):
-            raise ValidationError("The attribute 'name' must only contain ASCII characters.")
-        furniture_type = furniture_type.get("value")
         if not is_furniture_unique(name=name, budget_id=budget_id, furniture_type=furniture_type):
-            raise ValidationError(f"A furniture with the name '{name}', the ID '{budget_id}', and the furniture type"
-                                  f" '{furniture_type}' already exists.")
+            raise cls.not_unique(name, budget_id, furniture_type)
         return data
 
+    @classmethod
+    def validate_batch(cls, datas: list) -> dict:
+        """
+        Set-based ``validate_data`` for list payloads: the owner of each distinct budget is resolved once and the
+        existing furniture of each budget is read with a single query, instead of two lookups per item. Items that
+        repeat each other inside the batch are rejected as well.
+        :return: the owner of each budget of the batch, by budget id.
+        """
+        keys = [cls.check_attributes(data) for data in datas]
+        owners = get_budget_owners(budget_id for budget_id, _, _ in keys)
+        for budget_id, customer in owners.items():
+            if customer is None:
+                raise ValidationError(f"The system was unable to locate a customer associated with the budget "
+                                      f"'{budget_id}'")
+        existing = {budget_id: get_furniture_keys(budget_id=budget_id) for budget_id in owners}
+        for budget_id, name, furniture_type in keys:
+            if (name, furniture_type) in existing[budget_id]:
+                raise cls.not_unique(name, budget_id, furniture_type)
+            existing[budget_id].add((name, furniture_type))
+        return owners
+
     @user_has_orion_permission('add_furniture')
     def post(self, request):
         datas = request.data
-        pks = list()
+        owners = None
         if isinstance(datas, list):
-            for data in datas:
-                self.validate_data(data)
-                pks.append(data.get('id'))
+            owners = self.validate_batch(datas)
+            entities = datas
         else:
             self.validate_data(datas)
-            pks.append(datas.get("id"))
+            entities = [datas]
+        pks = [data.get('id') for data in entities]
         response: Response = super(FurnitureEntity, self).post(request)
-        if response.status_code == 201:
-            furniture_created.send(sender=self.__class__, pks=pks)
-        elif response.status_code == 207:
+        if response.status_code == 207:
             pks = response.data.get('success')
-            if pks:
-                furniture_created.send(sender=self.__class__, pks=pks)
+        elif response.status_code != 201:
+            return response
+        if pks:
+            created = set(pks)
+            furniture_created.send(sender=self.__class__, pks=pks, owners=owners,
+                                   entities=[data for data in entities if data.get('id') in created])
         return response
 
 
@@ -601,7 +643,7 @@ class FurnitureEntityDetail(OrionInterfaceView, OrderByRetrieveMixin, OrderByDel
 
     @user_has_orion_permission('delete_furniture')
     def delete(self, request, pk):
-        data = self.get_object(pk)
+        data = self.fetch_object(pk)
         if not data.status_code == status.HTTP_200_OK:
             return Response(dict(message="No entity found!", ok=False, status=status.HTTP_404_NOT_FOUND),
                             status=status.HTTP_404_NOT_FOUND, headers=update_headers(data.headers))
@@ -612,7 +654,7 @@ class FurnitureEntityDetail(OrionInterfaceView, OrderByRetrieveMixin, OrderByDel
 
     @user_has_orion_permission('change_furniture')
     def patch(self, request, pk=None):
-        old_name = self.get_object(pk=pk).json().get('name').get('value')
+        old_name = self.fetch_payload(pk=pk).get('name').get('value')
         response = super(FurnitureEntityDetail, self).patch(request, pk)
         if response.status_code == 201:
             furniture_changed.send(sender=self.__class__, pk=pk, old_name=old_name)
@@ -1,16 +1,21 @@
-import json
-from typing import List
+from typing import List, Optional
 
 import requests
 import requests_auth
 from django.conf import settings
 from rest_framework import views, status, permissions
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.request import Request
 from rest_framework.response import Response
 from oauth2_provider.contrib.rest_framework import TokenHasReadWriteScope
-from utilities.client import oauth
+from utilities import codec
+from utilities.orion import orion
+from utilities.bulk import bulk_operations
+from utilities.conditional import conditional
+from utilities.streaming import orion_stream
 from utilities.exceptions import OrionSystemOutOfService, AuthenticationFiware
 from utilities.functions import generate_urn_identifier
+from utilities.signals import orion_entity_changed
 from .decorators import check_uri, check_uri_from_request
 from .functions import update_headers
 from .permissions import HasConnection
@@ -18,6 +23,7 @@ from .permissions import HasConnection
 
 class OrionInterfaceView(views.APIView):
     permission_classes = [permissions.IsAuthenticated | TokenHasReadWriteScope, HasConnection]
+    renderer_classes = [codec.JSONRenderer, BrowsableAPIRenderer]
     entity_type = 'Owner'
     url = settings.ORION_ENTITIES
     orion_headers = settings.ORION_HEADERS
@@ -62,8 +68,57 @@ class OrionInterfaceView(views.APIView):
     def get_object(self, pk, params=None) -> requests.Response:
         if params:
             params = self.check_params(params)
-            return requests.get(url=self.detail_url(pk), headers=settings.ORION_HEADERS, params=params, auth=oauth)
-        return requests.get(url=self.detail_url(pk), headers=settings.ORION_HEADERS, auth=oauth)
+            return orion.get(self.detail_url(pk), params=params)
+        return orion.get(self.detail_url(pk))
+
+    def fetch_object(self, pk) -> requests.Response:
+        """
+        Fetches the entity at most once per request: the ownership checks, the signals and the response of the view
+        all reuse the same Orion response.
+        """
+        responses: dict = self.__dict__.setdefault('_fetched_objects', dict())
+        if pk not in responses:
+            responses[pk] = self.get_object(pk)
+        return responses[pk]
+
+    def fetch_payload(self, pk) -> Optional[dict]:
+        payloads: dict = self.__dict__.setdefault('_fetched_payloads', dict())
+        if pk not in payloads:
+            response = self.fetch_object(pk)
+            payloads[pk] = codec.loads(response.content) if response.status_code == status.HTTP_200_OK else None
+        return payloads[pk]
+
+    def merge_payload(self, pk, data: dict) -> Optional[dict]:
+        """
+        Builds the entity resulting from a successful attribute update out of the payload already fetched in this
+        request, so the view doesn't have to read it back from Orion. Returns None when there is no such payload or
+        when some attribute is not in the normalized (typed) form Orion stores verbatim.
+        """
+        payload = self.__dict__.get('_fetched_payloads', dict()).get(pk)
+        if payload is None or not all(isinstance(value, dict) and 'type' in value for value in data.values()):
+            return None
+        payload = dict(payload, **data)
+        self._fetched_payloads[pk] = payload
+        return payload
+
+    def entity_changed(self, pk, data: Optional[dict] = None, deleted: bool = False) -> None:
+        """
+        Sends ``orion_entity_changed`` for a change made through this view, so the cached answers and owner scopes are
+        dropped at once instead of when Orion notifies it, which it never does for deletions.
+        """
+        if data is None:
+            data = self.__dict__.get('_fetched_payloads', dict()).get(pk) or dict(id=pk, type=self.entity_type)
+        orion_entity_changed.send(sender=self.__class__, entity_type=self.entity_type, pk=pk, data=data,
+                                  deleted=deleted)
+
+    def entities_created(self, entities: List[dict], created: list) -> None:
+        """
+        Sends ``entity_changed`` for the entities of a batch that Orion created.
+        """
+        created = set(created)
+        for entity in entities:
+            if entity.get('id') in created:
+                self.entity_changed(entity.get('id'), entity)
 
 
 class OrionCreateMixin(object):
@@ -74,26 +129,24 @@ class OrionCreateMixin(object):
         try:
             datas = request.data
             if isinstance(datas, List):
-
-                url = url.replace('/entities', '')
-                url += "/entityOperations/create"
-
                 for d in datas:
                     results.append(self.check_data(data=d))
-                data = results
-            else:
-                data = self.check_data(data=datas)
-            data_json = json.dumps(data).encode('utf-8')
-            response = requests.post(url=url, auth=oauth, data=data_json,
-                                     headers=settings.ORION_HEADERS)
+                report = bulk_operations.create(results)
+                if report.unreachable:
+                    raise OrionSystemOutOfService()
+                self.entities_created(results, report.success)
+                if report.ok:
+                    return Response(report.success, status=report.status_code)
+                return Response(report.as_dict(), status=report.status_code)
+            data = self.check_data(data=datas)
+            data_json = codec.dumps(data)
+            response = orion.post(url, data=data_json)
             if response.status_code == status.HTTP_201_CREATED:
-                if isinstance(datas, List):
-                    response_data = response.json()
-                else:
-                    response_data = data
-                return Response(response_data, status=response.status_code, headers=update_headers(response.headers))
-            return Response(response.json(), status=response.status_code, headers=update_headers(response.headers))
-        except requests.exceptions.ConnectionError:
+                self.entity_changed(data.get('id'), data)
+                return Response(data, status=response.status_code, headers=update_headers(response.headers))
+            return Response(codec.loads(response.content), status=response.status_code,
+                            headers=update_headers(response.headers))
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
             raise OrionSystemOutOfService()
         except requests_auth.errors.InvalidGrantRequest:
             raise AuthenticationFiware
@@ -101,21 +154,33 @@ class OrionCreateMixin(object):
 
 class OrionListMixin(object):
 
-    def get(self, request: Request):
+    def get_params(self, request):
         params = self.check_params(self.request.query_params.copy())
         params.update(self.generate_params(user=request.user))
+        return params
+
+    def get(self, request: Request):
+        params = self.get_params(request)
+        key = conditional.key(request, self.url, params, entity_type=getattr(self, 'entity_type', None))
+        cached = conditional.cached(request, key)
+        if cached is not None:
+            return cached
         try:
-            response: requests.Response = requests.get(url=self.url, headers=settings.ORION_HEADERS, auth=oauth,
-                                                       timeout=5,
-                                                       params=params)
+            if orion_stream.wanted(request, params):
+                response: requests.Response = orion_stream.open(self.url, params)
+                if response.status_code == status.HTTP_200_OK:
+                    return orion_stream.response(response, self.url, params)
+            else:
+                response: requests.Response = orion.get(self.url, params=params)
             if response.status_code == status.HTTP_200_OK:
-                return Response(response.json(), status=status.HTTP_200_OK, headers=update_headers(response.headers))
+                return conditional.respond(request, update_headers(response.headers), content=response.content,
+                                           key=key)
             if response.status_code == status.HTTP_204_NO_CONTENT:
-                return Response(response.json(), status=status.HTTP_404_NOT_FOUND,
+                return Response(codec.loads(response.content), status=status.HTTP_404_NOT_FOUND,
                                 headers=update_headers(response.headers))
             return Response(data=dict(message="No entity found", ok=False, status=404),
                             status=status.HTTP_404_NOT_FOUND)
-        except requests.exceptions.ConnectionError:
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
             raise OrionSystemOutOfService()
         except requests_auth.errors.InvalidGrantRequest:
             raise AuthenticationFiware
@@ -126,12 +191,15 @@ class OrionRetrieveMixin(object):
     def get(self, request: Request, pk):
         try:
             params = self.check_params(request.query_params.copy())
-            response = self.get_object(pk, params)
+            key = conditional.key(request, self.detail_url(pk), params, pk=pk)
+            cached = conditional.cached(request, key)
+            if cached is not None:
+                return cached
+            response = self.get_object(pk, params) if params else self.fetch_object(pk)
             if response.status_code == status.HTTP_200_OK:
                 content_type = response.headers.get('Content-Type', '')
                 if 'application/json' in content_type:
-                    data = response.content.decode('unicode-escape')  # Decode the response data
-                    return Response(json.loads(data), status=response.status_code)
+                    return conditional.respond(request, dict(), content=response.content, key=key)
                 else:
                     return Response(data=dict(message=f"Invalid content type: {content_type}", ok=False, status=400),
                                     status=status.HTTP_400_BAD_REQUEST,
@@ -139,7 +207,7 @@ class OrionRetrieveMixin(object):
             return Response(data=dict(message="Entity not found", ok=False, status=404),
                             status=status.HTTP_404_NOT_FOUND,
                             headers=update_headers(response.headers))
-        except requests.exceptions.ConnectionError:
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
             raise OrionSystemOutOfService()
         except requests_auth.errors.InvalidGrantRequest:
             raise AuthenticationFiware()
@@ -149,13 +217,13 @@ class OrionDeleteMixin(object):
     @check_uri
     def delete(self, request: Request, pk: str):
         try:
-            data = self.get_object(pk)
-            response = requests.delete(url=self.detail_url(uid=pk), headers=settings.ORION_HEADERS, auth=oauth)
+            response = orion.delete(self.detail_url(uid=pk))
             if response.status_code == status.HTTP_204_NO_CONTENT:
+                self.entity_changed(pk, deleted=True)
                 return Response({}, status=status.HTTP_200_OK, headers=update_headers(response.headers))
             return Response(dict(message="No entity found!", ok=False, status=status.HTTP_404_NOT_FOUND),
                             status=status.HTTP_404_NOT_FOUND, headers=update_headers(response.headers))
-        except requests.exceptions.ConnectionError:
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
             raise OrionSystemOutOfService()
         except requests_auth.errors.InvalidGrantRequest:
             raise AuthenticationFiware
@@ -184,18 +252,20 @@ class OrionUpdateMixin(object):
         try:
             data: dict = self.check_data(data=request.data)
             data = self.remove_protected_attrs(data, user=request.user)
-            response = requests.patch(url=self.detail_url(uid=pk) + "attrs", data=json.dumps(data),
-                                      headers=settings.ORION_HEADERS,
-                                      auth=oauth)
+            response = orion.patch(self.detail_url(uid=pk) + "attrs", data=codec.dumps(data))
             if response.status_code == status.HTTP_204_NO_CONTENT:
-                response = requests.get(self.detail_url(uid=pk), headers=settings.ORION_HEADERS, auth=oauth)
-                return Response(response.json(),
+                payload = self.merge_payload(pk, data)
+                self.entity_changed(pk, payload)
+                if payload is not None:
+                    return Response(payload, status=status.HTTP_200_OK, headers=update_headers(response.headers))
+                response = orion.get(self.detail_url(uid=pk))
+                return Response(codec.loads(response.content),
                                 status=response.status_code,
                                 headers=update_headers(response.headers)
                                 )
-            return Response(response.json(), status=status.HTTP_400_BAD_REQUEST,
+            return Response(codec.loads(response.content), status=status.HTTP_400_BAD_REQUEST,
                             headers=update_headers(response.headers))
-        except requests.exceptions.ConnectionError:
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
             raise OrionSystemOutOfService()
         except requests_auth.errors.InvalidGrantRequest:
             raise AuthenticationFiware
@@ -221,18 +291,20 @@ class OrionCreateAttrsMixin(object):
         try:
             data: dict = self.check_data(data=request.data)
             data = self.remove_protected_attrs(data, user=request.user)
-            response = requests.post(url=self.detail_url(uid=pk) + "attrs", data=json.dumps(data),
-                                     headers=settings.ORION_HEADERS,
-                                     auth=oauth)
+            response = orion.post(self.detail_url(uid=pk) + "attrs", data=codec.dumps(data))
             if response.status_code == status.HTTP_204_NO_CONTENT:
-                response = requests.get(self.detail_url(uid=pk), headers=settings.ORION_HEADERS, auth=oauth)
-                return Response(response.json(),
+                payload = self.merge_payload(pk, data)
+                self.entity_changed(pk, payload)
+                if payload is not None:
+                    return Response(payload, status=status.HTTP_200_OK, headers=update_headers(response.headers))
+                response = orion.get(self.detail_url(uid=pk))
+                return Response(codec.loads(response.content),
                                 status=response.status_code,
                                 headers=update_headers(response.headers)
                                 )
-            return Response(response.json(), status=status.HTTP_400_BAD_REQUEST,
+            return Response(codec.loads(response.content), status=status.HTTP_400_BAD_REQUEST,
                             headers=update_headers(response.headers))
-        except requests.exceptions.ConnectionError:
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
             raise OrionSystemOutOfService()
         except requests_auth.errors.InvalidGrantRequest:
             raise AuthenticationFiware
@@ -241,10 +313,14 @@ class OrionCreateAttrsMixin(object):
 class OrderByRetrieveMixin(OrionRetrieveMixin):
     @check_uri
     def get(self, request, pk: str):
-        response = self.get_object(pk)
-        if response.status_code == status.HTTP_200_OK:
-            if self.verify_orderBy(payload=response.json(), user=request.user):
-                return super(OrderByRetrieveMixin, self).get(request, pk)
+        try:
+            payload = self.fetch_payload(pk)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            raise OrionSystemOutOfService()
+        except requests_auth.errors.InvalidGrantRequest:
+            raise AuthenticationFiware()
+        if payload is not None and self.verify_orderBy(payload=payload, user=request.user):
+            return super(OrderByRetrieveMixin, self).get(request, pk)
         return Response(data=dict(message="Entity not found", ok=False, status=404),
                         status=status.HTTP_404_NOT_FOUND)
 
@@ -263,40 +339,18 @@ class OrderByListMixin(OrionListMixin):
         params.update(dict(count='true'))
         return params
 
-    def get_params(self, request):
-        params = self.check_params(self.request.query_params.copy())
-        params.update(self.generate_params(user=request.user))
-        return params
-
-    def get(self, request: Request):
-
-        try:
-            response: requests.Response = requests.get(url=self.url, headers=settings.ORION_HEADERS, auth=oauth,
-                                                       params=self.get_params(request))
-            if response.status_code == status.HTTP_200_OK:
-                return Response(response.json(), status=status.HTTP_200_OK, headers=update_headers(response.headers))
-            if response.status_code == status.HTTP_204_NO_CONTENT:
-                return Response(response.json(), status=status.HTTP_404_NOT_FOUND,
-                                headers=update_headers(response.headers))
-            return Response(data=dict(message="No entity found", ok=False, status=404),
-                            status=status.HTTP_404_NOT_FOUND)
-        except requests.exceptions.ConnectionError:
-            raise OrionSystemOutOfService()
-        except requests_auth.errors.InvalidGrantRequest:
-            raise AuthenticationFiware
-
 
 class OrderByDeleteMixin(OrionDeleteMixin):
     @check_uri
     def delete(self, request: Request, pk: str):
         try:
-            data = self.get_object(pk)
+            data = self.fetch_object(pk)
             if data.status_code == status.HTTP_200_OK:
-                if self.verify_orderBy(payload=data.json(), user=request.user):
+                if self.verify_orderBy(payload=self.fetch_payload(pk), user=request.user):
                     return super(OrderByDeleteMixin, self).delete(request, pk)
             return Response(dict(message="No entity found!", ok=False, status=status.HTTP_404_NOT_FOUND),
                             status=status.HTTP_404_NOT_FOUND, headers=update_headers(data.headers))
-        except requests.exceptions.ConnectionError:
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
             raise OrionSystemOutOfService()
 
 
@@ -305,13 +359,13 @@ class OrderByUpdateMixin(OrionUpdateMixin):
     @check_uri
     def patch(self, request: Request, pk: str):
         try:
-            data = self.get_object(pk)
+            data = self.fetch_object(pk)
             if data.status_code == status.HTTP_200_OK:
-                if self.verify_orderBy(payload=data.json(), user=request.user):
+                if self.verify_orderBy(payload=self.fetch_payload(pk), user=request.user):
                     return super(OrderByUpdateMixin, self).patch(request, pk)
             return Response(dict(message="No entity found!", ok=False, status=status.HTTP_404_NOT_FOUND),
                             status=status.HTTP_404_NOT_FOUND, headers=update_headers(data.headers))
-        except requests.exceptions.ConnectionError:
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
             raise OrionSystemOutOfService()
         except requests_auth.errors.InvalidGrantRequest:
             raise AuthenticationFiware
@@ -321,13 +375,13 @@ class OrderByCreateAttrsMixin(OrionCreateAttrsMixin):
 
     def post(self, request: Request, pk: str):
         try:
-            data = self.get_object(pk)
+            data = self.fetch_object(pk)
             if data.status_code == status.HTTP_200_OK:
-                if self.verify_orderBy(payload=data.json(), user=request.user):
+                if self.verify_orderBy(payload=self.fetch_payload(pk), user=request.user):
                     return super(OrderByCreateAttrsMixin, self).post(request, pk)
             return Response(dict(message="No entity found!", ok=False, status=status.HTTP_404_NOT_FOUND),
                             status=status.HTTP_404_NOT_FOUND, headers=update_headers(data.headers))
-        except requests.exceptions.ConnectionError:
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
             raise OrionSystemOutOfService()
         except requests_auth.errors.InvalidGrantRequest:
             raise AuthenticationFiware